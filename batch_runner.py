@@ -0,0 +1,453 @@
+import io
+import os
+import re
+import json
+import time
+import signal
+import datetime
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from file_utils import FileUtils
+
+# 清单中可以使用的任务类型（与 cli.py 的子命令相同）
+JOB_TYPES = ('generate', 'set-dates', 'export-a2', 'export-a5', 'export-finalize')
+# 支持 --workers 的任务类型，未指定时使用分配给每个任务的进程数
+WORKER_JOB_TYPES = ('generate', 'set-dates', 'export-a2', 'export-a5')
+# 任务中不作为命令行参数的键
+META_KEYS = ('name', 'type', 'after')
+
+
+class ManifestError(ValueError):
+    """任务清单格式错误"""
+
+
+def load_manifest(path: str) -> dict:
+    """
+    读取任务清单（JSON，或安装了 PyYAML 时的 YAML）。
+
+    清单为任务列表，或包含 jobs（任务列表）和 defaults（所有任务共用的设置）的对象。
+
+    返回:
+        {'defaults': dict, 'jobs': list}
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if path.lower().endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ManifestError("读取YAML格式的任务清单需要安装 PyYAML，也可以改用JSON格式")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    if isinstance(data, list):
+        data = {'jobs': data}
+    if not isinstance(data, dict) or not isinstance(data.get('jobs'), list):
+        raise ManifestError("任务清单应为任务列表，或包含 jobs 列表的对象")
+    defaults = data.get('defaults') or {}
+    if not isinstance(defaults, dict) or not all(isinstance(job, dict) for job in data['jobs']):
+        raise ManifestError("defaults 和每个任务都应为对象（键值对）")
+    return {'defaults': defaults, 'jobs': data['jobs']}
+
+
+class BatchJob:
+    """清单中的一个任务：对应的命令行参数、独立的配置和执行结果"""
+
+    def __init__(self, name: str, command: str, argv: list, config: dict, after: list, workers: int):
+        self.name = name
+        self.command = command
+        self.argv = argv        # 子命令之后的命令行参数
+        self.config = config    # 该任务使用的完整配置（全局配置 + defaults + 任务中的配置项）
+        self.after = after      # 需要先成功完成的任务名称
+        self.workers = workers  # 任务内部的并行进程数
+        self.status = 'pending'  # pending / running / success / failed / cancelled / skipped / error
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.elapsed = None
+        self.log_path = None
+        self._start = None
+
+    def report(self) -> dict:
+        return {
+            'name': self.name,
+            'type': self.command,
+            'status': self.status,
+            'after': self.after,
+            'workers': self.workers,
+            'started': self.started,
+            'finished': self.finished,
+            'elapsed': self.elapsed,
+            'log': self.log_path,
+            'error': self.error,
+        }
+
+
+# ---- 在任务进程中执行 ----
+
+_log_queue = None
+_cancel_event = None
+
+
+def _init_job_process(log_queue, cancel_event):
+    """任务进程的初始化：Ctrl+C 由主进程处理后通过 cancel_event 通知，任务进程自身忽略"""
+    global _log_queue, _cancel_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _log_queue, _cancel_event = log_queue, cancel_event
+
+
+class _JobReporter:
+    """与 cli.JsonLinesReporter 接口相同，日志发送到主进程（带任务名称）"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def emit(self, event: str, **fields):
+        if 'message' in fields:
+            self.log(fields['message'])
+
+    def log(self, message):
+        _log_queue.put((self.name, str(message)))
+
+    def progress(self, current: int, total: int):
+        pass
+
+
+def _run_job(name: str, command: str, argv: list, config: dict) -> dict:
+    """
+    在任务进程中执行一个任务，使用与 cli.py 相同的子命令处理函数。
+
+    FileUtils 的类属性（head_list、form_types、save_backend 等）在每个进程中独立，
+    任务开始时按任务自己的配置设置，不影响同时执行的其他任务。
+    """
+    import cli
+    from tracer import Tracer
+    from file_manipulator import shutdown_shared_executors
+
+    reporter = _JobReporter(name)
+    FileUtils.head_list = config.get('head_list', FileUtils.head_list)
+    FileUtils.form_types = config.get('form_types', FileUtils.form_types)
+    FileUtils.save_backend = config.get('docx_save', FileUtils.save_backend)
+    FileUtils.template_cache_mb = config.get('template_cache_mb', FileUtils.template_cache_mb)
+
+    args = cli.build_parser().parse_args([command] + argv)
+    manipulator, job = args.handler(args, config, reporter)
+    if job is None:
+        return {'status': 'failed', 'error': "参数错误"}
+    if config.get('trace', False):
+        manipulator.tracer = Tracer()
+
+    # 主进程请求取消时通知当前任务
+    finished = threading.Event()
+
+    def forward_cancel():
+        while not finished.is_set():
+            if _cancel_event.wait(0.2):
+                manipulator.cancel()
+                return
+
+    threading.Thread(target=forward_cancel, daemon=True).start()
+
+    error = None
+    capture = cli._PrintToLog(reporter)
+    try:
+        with contextlib.redirect_stdout(capture):
+            success = bool(job())
+    except Exception as e:
+        reporter.log(f"执行过程中发生错误: {e}")
+        success, error = False, str(e)
+    finally:
+        finished.set()
+        capture.flush()
+        manipulator.report_trace(FileUtils.get_trace_path(f"batch_{_safe_name(name)}"))
+        # 任务进程会继续执行其他任务，任务内部修改文档的共享进程池在任务结束时关闭，
+        # 否则关闭任务进程池时会等待其中的工作进程
+        shutdown_shared_executors()
+
+    if manipulator.is_cancelled():
+        status = 'cancelled'
+    else:
+        status = 'success' if success else 'failed'
+    return {'status': status, 'error': error}
+
+
+def _safe_name(name: str) -> str:
+    """用作文件名的任务名称"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('._') or 'job'
+
+
+# ---- 主进程 ----
+
+class BatchRunner:
+    """
+    按任务清单批量执行生成、设置日期和导出任务。
+
+    每个任务在单独的进程中执行，拥有自己的 FileManipulator 和配置（清单中的 head_list、
+    form_types 等只影响该任务）。同时执行的任务数和每个任务内部的并行进程数由总进程数
+    （workers）统一分配；after 指定的任务成功完成后才开始，前置任务失败时跳过。
+    各任务的日志加上任务名称转发到主日志，同时保存在单独的日志文件中，全部结束后写出
+    汇总报告（JSON）。
+
+    清单示例（JSON）:
+        {
+          "defaults": {"edit_workers": 2},
+          "jobs": [
+            {"name": "A", "type": "generate", "source": "D:/模板A", "target": "D:/生成A"},
+            {"name": "A-日期", "type": "set-dates", "target": "D:/生成A", "val_date": "2025.05.05",
+             "after": ["A"]},
+            {"type": "export-a2", "source": "D:/生成B", "output": "D:/csv", "head_list": ["Analysis"]}
+          ]
+        }
+    任务中的键:
+        type: 任务类型，见 JOB_TYPES
+        name: 任务名称（默认为 序号-类型），after 中引用的名称
+        after: 需要先成功完成的任务名称列表
+        与配置文件同名的键（head_list、form_types、read_backend 等）: 只对该任务生效的配置
+        其余键: 对应子命令的命令行参数（val_date 即 --val-date，值为 true 的键为开关参数）
+    """
+
+    # 等待任务结束时转发日志和检查取消请求的间隔
+    TICK = 0.2
+
+    STATUS_LABELS = {
+        'success': "成功", 'failed': "失败", 'cancelled': "已取消", 'skipped': "已跳过",
+        'error': "任务进程异常退出", 'pending': "未执行", 'running': "执行中",
+    }
+
+    def __init__(self, manipulator, manifest_path: str, config: dict, workers: int = 0, max_jobs: int = 0,
+                 report_path: str = None):
+        """
+        参数:
+            manipulator: 用于输出日志、进度和接收取消请求的 FileManipulator
+            manifest_path: 任务清单文件
+            config: 全局配置，各任务在此基础上使用清单中的设置
+            workers: 总进程数，0 表示使用全部CPU核心
+            max_jobs: 最多同时执行的任务数，0 表示不超过总进程数
+            report_path: 汇总报告路径，为空时保存在 logs 目录
+        """
+        self.manipulator = manipulator
+        self.manifest_path = manifest_path
+        self.config = config
+        self.workers = manipulator.resolve_workers(workers)
+        self.max_jobs = max_jobs
+        self.report_path = report_path
+        self.jobs = []
+        self.concurrency = 1
+
+    def prepare(self):
+        """读取清单并检查所有任务的参数，有错误时抛出 ManifestError（不执行任何任务）"""
+        import cli
+
+        manifest = load_manifest(self.manifest_path)
+        entries = manifest['jobs']
+        if not entries:
+            raise ManifestError("任务清单中没有任务")
+        self.concurrency = max(1, min(len(entries), self.max_jobs or self.workers))
+        share = max(1, self.workers // self.concurrency)
+
+        parser = cli.build_parser()
+        jobs, names = [], set()
+        for index, entry in enumerate(entries, 1):
+            entry = dict(manifest['defaults'], **entry)
+            command = entry.get('type')
+            if command not in JOB_TYPES:
+                raise ManifestError(f"第 {index} 个任务的类型无效: {command!r}（可用: {', '.join(JOB_TYPES)}）")
+            name = str(entry.get('name') or f"{index}-{command}")
+            if name in names:
+                raise ManifestError(f"任务名称重复: {name}")
+            names.add(name)
+
+            after = entry.get('after') or []
+            if isinstance(after, str):
+                after = [after]
+
+            config = dict(self.config)
+            argv = []
+            for key, value in entry.items():
+                if key in META_KEYS:
+                    continue
+                if key in self.config:
+                    config[key] = value
+                elif value is True:
+                    argv.append('--' + key.replace('_', '-'))
+                elif value is not False and value is not None:
+                    argv += ['--' + key.replace('_', '-'), str(value)]
+
+            workers = entry.get('workers')
+            if command in WORKER_JOB_TYPES and workers is None:
+                workers = share
+                argv += ['--workers', str(share)]
+
+            # 提前检查参数，避免执行到一半才发现清单有误
+            errors = io.StringIO()
+            try:
+                with contextlib.redirect_stderr(errors):
+                    parser.parse_args([command] + argv)
+            except SystemExit:
+                message = errors.getvalue().strip().splitlines()
+                raise ManifestError(f"任务 '{name}' 的参数无效: {message[-1] if message else argv}")
+            jobs.append(BatchJob(name, command, argv, config, list(after), workers))
+
+        for job in jobs:
+            unknown = [dep for dep in job.after if dep not in names]
+            if unknown:
+                raise ManifestError(f"任务 '{job.name}' 的 after 中有不存在的任务: {', '.join(unknown)}")
+        self.jobs = jobs
+
+    def run(self) -> bool:
+        """执行所有任务并写出汇总报告，全部成功时返回 True（尚未调用 prepare() 时先读取清单）"""
+        manipulator = self.manipulator
+        if not self.jobs:
+            try:
+                self.prepare()
+            except (OSError, ValueError) as e:
+                manipulator.log(f"任务清单无效: {e}")
+                return False
+
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        log_dir = os.path.join(FileUtils.get_app_dir(), 'logs', f"batch_{timestamp}")
+        os.makedirs(log_dir, exist_ok=True)
+        log_files = {}
+        for job in self.jobs:
+            job.log_path = os.path.join(log_dir, f"{_safe_name(job.name)}.log")
+            log_files[job.name] = open(job.log_path, 'w', encoding='utf-8')
+
+        manipulator.log(f"共 {len(self.jobs)} 个任务，同时执行 {self.concurrency} 个，总进程数 {self.workers}")
+        started = datetime.datetime.now()
+        start = time.perf_counter()
+        # spawn：任务进程不继承主进程中的类属性等状态，与 Windows 上的行为一致
+        context = multiprocessing.get_context('spawn')
+        log_queue = context.Queue()
+        cancel_event = context.Event()
+        executor = ProcessPoolExecutor(max_workers=self.concurrency, mp_context=context,
+                                       initializer=_init_job_process, initargs=(log_queue, cancel_event))
+        try:
+            self._schedule(executor, log_queue, cancel_event, log_files)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._forward_logs(log_queue, log_files)
+            for f in log_files.values():
+                f.close()
+
+        elapsed = time.perf_counter() - start
+        # 取消（Ctrl+C、界面上的"取消"）后即使已开始的任务都已完成，整体也不算成功
+        success = not manipulator.is_cancelled() and all(job.status == 'success' for job in self.jobs)
+        self._write_report(started, elapsed, success, log_dir)
+        return success
+
+    def _schedule(self, executor, log_queue, cancel_event, log_files):
+        manipulator = self.manipulator
+        pending = list(self.jobs)
+        running = {}  # Future -> BatchJob
+        by_name = {job.name: job for job in self.jobs}
+        total = len(self.jobs)
+        finished = 0
+
+        while pending or running:
+            if manipulator.is_cancelled():
+                if not cancel_event.is_set():
+                    cancel_event.set()
+                    manipulator.log("正在取消：等待执行中的任务在当前文件处理完成后停止，未开始的任务不再执行")
+                for job in pending:
+                    job.status = 'cancelled'
+                    finished += 1
+                pending = []
+            else:
+                for job in list(pending):
+                    states = [by_name[dep].status for dep in job.after]
+                    if any(state not in ('pending', 'running', 'success') for state in states):
+                        pending.remove(job)
+                        job.status = 'skipped'
+                        job.error = "前置任务未成功完成"
+                        manipulator.log(f"[{job.name}] 已跳过：前置任务未成功完成")
+                        finished += 1
+                    elif len(running) < self.concurrency and all(state == 'success' for state in states):
+                        pending.remove(job)
+                        job.status = 'running'
+                        job.started = datetime.datetime.now().isoformat(timespec='seconds')
+                        job._start = time.perf_counter()
+                        manipulator.log(f"[{job.name}] 开始执行 {job.command} {' '.join(job.argv)}")
+                        running[executor.submit(_run_job, job.name, job.command, job.argv, job.config)] = job
+
+                if pending and not running:
+                    # 剩余任务的前置任务都无法完成（循环依赖）
+                    for job in pending:
+                        job.status = 'skipped'
+                        job.error = "after 中存在循环依赖"
+                        manipulator.log(f"[{job.name}] 已跳过：after 中存在循环依赖")
+                        finished += 1
+                    pending = []
+
+            if running:
+                done, _ = wait(running, timeout=self.TICK, return_when=FIRST_COMPLETED)
+            else:
+                done = ()
+            self._forward_logs(log_queue, log_files)
+            for future in done:
+                job = running.pop(future)
+                try:
+                    result = future.result()
+                    job.status, job.error = result['status'], result['error']
+                except Exception as e:
+                    job.status, job.error = 'error', str(e)
+                job.elapsed = round(time.perf_counter() - job._start, 3)
+                job.finished = datetime.datetime.now().isoformat(timespec='seconds')
+                finished += 1
+                manipulator.log(f"[{job.name}] {self.STATUS_LABELS[job.status]}（{job.elapsed:.1f} 秒）"
+                                + (f": {job.error}" if job.error else ""))
+            manipulator.report_progress(finished, total)
+
+    def _forward_logs(self, log_queue, log_files):
+        """把任务进程发送的日志写入各任务的日志文件，并加上任务名称转发到主日志"""
+        import queue
+
+        while True:
+            try:
+                name, message = log_queue.get_nowait()
+            except queue.Empty:
+                return
+            log_files[name].write(message + '\n')
+            self.manipulator.log(f"[{name}] {message}")
+
+    def _write_report(self, started, elapsed: float, success: bool, log_dir: str):
+        manipulator = self.manipulator
+        durations = [job.elapsed for job in self.jobs if job.elapsed is not None]
+        report = {
+            'manifest': os.path.abspath(self.manifest_path),
+            'started': started.isoformat(timespec='seconds'),
+            'elapsed': round(elapsed, 3),
+            'workers': self.workers,
+            'concurrency': self.concurrency,
+            'success': success,
+            'counts': {status: sum(1 for job in self.jobs if job.status == status)
+                       for status in self.STATUS_LABELS if any(job.status == status for job in self.jobs)},
+            'jobs': [job.report() for job in self.jobs],
+        }
+        path = self.report_path or os.path.join(log_dir, 'report.json')
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, path)
+        except OSError as e:
+            manipulator.log(f"保存汇总报告失败: {e}")
+            path = None
+
+        manipulator.log("-" * 50)
+        manipulator.log("批量任务汇总")
+        for job in self.jobs:
+            duration = f"{job.elapsed:.1f} 秒" if job.elapsed is not None else "-"
+            manipulator.log(f"  {job.name}（{job.command}）: {self.STATUS_LABELS[job.status]}，{duration}")
+        counts = "，".join(f"{self.STATUS_LABELS[status]} {count} 个" for status, count in report['counts'].items())
+        manipulator.log(f"共 {len(self.jobs)} 个任务：{counts}")
+        if durations:
+            manipulator.log(f"总耗时 {elapsed:.1f} 秒（各任务耗时合计 {sum(durations):.1f} 秒，"
+                            f"最慢的任务 {max(durations):.1f} 秒）")
+        if path:
+            manipulator.log(f"汇总报告已保存: {path}")
+        manipulator.log("-" * 50)
@@ -0,0 +1 @@
+"""性能测量脚本（不随程序打包发布）"""
@@ -0,0 +1,215 @@
+"""
+合成模板目录生成器。
+
+生成与实际模板目录结构相同的测试数据：
+    <root>/
+        Analysis-0037/                 旧版本类别文件夹（每个只含一份A2、A5）
+        Analysis-0038/                 最新版本类别文件夹，流水线实际处理的文件夹
+            REC-Q680003-A2-01 LIMS数据迁移表单(Analysis-0038).docx
+            REC-Q680003-A5-01 LIMS主数据申请表（Analysis-0038）.docx
+            ~$temp.docx                Word 锁文件
+            证据/                      证据子文件夹（二进制文件，含嵌套子文件夹）
+        Analysis-0038.docx             封面文件
+        ...
+
+文档直接写入 word/document.xml，其余部件（样式、主题等）取自 python-docx 的默认模板并只压缩一次，
+生成数万个文档也只需几十秒。
+
+用法:
+    python -m benchmark.corpus D:/bench/src --documents 1000 --a2-rows 50
+"""
+import io
+import os
+import sys
+import math
+import argparse
+import zipfile
+from xml.sax.saxutils import escape
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from file_utils import FileUtils
+
+_DOCUMENT_XML = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<w:body>{body}<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1800" w:bottom="1440" w:left="1800" w:header="720" '
+    'w:footer="720" w:gutter="0"/></w:sectPr></w:body></w:document>'
+)
+
+
+class CorpusGenerator:
+    """
+    合成模板目录生成器。
+
+    参数:
+        documents: 最新版本类别文件夹中A2、A5文档的总数（10 ~ 50000），流水线各步骤处理的就是这些文档
+        categories: 类别数量，类别名称取自 FileUtils.head_list（最多与 head_list 长度相同）
+        versions: 每个类别的版本数，只有最新版本会被流水线复制
+        a2_rows, a5_rows: A2、A5数据表格的行数
+        evidence_files, evidence_kb: 每个证据文件夹中的文件数及每个文件的大小
+    """
+
+    def __init__(self, documents: int = 100, categories: int = None, versions: int = 2,
+                 a2_rows: int = 20, a5_rows: int = 10, evidence_files: int = 2, evidence_kb: int = 64,
+                 seed: int = 0):
+        if not 10 <= documents <= 50000:
+            raise ValueError("documents 必须在 10 ~ 50000 之间")
+        head_list = FileUtils.head_list
+        self.categories = list(head_list[:categories or len(head_list)])
+        # 文档总数较少时减少类别数量，保证每个类别至少有一份A2和A5
+        self.categories = self.categories[:max(1, min(len(self.categories), documents // 2))]
+        self.documents = documents
+        self.versions = max(1, versions)
+        self.a2_rows = a2_rows
+        self.a5_rows = a5_rows
+        self.evidence_files = evidence_files
+        self.evidence_kb = evidence_kb
+        self.seed = seed
+        self._template = None
+
+    def _base_package(self) -> bytes:
+        """python-docx 默认模板中除 document.xml 以外的部件（只压缩一次）"""
+        if self._template is None:
+            import docx
+            template_path = os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(template_path) as src, \
+                    zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as dst:
+                for info in src.infolist():
+                    if info.filename != 'word/document.xml':
+                        dst.writestr(info.filename, src.read(info.filename))
+            self._template = buffer.getvalue()
+        return self._template
+
+    def _write_docx(self, path: str, body: str):
+        buffer = io.BytesIO(self._base_package())
+        with zipfile.ZipFile(buffer, 'a', zipfile.ZIP_DEFLATED) as package:
+            package.writestr('word/document.xml', _DOCUMENT_XML.format(body=body))
+        with open(path, 'wb') as f:
+            f.write(buffer.getvalue())
+
+    @staticmethod
+    def _table(rows: list, widths: list = None) -> str:
+        """生成表格XML，rows 为单元格文本的二维列表"""
+        cols = max(len(row) for row in rows)
+        widths = widths or [9000 // cols] * cols
+        grid = ''.join(f'<w:gridCol w:w="{w}"/>' for w in widths)
+        parts = ['<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/></w:tblPr>',
+                 f'<w:tblGrid>{grid}</w:tblGrid>']
+        for row in rows:
+            parts.append('<w:tr>')
+            for c, text in enumerate(row):
+                run = f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r>' if text else ''
+                parts.append(f'<w:tc><w:tcPr><w:tcW w:w="{widths[c]}" w:type="dxa"/></w:tcPr>'
+                             f'<w:p>{run}</w:p></w:tc>')
+            parts.append('</w:tr>')
+        parts.append('</w:tbl><w:p/>')
+        return ''.join(parts)
+
+    def cover_body(self, title: str) -> str:
+        return self._table([["LIMS主数据迁移"], ["数据包"], [title]])
+
+    def a2_body(self, package_name: str) -> str:
+        header = self._table([["数据包名称", package_name]])
+        rows = [["序号", "类型", "记录名称", "验证环境迁移日期", "正式环境迁移日期"]]
+        for r in range(1, self.a2_rows + 1):
+            rows.append([str(r), "Master Data", f"{package_name} 记录 {r:04d}", "2024.01.01", "2024.02.01"])
+        rows.append(["备注", "", "", "", ""])
+        return header + self._table(rows)
+
+    def a5_body(self, package_name: str) -> str:
+        category = package_name[:-5]
+        info = [["数据包", "", package_name]]
+        info += [[f"第{r}行", "", ""] for r in range(1, 5)]
+        info += [[f"理由：{package_name} 主数据变更"], ["附件", "", ""], [f"相关文件：{package_name} 说明"]]
+        info = [row + [""] * (3 - len(row)) for row in info]
+        records = [["数据包", "记录名称", "操作类型", "分类", "关键性"]]
+        for r in range(1, self.a5_rows + 1):
+            records.append([category, f"记录 {r:04d}", "新增", "主数据", "高" if r % 3 == 0 else "低"])
+        return self._table(info) + self._table([["说明"]]) + self._table(records)
+
+    def _write_evidence(self, folder: str, rng):
+        evidence = os.path.join(folder, "证据")
+        nested = os.path.join(evidence, "截图")
+        os.makedirs(nested, exist_ok=True)
+        for i in range(self.evidence_files):
+            target = evidence if i % 2 == 0 else nested
+            with open(os.path.join(target, f"evidence_{i:03d}.bin"), 'wb') as f:
+                f.write(rng.randbytes(self.evidence_kb * 1024))
+
+    def generate(self, root: str) -> dict:
+        """
+        生成模板目录。
+
+        返回:
+            dict: 生成的文件数量统计
+        """
+        import random
+        rng = random.Random(self.seed)
+        os.makedirs(root, exist_ok=True)
+
+        latest = 38
+        per_category = math.ceil(self.documents / 2 / len(self.categories))
+        remaining = self.documents
+        stats = {'categories': len(self.categories), 'documents': 0, 'old_documents': 0, 'covers': 0,
+                 'evidence_files': 0, 'bytes': 0}
+
+        for category in self.categories:
+            for version in range(latest - self.versions + 1, latest + 1):
+                name = f"{category}-{version:04d}"
+                folder = os.path.join(root, name)
+                os.makedirs(folder, exist_ok=True)
+
+                if version == latest:
+                    count = min(per_category, math.ceil(remaining / 2))
+                    remaining -= count * 2
+                else:
+                    count = 1
+
+                for k in range(1, count + 1):
+                    self._write_docx(os.path.join(folder, f"REC-Q680003-A2-{k:02d} LIMS数据迁移表单({name}).docx"),
+                                     self.a2_body(f"LIMS-{name}"))
+                    self._write_docx(os.path.join(folder, f"REC-Q680003-A5-{k:02d} LIMS主数据申请表（{name}）.docx"),
+                                     self.a5_body(name))
+                    stats['documents' if version == latest else 'old_documents'] += 2
+
+                with open(os.path.join(folder, "~$temp.docx"), 'wb') as f:
+                    f.write(b'lock')
+                self._write_evidence(folder, rng)
+                stats['evidence_files'] += self.evidence_files
+
+            cover_name = f"{category}-{latest:04d}"
+            self._write_docx(os.path.join(root, f"{cover_name}.docx"), self.cover_body(cover_name))
+            stats['covers'] += 1
+
+        for dirpath, _, filenames in os.walk(root):
+            stats['bytes'] += sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames)
+        return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="生成合成模板目录")
+    parser.add_argument('root', help="输出目录")
+    parser.add_argument('--documents', type=int, default=100, help="最新版本中A2、A5文档总数（10 ~ 50000）")
+    parser.add_argument('--categories', type=int, help="类别数量（默认使用全部 head_list）")
+    parser.add_argument('--versions', type=int, default=2, help="每个类别的版本数")
+    parser.add_argument('--a2-rows', type=int, default=20, help="A2数据表格行数")
+    parser.add_argument('--a5-rows', type=int, default=10, help="A5数据表格行数")
+    parser.add_argument('--evidence-files', type=int, default=2, help="每个证据文件夹中的文件数")
+    parser.add_argument('--evidence-kb', type=int, default=64, help="每个证据文件的大小(KB)")
+    args = parser.parse_args(argv)
+
+    generator = CorpusGenerator(args.documents, args.categories, args.versions, args.a2_rows,
+                                args.a5_rows, args.evidence_files, args.evidence_kb)
+    stats = generator.generate(args.root)
+    print(stats)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
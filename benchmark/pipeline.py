@@ -0,0 +1,293 @@
+"""
+流水线各步骤的性能测试。
+
+生成（或使用已有的）合成模板目录，依次单独计时以下步骤，每个步骤在独立的子进程中运行，
+以便分别统计峰值内存：
+    cp_files, del_files, ren_files, edt_docx      原有的四步文件生成流程
+    execute_operations                             计划后一次遍历的文件生成流程（输出到另一目录）
+    edt_A2_docx, read_A2_to_csv, read_A5_to_csv    日期设置和数据导出
+
+每个步骤报告耗时、吞吐量、峰值内存以及单项耗时的百分位数。单项以步骤的进度报告为单位：
+del/ren_files 为类别文件夹，其余步骤为单个文件或文档。结果保存为JSON，可用 compare 对比两次运行。
+
+用法:
+    python -m benchmark.pipeline run --documents 1000 --output result.json
+    python -m benchmark.pipeline run --corpus D:/bench/src --stages read_A2_to_csv read_A5_to_csv --workers 4
+    python -m benchmark.pipeline compare before.json after.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import datetime
+import multiprocessing
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+STAGES = ('cp_files', 'del_files', 'ren_files', 'edt_docx', 'execute_operations',
+          'edt_A2_docx', 'read_A2_to_csv', 'read_A5_to_csv')
+
+# 各步骤进度报告的单位
+STAGE_UNITS = {
+    'cp_files': 'file', 'del_files': 'folder', 'ren_files': 'folder', 'edt_docx': 'document',
+    'execute_operations': 'file', 'edt_A2_docx': 'document',
+    'read_A2_to_csv': 'document', 'read_A5_to_csv': 'document',
+}
+
+# 步骤子进程返回结果后等待其退出的最长时间（秒）
+STAGE_EXIT_TIMEOUT = 30.0
+
+
+def peak_rss_bytes():
+    """当前进程的峰值内存（字节），无法获取时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def percentiles(samples: list) -> dict:
+    """单项耗时（毫秒）的统计值，百分位数按最近秩计算"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+    return {
+        'count': len(ordered),
+        'mean': round(sum(ordered) / len(ordered), 3),
+        'p50': round(rank(50), 3),
+        'p90': round(rank(90), 3),
+        'p99': round(rank(99), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def count_documents(root: str) -> int:
+    count = 0
+    for _, _, files in os.walk(root):
+        count += sum(1 for f in files if f.endswith('.docx') and not f.startswith('~$'))
+    return count
+
+
+def _run_stage(stage: str, paths: dict, options: dict, conn):
+    """在子进程中执行一个步骤，并通过 conn 返回测量结果"""
+    from file_manipulator import FileManipulator, shutdown_shared_executors
+
+    progress = []
+    log_lines = [0]
+
+    def on_log(message):
+        log_lines[0] += 1
+
+    def on_progress(current, total):
+        progress.append((time.perf_counter(), total))
+
+    src, tgt = paths['source'], paths['target']
+    if stage == 'execute_operations':
+        tgt = paths['plan_target']
+    manipulator = FileManipulator(src if stage in ('cp_files', 'execute_operations') else "",
+                                  tgt, {}, on_log, on_progress)
+    jobs = {
+        'cp_files': lambda: manipulator.cp_files(options['copy_workers']),
+        'del_files': manipulator.del_files,
+        'ren_files': manipulator.ren_files,
+        'edt_docx': lambda: manipulator.edt_docx(options['edit_workers']),
+        'execute_operations': lambda: manipulator.execute_operations(options['edit_workers'],
+                                                                     options['copy_workers']),
+        'edt_A2_docx': lambda: manipulator.edt_A2_docx(tgt, "2025.05.05", "2025.06.06", options['edit_workers']),
+        'read_A2_to_csv': lambda: manipulator.read_A2_to_csv(
+            paths['csv'], options['workers'], options['backend'], options['cache_path']),
+        'read_A5_to_csv': lambda: manipulator.read_A5_to_csv(
+            paths['csv'], options['workers'], options['backend'], options['cache_path']),
+    }
+
+    error = None
+    start = time.perf_counter()
+    try:
+        success = bool(jobs[stage]())
+    except Exception as e:
+        success = False
+        error = repr(e)
+    elapsed = time.perf_counter() - start
+    # 修改文档的共享进程池不计入步骤耗时，在子进程退出前关闭
+    shutdown_shared_executors()
+
+    # 相邻两次进度报告的间隔即单项耗时
+    stamps = [start] + [stamp for stamp, _ in progress]
+    latencies = [(b - a) * 1000 for a, b in zip(stamps, stamps[1:])]
+    items = progress[-1][1] if progress else 0
+
+    conn.send({
+        'stage': stage,
+        'success': success,
+        'error': error,
+        'elapsed_s': round(elapsed, 4),
+        'unit': STAGE_UNITS[stage],
+        'items': items,
+        'items_per_s': round(items / elapsed, 2) if elapsed > 0 else None,
+        'latency_ms': percentiles(latencies),
+        'log_lines': log_lines[0],
+        'peak_rss_bytes': peak_rss_bytes(),
+    })
+    conn.close()
+
+
+def run_stage(stage: str, paths: dict, options: dict) -> dict:
+    """在新的子进程中执行步骤（峰值内存只包含该步骤）"""
+    context = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_run_stage, args=(stage, paths, options, child_conn))
+    process.start()
+    child_conn.close()
+    try:
+        result = parent_conn.recv()
+    except EOFError:
+        result = {'stage': stage, 'success': False, 'error': f"子进程异常退出（{process.exitcode}）"}
+    process.join(STAGE_EXIT_TIMEOUT)
+    if process.is_alive():
+        # 已返回结果但子进程无法退出（例如仍有未关闭的进程池），结束子进程并标记为失败
+        process.kill()
+        process.join()
+        result['success'] = False
+        result['error'] = f"子进程在返回结果后 {STAGE_EXIT_TIMEOUT:.0f} 秒内未退出"
+    return result
+
+
+def run(args) -> int:
+    from benchmark.corpus import CorpusGenerator
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='docop_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+    paths = {
+        'source': args.corpus or os.path.join(work_dir, 'src'),
+        'target': os.path.join(work_dir, 'tgt'),
+        'plan_target': os.path.join(work_dir, 'tgt_plan'),
+        'csv': os.path.join(work_dir, 'csv'),
+    }
+    for key in ('target', 'plan_target', 'csv'):
+        shutil.rmtree(paths[key], ignore_errors=True)
+    os.makedirs(paths['csv'])
+
+    corpus = None
+    if not args.corpus:
+        generator = CorpusGenerator(args.documents, args.categories, args.versions, args.a2_rows,
+                                    args.a5_rows, args.evidence_files, args.evidence_kb)
+        start = time.perf_counter()
+        corpus = generator.generate(paths['source'])
+        corpus['generate_s'] = round(time.perf_counter() - start, 3)
+        print(f"已生成合成模板目录: {paths['source']} {corpus}")
+
+    from file_manipulator import FileManipulator
+    options = {
+        'workers': FileManipulator.resolve_workers(args.workers),
+        'edit_workers': FileManipulator.resolve_workers(args.edit_workers),
+        'copy_workers': args.copy_workers,
+        'backend': args.backend,
+        'cache_path': os.path.join(work_dir, 'export_cache.sqlite3') if args.cache else None,
+    }
+    if options['cache_path'] and os.path.exists(options['cache_path']):
+        os.remove(options['cache_path'])
+
+    results = []
+    for stage in args.stages:
+        result = run_stage(stage, paths, options)
+        if stage in ('edt_docx', 'execute_operations'):
+            result['documents'] = count_documents(
+                paths['plan_target'] if stage == 'execute_operations' else paths['target'])
+        results.append(result)
+        latency = result.get('latency_ms', {})
+        print(f"{stage:<20} {result.get('elapsed_s', 0):>9.3f} s  "
+              f"{result.get('items', 0):>6} {result.get('unit', '')}  "
+              f"{result.get('items_per_s') or 0:>9.1f}/s  p50 {latency.get('p50', 0):>8.2f} ms  "
+              f"p99 {latency.get('p99', 0):>8.2f} ms  "
+              f"RSS {(result.get('peak_rss_bytes') or 0) / 1048576:>7.1f} MiB"
+              + ("" if result.get('success') else f"  失败 {result.get('error') or ''}"))
+
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'corpus': corpus or {'path': paths['source'], 'documents': count_documents(paths['source'])},
+        'options': {'workers': options['workers'], 'edit_workers': options['edit_workers'],
+                    'copy_workers': args.copy_workers, 'backend': options['backend'], 'cache': bool(args.cache)},
+        'stages': results,
+    }
+    output = args.output or f"bench_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+
+    if not args.keep and not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0 if all(r.get('success') for r in results) else 1
+
+
+def compare(args) -> int:
+    """对比两次运行结果中各步骤的耗时和峰值内存"""
+    with open(args.before, encoding='utf-8') as f:
+        before = {r['stage']: r for r in json.load(f)['stages']}
+    with open(args.after, encoding='utf-8') as f:
+        after = {r['stage']: r for r in json.load(f)['stages']}
+
+    print(f"{'步骤':<20} {'之前(s)':>10} {'之后(s)':>10} {'加速比':>8} {'内存变化(MiB)':>14}")
+    for stage in [s for s in STAGES if s in before and s in after]:
+        old, new = before[stage], after[stage]
+        speedup = old['elapsed_s'] / new['elapsed_s'] if new.get('elapsed_s') else float('nan')
+        rss_delta = ((new.get('peak_rss_bytes') or 0) - (old.get('peak_rss_bytes') or 0)) / 1048576
+        print(f"{stage:<20} {old['elapsed_s']:>10.3f} {new['elapsed_s']:>10.3f} {speedup:>7.2f}x {rss_delta:>+14.1f}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="流水线性能测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('run', help="执行性能测试")
+    p.add_argument('--corpus', help="使用已有的模板目录（不生成合成数据）")
+    p.add_argument('--work-dir', help="工作目录（默认使用临时目录，测试完成后删除）")
+    p.add_argument('--keep', action='store_true', help="保留临时工作目录")
+    p.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help="要测试的步骤")
+    p.add_argument('--documents', type=int, default=200, help="A2、A5文档总数（10 ~ 50000）")
+    p.add_argument('--categories', type=int, help="类别数量（默认使用全部 head_list）")
+    p.add_argument('--versions', type=int, default=2, help="每个类别的版本数")
+    p.add_argument('--a2-rows', type=int, default=20, help="A2数据表格行数")
+    p.add_argument('--a5-rows', type=int, default=10, help="A5数据表格行数")
+    p.add_argument('--evidence-files', type=int, default=2, help="每个证据文件夹中的文件数")
+    p.add_argument('--evidence-kb', type=int, default=64, help="每个证据文件的大小(KB)")
+    p.add_argument('--workers', type=int, default=1, help="导出并行进程数，0表示使用全部CPU核心")
+    p.add_argument('--edit-workers', type=int, default=1, help="修改文档（edt_docx、execute_operations、edt_A2_docx）的并行进程数，0表示使用全部CPU核心")
+    p.add_argument('--copy-workers', type=int, default=0, help="复制文件（cp_files、execute_operations）的并行线程数，0表示自动")
+    p.add_argument('--backend', choices=('xml', 'docx'), default='xml', help="导出时的文档解析方式")
+    p.add_argument('--cache', action='store_true', help="导出时使用增量缓存（缓存位于工作目录）")
+    p.add_argument('--output', help="结果JSON文件路径")
+    p.set_defaults(handler=run)
+
+    p = subparsers.add_parser('compare', help="对比两次运行结果")
+    p.add_argument('before')
+    p.add_argument('after')
+    p.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+启动时间报告。
+
+在独立的子进程中以 `python -X importtime` 导入各入口模块，汇总每个模块的导入耗时，
+列出耗时最多的依赖，并检查 python-docx、lxml 等重型模块是否在启动时被导入。
+
+用法:
+    python -m benchmark.startup                 # 默认测量 gui、cli、file_manipulator
+    python -m benchmark.startup gui --top 20
+    python -m benchmark.startup --window        # 额外测量创建主窗口的耗时（无界面运行）
+    python -m benchmark.startup --json          # 以JSON输出
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动阶段不应导入的重型模块（应在第一次处理文档时才导入）
+HEAVY_MODULES = ('docx', 'lxml.etree', 'csv', 'sqlite3', 'concurrent.futures.process')
+
+_WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+from gui import FileManagerApp
+app = QApplication([])
+window = FileManagerApp()
+window.show()
+app.processEvents()
+print(round((time.perf_counter() - start) * 1000, 1))
+window.close()
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """解析 -X importtime 输出，返回 (模块名, 自身耗时us, 累计耗时us) 列表"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头行
+        records.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return records
+
+
+def measure_import(module: str) -> dict:
+    """在子进程中导入模块并返回导入耗时报告"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+    records = parse_importtime(result.stderr)
+    imported = {name for name, _, _ in records}
+    total = next((cumulative for name, _, cumulative in reversed(records) if name == module), 0)
+    return {
+        'module': module,
+        'total_ms': round(total / 1000, 1),
+        'modules': len(records),
+        'heavy_imported': [name for name in HEAVY_MODULES if name in imported],
+        'top': [
+            {'module': name, 'self_ms': round(self_us / 1000, 1), 'cumulative_ms': round(cumulative / 1000, 1)}
+            for name, self_us, cumulative in sorted(records, key=lambda r: r[2], reverse=True)
+            if name != module
+        ],
+    }
+
+
+def measure_window() -> float:
+    """在子进程中（无界面平台）创建并显示主窗口，返回耗时毫秒数"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    result = subprocess.run([sys.executable, '-c', _WINDOW_SCRIPT],
+                            cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"创建主窗口失败:\n{result.stderr[-2000:]}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="入口模块导入耗时报告")
+    parser.add_argument('modules', nargs='*', default=['gui', 'cli', 'file_manipulator'])
+    parser.add_argument('--top', type=int, default=10, help="列出耗时最多的依赖模块数量")
+    parser.add_argument('--window', action='store_true', help="测量创建主窗口的耗时")
+    parser.add_argument('--json', action='store_true', help="以JSON输出")
+    args = parser.parse_args(argv)
+
+    reports = [measure_import(module) for module in args.modules]
+    for report in reports:
+        report['top'] = report['top'][:args.top]
+    window_ms = measure_window() if args.window else None
+
+    if args.json:
+        print(json.dumps({'imports': reports, 'window_ms': window_ms}, ensure_ascii=False, indent=2))
+        return 0
+
+    for report in reports:
+        print(f"{report['module']}: {report['total_ms']} ms，共导入 {report['modules']} 个模块")
+        heavy = ', '.join(report['heavy_imported']) or '无'
+        print(f"  启动时导入的重型模块: {heavy}")
+        for item in report['top']:
+            print(f"  {item['cumulative_ms']:>8} ms  (自身 {item['self_ms']:>6} ms)  {item['module']}")
+    if window_ms is not None:
+        print(f"创建主窗口: {window_ms} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+命令行入口（不依赖PyQt5），用于计划任务或脚本批量执行。
+
+用法示例:
+    python cli.py generate --source D:/模板 --target D:/生成
+    python cli.py set-dates --target D:/生成 --val-date 2025.05.05 --prod-date 2025.06.06
+    python cli.py export-a2 --source D:/生成 --output D:/csv
+    python cli.py export-a5 --source D:/生成 --output D:/csv --workers 4
+    python cli.py export-a2 --source D:/生成 --output D:/parquet --format parquet
+    python cli.py export-finalize --output D:/csv
+    python cli.py watch-export --source D:/生成 --output D:/csv
+    python cli.py batch --manifest D:/wave1.json --workers 8
+    python cli.py tree --path D:/生成
+    python cli.py --trace D:/trace.json generate --source D:/模板 --target D:/生成
+
+标准输出为JSON Lines，每行一个事件：
+    {"event": "log", "message": ...}
+    {"event": "progress", "current": 3, "total": 10}
+    {"event": "result", "command": ..., "success": true, "elapsed": 1.23}
+
+退出码: 0 成功，1 操作失败，2 参数错误，130 已取消（收到 Ctrl+C / SIGTERM）
+"""
+import io
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import contextlib
+import multiprocessing
+
+from file_utils import FileUtils
+from file_manipulator import FileManipulator, shutdown_shared_executors
+from tracer import Tracer
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+
+class JsonLinesReporter:
+    """将日志、进度和结果以JSON Lines格式写入输出流（线程安全）"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        record = {'event': event, 'time': round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def log(self, message):
+        self.emit('log', message=str(message))
+
+    def progress(self, current: int, total: int):
+        self.emit('progress', current=current, total=total)
+
+
+class _PrintToLog(io.TextIOBase):
+    """把 print 输出转换为日志事件，保证标准输出中只有JSON行"""
+
+    def __init__(self, reporter: JsonLinesReporter):
+        self.reporter = reporter
+        self._buffer = ''
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer += text
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            if line:
+                self.reporter.log(line)
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self.reporter.log(self._buffer)
+            self._buffer = ''
+
+
+def _export_options(args, config):
+    """导出命令的进程数、解析方式、缓存路径、是否压缩、是否断点续写、输出格式和是否预检查（命令行参数优先，其次为配置文件）"""
+    workers = args.workers if args.workers is not None else config.get('export_workers', 0)
+    backend = args.backend or config.get('read_backend', 'xml')
+    use_cache = config.get('export_cache', True) and not args.no_cache
+    cache_path = FileUtils.get_export_cache_path() if use_cache else None
+    compress = args.gzip or bool(config.get('export_compress', False))
+    resume = bool(config.get('export_resume', True)) and not getattr(args, 'no_resume', False)
+    fmt = args.format or config.get('export_format', 'csv')
+    sniff = bool(config.get('export_sniff', True)) and not args.no_sniff
+    return FileManipulator.resolve_workers(workers), backend, cache_path, compress, resume, fmt, sniff
+
+
+def _edit_workers(args, config) -> int:
+    """修改文档时的并行进程数（命令行参数优先，其次为配置文件）"""
+    workers = args.workers if args.workers is not None else config.get('edit_workers', 0)
+    return FileManipulator.resolve_workers(workers)
+
+
+def _require_dir(reporter: JsonLinesReporter, path: str, label: str) -> bool:
+    if not path:
+        reporter.emit('error', message=f"未指定{label}")
+        return False
+    if not os.path.isdir(path):
+        reporter.emit('error', message=f"{label}不存在: {path}")
+        return False
+    return True
+
+
+def run_generate(args, config, reporter):
+    source = args.source or config.get('default_old_path', '')
+    target = args.target or config.get('default_new_path', '')
+    if not _require_dir(reporter, source, "源文件夹"):
+        return None, None
+    if not target:
+        reporter.emit('error', message="未指定目标文件夹")
+        return None, None
+    manipulator = FileManipulator(source, target, {}, reporter.log, reporter.progress)
+    workers = _edit_workers(args, config)
+    copy_workers = args.copy_workers if args.copy_workers is not None else config.get('copy_workers', 0)
+    resume = bool(config.get('generate_resume', True)) and not args.no_resume
+    if config.get('numbering_registry', False) or args.numbering or args.rescan_numbers:
+        from numbering_registry import NumberingRegistry
+
+        manipulator.numbering = NumberingRegistry(FileUtils.get_numbering_registry_path(), args.rescan_numbers)
+    return manipulator, lambda: manipulator.execute_operations(workers, copy_workers, resume)
+
+
+def run_set_dates(args, config, reporter):
+    target = args.target or config.get('default_new_path', '')
+    if not _require_dir(reporter, target, "目标文件夹"):
+        return None, None
+    manipulator = FileManipulator("", target, {}, reporter.log, reporter.progress)
+    workers = _edit_workers(args, config)
+    return manipulator, lambda: manipulator.edt_A2_docx(target, args.val_date, args.prod_date or '', workers)
+
+
+def run_export(reader_name):
+    def run(args, config, reporter):
+        if not _require_dir(reporter, args.source, "源文档目录"):
+            return None, None
+        os.makedirs(args.output, exist_ok=True)
+        workers, backend, cache_path, compress, resume, fmt, sniff = _export_options(args, config)
+        # str_newpath 在 FileManipulator 中代表要处理的目录
+        manipulator = FileManipulator("", args.source, {}, reporter.log, reporter.progress)
+        export = manipulator.read_A2_to_csv if reader_name == 'A2' else manipulator.read_A5_to_csv
+        return manipulator, lambda: export(args.output, workers, backend, cache_path, compress, resume, fmt, sniff)
+    return run
+
+
+def run_watch_export(args, config, reporter):
+    if not _require_dir(reporter, args.source, "源文档目录"):
+        return None, None
+    workers, backend, cache_path, compress, _, fmt, sniff = _export_options(args, config)
+    manipulator = FileManipulator("", args.source, {}, reporter.log, reporter.progress)
+    kinds = ('A2', 'A5') if args.kinds == 'all' else (args.kinds.upper(),)
+    return manipulator, lambda: manipulator.watch_exports(args.output, kinds, workers, backend, cache_path,
+                                                          compress, fmt, sniff, args.poll, args.interval)
+
+
+def run_batch(args, config, reporter):
+    from batch_runner import BatchRunner
+
+    if not os.path.isfile(args.manifest):
+        reporter.emit('error', message=f"任务清单不存在: {args.manifest}")
+        return None, None
+    manipulator = FileManipulator("", "", {}, reporter.log, reporter.progress)
+    workers = args.workers if args.workers is not None else config.get('batch_workers', 0)
+    runner = BatchRunner(manipulator, args.manifest, config, workers, args.jobs or 0, args.report)
+    # 清单无效属于参数错误（退出码 2），在执行任何任务之前检查
+    try:
+        runner.prepare()
+    except (OSError, ValueError) as e:
+        reporter.emit('error', message=f"任务清单无效: {e}")
+        return None, None
+    return manipulator, runner.run
+
+
+def run_export_finalize(args, config, reporter):
+    if not _require_dir(reporter, args.output, "CSV输出目录"):
+        return None, None
+    manipulator = FileManipulator("", args.output, {}, reporter.log, reporter.progress)
+
+    def job():
+        from csv_stream import CsvStreamWriter
+
+        finished = CsvStreamWriter.finalize_pending(args.output)
+        for path, rows in finished:
+            reporter.log(f"已完成: {path}（{rows} 条数据）" if rows else f"没有已导出的数据，已删除: {path}.partial")
+        if not finished:
+            reporter.log("没有未完成的导出文件")
+        return True
+    return manipulator, job
+
+
+def run_tree(args, config, reporter):
+    if not _require_dir(reporter, args.path, "目录"):
+        return None, None
+    manipulator = FileManipulator("", args.path, {}, reporter.log, reporter.progress)
+
+    def job():
+        reporter.emit('tree', path=args.path, tree=manipulator.get_directory_tree(args.path))
+        return True
+    return manipulator, job
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description="LIMS迁移文档处理工具（命令行版）")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="记录各步骤和每个文档的耗时，结束时输出统计表并将 Chrome trace JSON 写入 FILE"
+                             "（配置中 trace 为 true 时默认写入 logs 目录）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('generate', help="生成新版本文件（复制、重命名并修改文档）")
+    p.add_argument('--source', help="源文件夹（默认使用配置中的 default_old_path）")
+    p.add_argument('--target', help="目标文件夹（默认使用配置中的 default_new_path）")
+    p.add_argument('--workers', type=int, help="修改文档的并行进程数，0表示使用全部CPU核心（默认使用配置）")
+    p.add_argument('--copy-workers', type=int, help="复制文件的并行线程数，0表示自动（默认使用配置）")
+    p.add_argument('--no-resume', action='store_true',
+                   help="不继续上次中断的生成，将已存在的目标文件夹重命名后重新生成")
+    p.add_argument('--numbering', action='store_true',
+                   help="由编号登记表分配新编号，多个任务同时生成时编号不重复（默认使用配置中的 numbering_registry）")
+    p.add_argument('--rescan-numbers', action='store_true',
+                   help="重新扫描源文件夹并更新编号登记表（同时启用编号登记表）")
+    p.set_defaults(handler=run_generate)
+
+    p = subparsers.add_parser('set-dates', help="批量修改A2文档中的迁移日期")
+    p.add_argument('--target', help="要处理的目录（默认使用配置中的 default_new_path）")
+    p.add_argument('--val-date', required=True, help="验证环境迁移日期")
+    p.add_argument('--prod-date', help="正式环境迁移日期（默认与验证环境相同）")
+    p.add_argument('--workers', type=int, help="修改文档的并行进程数，0表示使用全部CPU核心（默认使用配置）")
+    p.set_defaults(handler=run_set_dates)
+
+    for command, reader_name in (('export-a2', 'A2'), ('export-a5', 'A5')):
+        p = subparsers.add_parser(command, help=f"导出{reader_name}文档数据为CSV")
+        p.add_argument('--source', required=True, help="源文档目录")
+        p.add_argument('--output', required=True, help="CSV输出目录（不存在时自动创建）")
+        p.add_argument('--workers', type=int, help="并行进程数，0表示使用全部CPU核心（默认使用配置）")
+        p.add_argument('--backend', choices=('xml', 'docx'), help="文档解析方式（默认使用配置）")
+        p.add_argument('--no-cache', action='store_true', help="不使用增量导出缓存")
+        p.add_argument('--gzip', action='store_true', help="输出gzip压缩的CSV（.csv.gz）")
+        p.add_argument('--format', choices=('csv', 'parquet'), help="输出格式，parquet 需要安装 pyarrow（默认使用配置）")
+        p.add_argument('--no-resume', action='store_true', help="不继续上次中断的导出，重新导出全部文档")
+        p.add_argument('--no-sniff', action='store_true', help="不进行解析前的快速预检查，解析所有找到的文档")
+        p.set_defaults(handler=run_export(reader_name))
+
+    p = subparsers.add_parser('watch-export', help="监视源文档目录，文档变化时自动更新导出文件（Ctrl+C 停止）")
+    p.add_argument('--source', required=True, help="源文档目录")
+    p.add_argument('--output', required=True, help="输出目录，导出文件名固定为 A2_latest.csv 等（不存在时自动创建）")
+    p.add_argument('--kinds', choices=('all', 'a2', 'a5'), default='all', help="要导出的文档类型（默认全部）")
+    p.add_argument('--workers', type=int, help="并行进程数，0表示使用全部CPU核心（默认使用配置）")
+    p.add_argument('--backend', choices=('xml', 'docx'), help="文档解析方式（默认使用配置）")
+    p.add_argument('--no-cache', action='store_true', help="首次导出时不使用增量导出缓存")
+    p.add_argument('--gzip', action='store_true', help="输出gzip压缩的CSV（.csv.gz）")
+    p.add_argument('--format', choices=('csv', 'parquet'), help="输出格式，parquet 需要安装 pyarrow（默认使用配置）")
+    p.add_argument('--no-sniff', action='store_true', help="不进行解析前的快速预检查，解析所有找到的文档")
+    p.add_argument('--poll', action='store_true', help="定时扫描目录（默认在安装了 watchdog 时使用文件变化通知）")
+    p.add_argument('--interval', type=float, help="定时扫描的间隔秒数（默认2秒）")
+    p.set_defaults(handler=run_watch_export)
+
+    p = subparsers.add_parser('export-finalize', help="将中断的导出（.partial 文件）按已导出的部分转为最终CSV")
+    p.add_argument('--output', required=True, help="CSV输出目录")
+    p.set_defaults(handler=run_export_finalize)
+
+    p = subparsers.add_parser('batch', help="按任务清单（JSON/YAML）并行执行多个生成、设置日期和导出任务")
+    p.add_argument('--manifest', required=True, help="任务清单文件（.json，安装 PyYAML 后也可使用 .yaml）")
+    p.add_argument('--workers', type=int, help="所有任务共用的总进程数，0表示使用全部CPU核心（默认使用配置中的 batch_workers）")
+    p.add_argument('--jobs', type=int, help="最多同时执行的任务数（默认不超过总进程数）")
+    p.add_argument('--report', help="汇总报告（JSON）的保存路径（默认保存在 logs/batch_时间 目录）")
+    p.set_defaults(handler=run_batch)
+
+    p = subparsers.add_parser('tree', help="输出目录结构")
+    p.add_argument('--path', required=True, help="要显示的目录")
+    p.set_defaults(handler=run_tree)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    reporter = JsonLinesReporter(sys.stdout)
+
+    config = FileUtils.load_config()
+    FileUtils.head_list = config.get('head_list', FileUtils.head_list)
+    FileUtils.form_types = config.get('form_types', FileUtils.form_types)
+    FileUtils.save_backend = config.get('docx_save', FileUtils.save_backend)
+    FileUtils.template_cache_mb = config.get('template_cache_mb', FileUtils.template_cache_mb)
+
+    manipulator, job = args.handler(args, config, reporter)
+    if job is None:
+        reporter.emit('result', command=args.command, success=False, exit_code=EXIT_USAGE)
+        return EXIT_USAGE
+
+    trace_path = args.trace
+    if trace_path or config.get('trace', False):
+        manipulator.tracer = Tracer()
+        trace_path = trace_path or FileUtils.get_trace_path(args.command)
+
+    # Ctrl+C / SIGTERM 时在当前文件处理完成后停止，与界面上的"取消"相同
+    def request_cancel(signum, frame):
+        reporter.log("收到中断信号，正在取消...")
+        manipulator.cancel()
+
+    signal.signal(signal.SIGINT, request_cancel)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, request_cancel)
+
+    start = time.perf_counter()
+    capture = _PrintToLog(reporter)
+    try:
+        with contextlib.redirect_stdout(capture):
+            success = bool(job())
+    except Exception as e:
+        reporter.emit('error', message=f"执行过程中发生错误: {e}")
+        success = False
+    finally:
+        capture.flush()
+        manipulator.report_trace(trace_path)
+        # 关闭修改文档的共享进程池，否则进程退出时会等待其中的工作进程
+        shutdown_shared_executors()
+
+    if manipulator.is_cancelled():
+        exit_code = EXIT_CANCELLED
+    else:
+        exit_code = EXIT_OK if success else EXIT_FAILED
+    reporter.emit('result', command=args.command, success=success, exit_code=exit_code,
+                  elapsed=round(time.perf_counter() - start, 3))
+    return exit_code
+
+
+if __name__ == "__main__":
+    # 打包为exe后，进程池的子进程需要此调用才能正确启动
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,308 @@
+import io
+import os
+import csv
+import glob
+import gzip
+import json
+import time
+
+
+class CsvStreamWriter:
+    """
+    按文档逐个写入的流式CSV输出（可选gzip压缩），支持断点续写。
+
+    数据先写入 <输出文件>.partial，每写入 FLUSH_ROWS 行或每隔 FLUSH_INTERVAL 秒写出一个检查点：
+    刷新文件缓冲区，并在 <输出文件>.partial.jsonl 末尾追加一行，记录此时的文件长度、行数以及
+    自上一个检查点以来完整写入的文档（路径、大小、修改时间）。检查点日志第一行记录表头等信息。
+    全部写完后调用 finalize() 重命名为最终文件。内存中只保留尚未刷新的缓冲区和已写入文档的
+    路径集合，每个检查点只写入新增的文档。
+
+    进程中断后，partial 文件中检查点之前的内容都是完整的：可以用 resume() 截断到检查点后
+    跳过已写入的文档继续导出，也可以直接 finalize() 得到已导出部分的结果。日志最后一行可能
+    只写入了一部分，读取时忽略。中断后被修改或删除的文档，其数据已在 partial 文件中，
+    因此从包含它的检查点之前继续导出，之后的文档重新写入。
+
+    gzip 输出在每个检查点结束当前压缩成员并开始新的成员（多成员gzip，gzip、7-Zip 以及
+    Python 的 gzip 模块都能完整读取），因此截断到检查点后文件仍然有效。
+    """
+
+    PARTIAL_SUFFIX = '.partial'
+    CHECKPOINT_SUFFIX = '.partial.jsonl'
+    VERSION = 2
+    FLUSH_ROWS = 5000
+    FLUSH_INTERVAL = 2.0
+
+    def __init__(self, path: str, title: list = None, compress: bool = False, meta: dict = None,
+                 resumable: bool = True):
+        """
+        参数:
+            path: 最终输出文件路径
+            title: 表头，第一次写入数据时写在文件开头
+            compress: 是否写入gzip压缩的CSV
+            meta: 附加信息（例如源目录），保存在检查点中，用于判断能否继续导出
+            resumable: 为 False 时不写检查点日志，只在完成后把 partial 文件替换为最终文件
+                （每次整体重写的输出），中断后留下的 partial 文件不会被 pending_outputs 找到
+        """
+        self.path = path
+        self.title = list(title or [])
+        self.compress = compress
+        self.meta = dict(meta or {})
+        self.resumable = resumable
+        self.partial_path = path + self.PARTIAL_SUFFIX
+        self.checkpoint_path = path + self.CHECKPOINT_SUFFIX
+        self.rows = 0
+        self.done = set()   # 已写入检查点的文档
+        self.discarded = 0  # 继续导出时，因文档在中断后变化而需要重新写入的文档数
+        self._pending = []  # 已写入但尚未到达检查点的文档 [路径, 大小, 修改时间]
+        self._offset = 0    # 最后一个检查点处的文件长度
+        self._log = None
+        self._log_end = 0   # 继续导出时检查点日志中有效内容的长度
+        self._resumed = False
+        self._raw = None
+        self._member = None
+        self._text = None
+        self._writer = None
+        self._unflushed_rows = 0
+        self._last_flush = time.monotonic()
+
+    @classmethod
+    def resume(cls, path: str):
+        """
+        根据检查点恢复中断的输出，检查点不存在或无效时返回 None。
+
+        只读取检查点，第一次写入（或 finalize）时才会把 partial 文件截断到检查点。
+        检查点中的文档在中断后被修改或删除时，使用包含它的检查点之前的一个检查点。
+        """
+        writer = cls(path)
+        try:
+            with open(writer.checkpoint_path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('version') != cls.VERSION:
+                    return None
+                log_end = f.tell()
+                checkpoints = []
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 最后一行可能只写入了一部分
+                        break
+                    log_end += len(line)
+                    checkpoints.append((log_end, record))
+
+            kept = None
+            for index, (log_end, record) in enumerate(checkpoints):
+                if any(list(cls._file_state(key)) != [size, mtime] for key, size, mtime in record['done']):
+                    writer.discarded = sum(len(later['done']) for _, later in checkpoints[index:])
+                    break
+                writer.done.update(key for key, _, _ in record['done'])
+                kept = (log_end, record)
+            if kept is None:
+                return None
+            log_end, record = kept
+            if os.path.getsize(writer.partial_path) < record['offset']:
+                return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        writer.title = header.get('title', [])
+        writer.compress = bool(header.get('compress'))
+        writer.meta = header.get('meta', {})
+        writer.rows = record['rows']
+        writer._offset = record['offset']
+        writer._log_end = log_end
+        writer._resumed = True
+        return writer
+
+    @staticmethod
+    def _file_state(key: str) -> tuple:
+        """文档的 (大小, 修改时间ns)，文件不存在时为 (None, None)"""
+        try:
+            st = os.stat(key)
+        except (OSError, ValueError):
+            return None, None
+        return st.st_size, st.st_mtime_ns
+
+    @classmethod
+    def pending_outputs(cls, directory: str, prefix: str = None) -> list:
+        """目录中（以 prefix_ 开头）尚未完成的输出文件路径，最近修改的在前"""
+        name = f"{glob.escape(prefix)}_*" if prefix else "*"
+        pattern = os.path.join(glob.escape(directory), name + cls.CHECKPOINT_SUFFIX)
+        checkpoints = sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
+        return [path[:-len(cls.CHECKPOINT_SUFFIX)] for path in checkpoints]
+
+    @classmethod
+    def finalize_pending(cls, directory: str) -> list:
+        """
+        将目录中所有未完成的输出按检查点截断后转为最终文件。
+
+        返回:
+            (最终文件路径, 数据行数) 列表
+        """
+        results = []
+        for path in cls.pending_outputs(directory):
+            writer = cls.resume(path)
+            if writer is not None:
+                results.append((path, writer.finalize()))
+        return results
+
+    def write_document(self, key: str, rows: list) -> bool:
+        """
+        写入一个文档的所有数据行。
+
+        参数:
+            key: 文档标识（路径），用于断点续写时跳过已写入的文档
+            rows: 数据行列表
+
+        返回:
+            bool: 文档已在检查点中（已写入过）时返回 False
+        """
+        if key in self.done:
+            return False
+        if rows:
+            self._ensure_open()
+            self._writer.writerows(rows)
+            self.rows += len(rows)
+            self._unflushed_rows += len(rows)
+        self._pending.append([key, *self._file_state(key)])
+        if (self._unflushed_rows >= self.FLUSH_ROWS
+                or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL):
+            self.checkpoint()
+        return True
+
+    def checkpoint(self):
+        """把缓冲区写入文件并记录检查点"""
+        self._last_flush = time.monotonic()
+        self._unflushed_rows = 0
+        if self._raw is None:
+            return
+        if self.compress:
+            # 结束当前gzip成员，检查点处的文件是完整的gzip
+            self._end_segment()
+            self._raw.flush()
+            self._offset = self._raw.tell()
+            self._start_segment(first=False)
+        else:
+            self._text.flush()
+            self._raw.flush()
+            self._offset = self._raw.tell()
+        if self.resumable:
+            self._write_checkpoint()
+        self.done.update(key for key, _, _ in self._pending)
+        self._pending.clear()
+
+    def finalize(self) -> int:
+        """
+        写入剩余数据，并将 partial 文件重命名为最终文件。
+
+        返回:
+            int: 数据行数，没有数据时不生成文件并返回 0
+        """
+        if self._raw is None and self._resumed and os.path.exists(self.partial_path):
+            self._ensure_open()
+        if self._raw is None:
+            self._remove_partial()
+            return 0
+        self.checkpoint()
+        self._close()
+        os.replace(self.partial_path, self.path)
+        self._remove(self.checkpoint_path)
+        return self.rows
+
+    def abort(self, keep: bool = True) -> bool:
+        """
+        中止写入。
+
+        参数:
+            keep: 为 True 时保留 partial 文件和检查点，以便继续导出或 finalize；否则删除
+
+        返回:
+            bool: 是否保留了可继续的 partial 文件
+        """
+        if self._raw is not None:
+            if keep:
+                self.checkpoint()
+            self._close()
+        if not keep:
+            self._remove_partial()
+        return keep and os.path.exists(self.partial_path)
+
+    def _ensure_open(self):
+        if self._raw is not None:
+            return
+        if self._resumed:
+            # 丢弃最后一个检查点之后未完整写入的内容
+            self._raw = open(self.partial_path, 'r+b')
+            self._raw.seek(self._offset)
+            self._raw.truncate()
+            self._start_segment(first=False)
+        else:
+            self._raw = open(self.partial_path, 'wb')
+            self._start_segment(first=True)
+            if self.title:
+                self._writer.writerow(self.title)
+            # 表头之后的第一个检查点，续写时不会丢失BOM和表头
+            self.checkpoint()
+
+    def _start_segment(self, first: bool):
+        # utf-8-sig 只在文件开头写入BOM，后续gzip成员和续写部分不能重复写入
+        encoding = 'utf-8-sig' if first else 'utf-8'
+        if self.compress:
+            self._member = gzip.GzipFile(fileobj=self._raw, mode='wb', mtime=0)
+            self._text = io.TextIOWrapper(self._member, encoding=encoding, newline='')
+        else:
+            self._text = io.TextIOWrapper(self._raw, encoding=encoding, newline='')
+        self._writer = csv.writer(self._text)
+
+    def _end_segment(self):
+        self._text.flush()
+        self._text.detach()
+        if self._member is not None:
+            # GzipFile.close() 写入成员尾部，但不关闭传入的文件对象
+            self._member.close()
+            self._member = None
+        self._text = self._writer = None
+
+    def _close(self):
+        if self._text is not None:
+            self._end_segment()
+        self._raw.close()
+        self._raw = None
+        self._close_log()
+
+    def _close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _write_checkpoint(self):
+        if self._log is None:
+            if self._resumed:
+                # 丢弃日志中最后一个有效检查点之后的内容，再追加新的检查点
+                self._log = open(self.checkpoint_path, 'r+b')
+                self._log.truncate(self._log_end)
+                self._log.seek(self._log_end)
+            else:
+                self._log = open(self.checkpoint_path, 'wb')
+                header = {
+                    'version': self.VERSION,
+                    'path': self.path,
+                    'title': self.title,
+                    'compress': self.compress,
+                    'meta': self.meta,
+                }
+                self._log.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+        record = {'offset': self._offset, 'rows': self.rows, 'done': self._pending}
+        self._log.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._log.flush()
+
+    def _remove_partial(self):
+        self._close_log()
+        self._remove(self.partial_path)
+        self._remove(self.checkpoint_path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,135 @@
+from collections import deque
+
+_END = ''  # 前缀树中标记前缀结束的键（单个字符的键不会是空字符串）
+
+
+class DocumentRegistry:
+    """
+    根据文件名判断文档类型的分派表。
+
+    封面文件：文件名以 head_list 中任一前缀开头，使用前缀树匹配，耗时只与文件名长度有关，
+    与 head_list 的长度无关。
+    表单文档：文件名中包含 form_types 中的表单编号（例如 REC-Q680003-A2），所有编号编译为一个
+    多模式匹配自动机（在编号的前缀树上加入失配链接，即 Aho-Corasick），一次扫描文件名，耗时
+    只与文件名长度有关；同时包含多个编号时以 form_types 中靠前的为准。
+    每个表单编号对应一种处理方式（'A2' 或 'A5'），新的表单编号只需在配置中指定使用哪种处理方式。
+    """
+
+    COVER = 'cover'
+    HANDLERS = ('A2', 'A5')
+
+    def __init__(self, head_list: list, form_types: dict):
+        """
+        参数:
+            head_list: 封面文件名前缀列表
+            form_types: 表单编号 -> 处理方式（'A2' 或 'A5'）
+        """
+        # 配置的快照，用于判断配置是否变化（见 compiled_from）
+        self._sources = self._snapshot(head_list, form_types)
+
+        self._trie = {}
+        for head in head_list:
+            node = self._trie
+            for ch in head:
+                node = node.setdefault(ch, {})
+            node[_END] = True
+
+        self._forms = {}  # 表单编号 -> (优先级, 处理方式)
+        for code, handler in form_types.items():
+            if not code or handler not in self.HANDLERS:
+                print(f"忽略无效的表单类型配置: {code!r} -> {handler!r}")
+                continue
+            self._forms[code] = (len(self._forms), handler)
+
+        self._build_form_automaton()
+
+    def _build_form_automaton(self):
+        """
+        建立表单编号的匹配自动机：状态 i 的转移为 _goto[i]，失配时转到 _fail[i]，
+        _found[i] 为到达该状态时已匹配的编号中优先级最高的 (优先级, 处理方式)（包括失配链上的编号）。
+        """
+        goto, found = [{}], [None]
+        for code, entry in self._forms.items():
+            state = 0
+            for ch in code:
+                child = goto[state].get(ch)
+                if child is None:
+                    child = goto[state][ch] = len(goto)
+                    goto.append({})
+                    found.append(None)
+                state = child
+            found[state] = entry
+
+        # 按深度逐层计算失配链接，较浅的状态先完成
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                target = fail[state]
+                while target and ch not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target].get(ch, 0)
+                inherited = found[fail[child]]
+                if inherited is not None and (found[child] is None or inherited[0] < found[child][0]):
+                    found[child] = inherited
+                queue.append(child)
+
+        self._goto, self._fail, self._found = goto, fail, found
+
+    @staticmethod
+    def _snapshot(head_list: list, form_types: dict) -> tuple:
+        return tuple(head_list), tuple(form_types.items())
+
+    def compiled_from(self, head_list: list, form_types: dict) -> bool:
+        """是否由内容相同的 head_list 和 form_types 编译而来（原地修改列表元素也能发现）"""
+        return self._sources == self._snapshot(head_list, form_types)
+
+    def is_cover(self, name: str) -> bool:
+        """文件名是否以 head_list 中的某个前缀开头"""
+        node = self._trie
+        if _END in node:
+            return True
+        for ch in name:
+            node = node.get(ch)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    def form_handler(self, name: str):
+        """
+        文件名中表单编号对应的处理方式。
+
+        返回:
+            'A2'、'A5'；不包含任何表单编号时返回 None
+        """
+        goto, fail, found = self._goto, self._fail, self._found
+        state = 0
+        best = None
+        for ch in name:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            entry = found[state]
+            if entry is not None and (best is None or entry[0] < best[0]):
+                if entry[0] == 0:
+                    return entry[1]
+                best = entry
+        return best[1] if best else None
+
+    def classify(self, name: str):
+        """
+        文档类型：封面优先，其次为表单。
+
+        返回:
+            'cover'、'A2'、'A5'；不需要处理的文件返回 None
+        """
+        if self.is_cover(name):
+            return self.COVER
+        return self.form_handler(name)
+
+    def codes(self, handler: str) -> list:
+        """使用指定处理方式的表单编号"""
+        return [code for code, (_, h) in self._forms.items() if h == handler]
@@ -0,0 +1,248 @@
+import os
+import copy
+import struct
+import zipfile
+import tempfile
+import threading
+import posixpath
+import collections
+
+from lxml import etree
+from docx.oxml import parse_xml
+from docx.document import _Body
+
+PACKAGE_RELS = '_rels/.rels'
+DEFAULT_DOCUMENT_PART = 'word/document.xml'
+OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+# 本地文件头中文件名长度、扩展字段长度的位置（见 zipfile.structFileHeader）
+_FH_FILENAME_LENGTH = 10
+_FH_EXTRA_FIELD_LENGTH = 11
+# 通用标志位第3位：CRC和大小写在数据之后的数据描述符中
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+
+class PatchedDocument:
+    """
+    只加载正文部件的 .docx 文档。
+
+    打开时只解析主文档部件（word/document.xml），表格、段落、运行等对象仍然是 python-docx
+    的同名类，修改方式与 docx.Document 相同。保存时只重新序列化已加载的XML部件，
+    其余成员（样式、图片等媒体）按原始压缩数据逐字节复制，不解压也不重新压缩，
+    保存耗时只与XML的大小有关，与文档中嵌入的图片大小无关。
+
+    不支持需要访问样式、编号等其他部件的操作（例如设置段落样式）。
+    """
+
+    def __init__(self, path: str, document_part: str = None, element=None):
+        """
+        参数:
+            path: 文档路径，保存时从中复制未加载的成员
+            document_part, element: 已解析的主文档部件名和根元素（见 TemplateCache），为空时从 path 读取
+        """
+        self.path = path
+        self.part = None  # 没有加载 python-docx 的部件对象
+        self._parts = {}  # 已加载的部件名 -> 根元素
+        if element is None:
+            with zipfile.ZipFile(path) as package:
+                document_part = DocxPatcher.main_document_part(package)
+                element = parse_xml(package.read(document_part))
+        self.document_part = document_part
+        self._element = element
+        self._parts[self.document_part] = self._element
+        self._body = _Body(self._element.body, self)
+
+    @property
+    def element(self):
+        return self._element
+
+    @property
+    def tables(self):
+        """正文中的顶层表格（docx.table.Table 列表）"""
+        return self._body.tables
+
+    @property
+    def paragraphs(self):
+        return self._body.paragraphs
+
+    def part_element(self, part_name: str):
+        """
+        加载并返回其他XML部件（例如 'word/header1.xml'）的根元素。
+
+        加载过的部件在保存时会被重新写入，未加载的部件原样复制。
+        """
+        if part_name not in self._parts:
+            with zipfile.ZipFile(self.path) as package:
+                self._parts[part_name] = parse_xml(package.read(part_name))
+        return self._parts[part_name]
+
+    def save(self, path: str = None):
+        """保存到 path（默认覆盖原文件），通过临时文件和重命名原子地写入"""
+        replacements = {
+            name: etree.tostring(element, encoding='UTF-8', standalone=True)
+            for name, element in self._parts.items()
+        }
+        DocxPatcher.write_package(self.path, path or self.path, replacements)
+
+
+class TemplateCache:
+    """
+    模板文档的解析结果缓存（LRU，进程内）。
+
+    以 (路径, 文件大小, 修改时间) 识别文档，缓存主文档部件解析后的XML树。再次打开同一模板时
+    复制缓存的树（比解压并重新解析快数倍），修改复制得到的树不影响缓存；模板文件被修改后
+    自动重新解析。缓存的总大小按XML长度估算，超过 max_bytes 时淘汰最久未使用的文档。
+    """
+
+    # lxml 树占用的内存约为XML文本长度的数倍
+    MEMORY_FACTOR = 4
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()  # 绝对路径 -> (大小, 修改时间, 部件名, 根元素, 估计占用)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def open(self, path: str) -> PatchedDocument:
+        """打开文档，返回可以修改和保存的 PatchedDocument（内容与 DocxPatcher.open 相同）"""
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                document_part, element = entry[2], entry[3]
+            else:
+                self.misses += 1
+                document_part = element = None
+        if element is not None:
+            return PatchedDocument(path, document_part, copy.deepcopy(element))
+
+        with zipfile.ZipFile(path) as package:
+            document_part = DocxPatcher.main_document_part(package)
+            data = package.read(document_part)
+        element = parse_xml(data)
+        self._store(key, (st.st_size, st.st_mtime_ns, document_part, copy.deepcopy(element),
+                          len(data) * self.MEMORY_FACTOR))
+        return PatchedDocument(path, document_part, element)
+
+    def _store(self, key: str, entry: tuple):
+        cost = entry[4]
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[4]
+            if cost > self.max_bytes:
+                return
+            while self._entries and self._bytes + cost > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[4]
+                self.evictions += 1
+            self._entries[key] = entry
+            self._bytes += cost
+
+    def resize(self, max_bytes: int):
+        """修改缓存上限，超出部分立即淘汰"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._entries and self._bytes > max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[4]
+                self.evictions += 1
+
+    def summary(self) -> str:
+        return (f"模板缓存：命中 {self.hits} 次，未命中 {self.misses} 次，淘汰 {self.evictions} 个，"
+                f"当前 {len(self._entries)} 个文档（约 {self._bytes / 1048576:.1f} MiB）")
+
+
+class DocxPatcher:
+    """.docx 压缩包的局部重写工具"""
+
+    @staticmethod
+    def open(path: str) -> PatchedDocument:
+        return PatchedDocument(path)
+
+    @staticmethod
+    def main_document_part(package: zipfile.ZipFile) -> str:
+        """根据包关系(_rels/.rels)找到主文档部件名"""
+        try:
+            rels = etree.fromstring(package.read(PACKAGE_RELS))
+        except KeyError:
+            return DEFAULT_DOCUMENT_PART
+        for rel in rels.iter(f'{{{RELS_NS}}}Relationship'):
+            if rel.get('Type') == OFFICE_DOCUMENT_REL:
+                return posixpath.normpath(rel.get('Target', '').lstrip('/'))
+        return DEFAULT_DOCUMENT_PART
+
+    @staticmethod
+    def _read_raw(source, info: zipfile.ZipInfo) -> bytes:
+        """读取成员的原始（压缩后的）数据"""
+        source.seek(info.header_offset)
+        header = struct.unpack(zipfile.structFileHeader, source.read(zipfile.sizeFileHeader))
+        source.seek(header[_FH_FILENAME_LENGTH] + header[_FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+        return source.read(info.compress_size)
+
+    @staticmethod
+    def _copy_raw(target: zipfile.ZipFile, info: zipfile.ZipInfo, raw: bytes):
+        """把原始压缩数据作为新成员写入 target，不解压也不重新压缩"""
+        new_info = zipfile.ZipInfo(info.filename, info.date_time)
+        new_info.compress_type = info.compress_type
+        new_info.comment = info.comment
+        new_info.extra = info.extra
+        new_info.create_system = info.create_system
+        new_info.create_version = info.create_version
+        new_info.extract_version = info.extract_version
+        new_info.external_attr = info.external_attr
+        new_info.internal_attr = info.internal_attr
+        # CRC和大小已知，直接写入本地文件头，不使用数据描述符
+        new_info.flag_bits = info.flag_bits & ~_FLAG_DATA_DESCRIPTOR
+        new_info.CRC = info.CRC
+        new_info.compress_size = info.compress_size
+        new_info.file_size = info.file_size
+
+        new_info.header_offset = target.fp.tell()
+        target.fp.write(new_info.FileHeader())
+        target.fp.write(raw)
+        target.start_dir = target.fp.tell()
+        target.filelist.append(new_info)
+        target.NameToInfo[new_info.filename] = new_info
+
+    @staticmethod
+    def write_package(source_path: str, target_path: str, replacements: dict):
+        """
+        以 source_path 为基础写出新的 .docx：replacements 中的部件（部件名 -> XML字节）重新压缩写入，
+        其余成员按原始压缩数据复制。先写入同目录下的临时文件，完成后再替换 target_path。
+        """
+        target_dir = os.path.dirname(os.path.abspath(target_path))
+        fd, temp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(target_path)}.', suffix='.tmp', dir=target_dir)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file, open(source_path, 'rb') as source, \
+                    zipfile.ZipFile(source) as package, \
+                    zipfile.ZipFile(temp_file, 'w', zipfile.ZIP_DEFLATED) as target:
+                for info in package.infolist():
+                    if info.filename in replacements:
+                        new_info = zipfile.ZipInfo(info.filename, info.date_time)
+                        new_info.compress_type = zipfile.ZIP_DEFLATED
+                        new_info.external_attr = info.external_attr
+                        target.writestr(new_info, replacements[info.filename])
+                    else:
+                        DocxPatcher._copy_raw(target, info, DocxPatcher._read_raw(source, info))
+
+            # 临时文件默认只有当前用户可读写，保留原文件（或源文件）的权限
+            mode_source = target_path if os.path.exists(target_path) else source_path
+            try:
+                os.chmod(temp_path, os.stat(mode_source).st_mode & 0o7777)
+            except OSError:
+                pass
+            os.replace(temp_path, target_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,149 @@
+import zipfile
+from lxml import etree
+
+# WordprocessingML 命名空间
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+
+def _w(tag: str) -> str:
+    """返回带命名空间的标签名"""
+    return f'{{{W_NS}}}{tag}'
+
+
+W_BODY = _w('body')
+W_TBL = _w('tbl')
+W_TR = _w('tr')
+W_TC = _w('tc')
+W_P = _w('p')
+W_R = _w('r')
+W_HYPERLINK = _w('hyperlink')
+W_T = _w('t')
+W_BR = _w('br')
+W_TRPR = _w('trPr')
+W_TCPR = _w('tcPr')
+W_GRID_BEFORE = _w('gridBefore')
+W_GRID_SPAN = _w('gridSpan')
+W_VMERGE = _w('vMerge')
+W_VAL = _w('val')
+W_TYPE = _w('type')
+
+# 运行(run)内各子元素对应的文本，与 python-docx 的 Run.text 保持一致
+_RUN_CHAR_TAGS = {
+    _w('tab'): '\t',
+    _w('ptab'): '\t',
+    _w('cr'): '\n',
+    _w('noBreakHyphen'): '-',
+}
+
+
+class XmlTableReader:
+    """
+    轻量级的表格文本读取器。
+
+    直接打开 .docx 压缩包并增量解析 word/document.xml，只提取正文中顶层表格的单元格文本，
+    不构建 python-docx 的完整文档对象模型（样式、编号、媒体等部件均不会被加载）。
+    合并单元格的处理方式与 python-docx 的 row.cells 相同：
+    横向合并的单元格按其跨越的网格列数重复出现，纵向合并的后续单元格返回合并起始单元格的文本。
+    """
+
+    DOCUMENT_PART = 'word/document.xml'
+
+    @staticmethod
+    def iter_tables(path: str):
+        """
+        逐个产出文档正文中的顶层表格。
+
+        参数:
+            path: .docx 文件路径
+
+        产出:
+            list: 表格的行列表，每行为该行各单元格文本组成的列表
+        """
+        with zipfile.ZipFile(path) as package:
+            with package.open(XmlTableReader.DOCUMENT_PART) as stream:
+                # 只关注表格结束事件，其余元素的事件在解析器内部过滤
+                for _, tbl in etree.iterparse(stream, events=('end',), tag=W_TBL):
+                    body = tbl.getparent()
+                    if body is None or body.tag != W_BODY:
+                        continue  # 单元格内的嵌套表格，python-docx 的 doc.tables 同样不包含
+
+                    yield XmlTableReader._table_rows(tbl)
+
+                    # 移除已处理的正文元素，保持内存占用与文档大小无关
+                    tbl.clear()
+                    while tbl.getprevious() is not None:
+                        del body[0]
+
+    @staticmethod
+    def _table_rows(tbl) -> list:
+        """将 w:tbl 元素转换为行列表（与 python-docx 的 row.cells 语义一致）"""
+        rows = []
+        above = {}  # 上一行中 网格偏移 -> 单元格文本
+        for tr in tbl.iterchildren(W_TR):
+            cells = []
+            current = {}
+            grid_offset = XmlTableReader._int_value(tr.find(W_TRPR), W_GRID_BEFORE, 0)
+            for tc in tr.iterchildren(W_TC):
+                tc_pr = tc.find(W_TCPR)
+                grid_span = XmlTableReader._int_value(tc_pr, W_GRID_SPAN, 1)
+                if XmlTableReader._is_vmerge_continue(tc_pr):
+                    # 纵向合并的后续单元格，使用上一行同一网格位置的单元格内容
+                    text = above.get(grid_offset, '')
+                else:
+                    text = XmlTableReader._cell_text(tc)
+                current[grid_offset] = text
+                cells.extend([text] * grid_span)
+                grid_offset += grid_span
+            rows.append(cells)
+            above = current
+        return rows
+
+    @staticmethod
+    def _int_value(pr, prop_tag: str, default: int) -> int:
+        """读取 trPr/tcPr 中的整数属性，例如 gridSpan、gridBefore"""
+        prop = pr.find(prop_tag) if pr is not None else None
+        if prop is None:
+            return default
+        try:
+            return int(prop.get(W_VAL, default))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _is_vmerge_continue(tc_pr) -> bool:
+        """判断单元格是否为纵向合并的后续单元格（w:vMerge 缺省值为 continue）"""
+        if tc_pr is None:
+            return False
+        vmerge = tc_pr.find(W_VMERGE)
+        return vmerge is not None and vmerge.get(W_VAL, 'continue') == 'continue'
+
+    @staticmethod
+    def _cell_text(tc) -> str:
+        """单元格文本：各直接段落文本以换行连接"""
+        return '\n'.join(XmlTableReader._paragraph_text(p) for p in tc.iterchildren(W_P))
+
+    @staticmethod
+    def _paragraph_text(p) -> str:
+        """段落文本：直接子级的 w:r 以及 w:hyperlink 中的 w:r"""
+        parts = []
+        for child in p:
+            if child.tag == W_R:
+                XmlTableReader._append_run_text(child, parts)
+            elif child.tag == W_HYPERLINK:
+                for r in child.iterchildren(W_R):
+                    XmlTableReader._append_run_text(r, parts)
+        return ''.join(parts)
+
+    @staticmethod
+    def _append_run_text(r, parts: list):
+        """将运行(run)的文本追加到 parts"""
+        for child in r:
+            tag = child.tag
+            if tag == W_T:
+                parts.append(child.text or '')
+            elif tag == W_BR:
+                # 仅文本换行（默认类型）对应换行符，分页/分栏符不产生文本
+                if child.get(W_TYPE, 'textWrapping') == 'textWrapping':
+                    parts.append('\n')
+            elif tag in _RUN_CHAR_TAGS:
+                parts.append(_RUN_CHAR_TAGS[tag])
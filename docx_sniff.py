@@ -0,0 +1,94 @@
+import re
+import html
+import zipfile
+
+_ZIP_SIGNATURE = b'PK\x03\x04'
+_CHUNK = 64 * 1024
+# 表格开始标签（命名空间前缀通常为 w:，也兼容其他前缀），嵌套表格同样计入，只会多算不会少算
+_TBL_TAG = re.compile(rb'<(?:[A-Za-z_][\w.-]*:)?tbl[\s/>]')
+_ANY_TAG = re.compile(rb'<[^>]*>')
+
+
+class DocxSniffer:
+    """
+    解析文档前的快速预检查。
+
+    只读取 .docx 中的 word/document.xml，按块解压并在原始字节中统计表格数量、查找标记文字
+    （去掉XML标签后查找，标记文字被拆分到多个运行中也能找到），满足条件后立即停止读取。
+    只有确定解析必然得不到数据时才拒绝文档：表格数量包含嵌套表格、标记文字不限位置，
+    因此通过预检查的文档仍可能在解析时失败，但被拒绝的文档解析时一定没有数据。
+    """
+
+    DOCUMENT_PART = 'word/document.xml'
+
+    # 解析方法名 -> (必须出现的标记文字, 至少需要的表格数量)，与 FileUtils.read_A2/read_A5 的要求一致
+    RULES = {
+        'read_A2': (('数据包名称',), 2),
+        'read_A5': ((), 3),
+    }
+
+    @classmethod
+    def check(cls, path: str, reader_name: str):
+        """
+        检查文档是否可能包含 reader_name 需要的数据。
+
+        返回:
+            拒绝原因；可能包含数据（或没有对应的检查规则）时返回 None
+        """
+        rule = cls.RULES.get(reader_name)
+        if rule is None:
+            return None
+        markers, min_tables = rule
+
+        try:
+            with open(path, 'rb') as f:
+                if f.read(4) != _ZIP_SIGNATURE:
+                    return "不是有效的docx文件"
+            with zipfile.ZipFile(path) as package:
+                try:
+                    stream = package.open(cls.DOCUMENT_PART)
+                except KeyError:
+                    return "文档中没有正文（word/document.xml）"
+                with stream:
+                    return cls._scan(stream, markers, min_tables)
+        except (OSError, zipfile.BadZipFile, EOFError, RuntimeError) as e:
+            return f"无法读取文档: {e}"
+
+    @staticmethod
+    def _scan(stream, markers: tuple, min_tables: int):
+        pending = [marker.encode('utf-8') for marker in markers]
+        keep = max((len(marker) for marker in pending), default=1) - 1
+        tables = 0
+        carry = b''      # 上一块末尾未结束的标签
+        text_tail = b''  # 上一块末尾的文本，用于查找跨块的标记文字
+
+        while True:
+            chunk = stream.read(_CHUNK)
+            data = carry + chunk
+            if chunk:
+                # 只处理到最后一个完整标签为止，未结束的标签留到下一块
+                cut = data.rfind(b'<')
+                if cut != -1 and data.find(b'>', cut) == -1:
+                    data, carry = data[:cut], data[cut:]
+                else:
+                    carry = b''
+
+            tables += len(_TBL_TAG.findall(data))
+            if pending:
+                text = _ANY_TAG.sub(b'', data)
+                if b'&' in text:
+                    # 字符实体（&#x6570; 等）还原后再查找
+                    text = html.unescape(text.decode('utf-8', 'ignore')).encode('utf-8')
+                text = text_tail + text
+                pending = [marker for marker in pending if marker not in text]
+                text_tail = text[-keep:] if keep else b''
+
+            if not pending and tables >= min_tables:
+                return None
+            if not chunk:
+                break
+
+        if pending:
+            missing = "、".join(f"'{marker.decode('utf-8')}'" for marker in pending)
+            return f"未找到{missing}"
+        return f"表格不足（{tables} 个，至少需要 {min_tables} 个）"
@@ -0,0 +1,163 @@
+import os
+import json
+import hashlib
+import sqlite3
+
+
+class ExportCache:
+    """
+    A2/A5导出的增量缓存（SQLite）。
+
+    以 (文档类型, 路径) 为主键保存每个文档的解析结果，并记录文件大小、修改时间和内容哈希。
+    文件大小和修改时间都未变化时直接命中；否则计算内容哈希，哈希一致（例如文件仅被复制或touch）
+    时仍视为命中并更新记录，只有内容真正变化的文档才需要重新解析。
+    """
+
+    # 解析结果格式变化时递增，旧版本的缓存会被整体清空
+    SCHEMA_VERSION = 1
+    # 每保存多少个结果提交一次，导出中断时已保存的结果不会全部丢失
+    COMMIT_EVERY = 200
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._unsaved = 0
+        self._conn = sqlite3.connect(db_path)
+        self._init_schema()
+
+    def _init_schema(self):
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != ExportCache.SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS documents")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                         (str(ExportCache.SCHEMA_VERSION),))
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                kind TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha1 TEXT NOT NULL,
+                result TEXT,
+                PRIMARY KEY (kind, path)
+            )
+        """)
+        conn.commit()
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """计算文件内容的SHA1哈希"""
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint(path: str, sha1: str = None) -> tuple:
+        """返回文件指纹 (大小, 修改时间ns, 内容哈希)"""
+        st = os.stat(path)
+        if sha1 is None:
+            sha1 = ExportCache.file_hash(path)
+        return st.st_size, st.st_mtime_ns, sha1
+
+    def _fresh(self, kind: str, path: str) -> bool:
+        """缓存记录是否与文档当前内容一致（path 为绝对路径）"""
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, sha1 FROM documents WHERE kind = ? AND path = ?",
+            (kind, path)).fetchone()
+        if row is None:
+            return False
+
+        size, mtime_ns, sha1 = row
+        try:
+            st = os.stat(path)
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                # 大小或修改时间变化，比较内容哈希
+                if st.st_size != size or self.file_hash(path) != sha1:
+                    return False
+                self._conn.execute(
+                    "UPDATE documents SET mtime_ns = ? WHERE kind = ? AND path = ?",
+                    (st.st_mtime_ns, kind, path))
+        except OSError:
+            return False
+        return True
+
+    def is_fresh(self, kind: str, path: str) -> bool:
+        """
+        文档是否有可用的缓存结果（不读取解析结果）。返回 False 时计为未命中，
+        返回 True 的文档之后用 load() 读取结果（计为命中），不再重复检查。
+        """
+        if self._fresh(kind, os.path.abspath(path)):
+            return True
+        self.misses += 1
+        return False
+
+    def load(self, kind: str, path: str):
+        """读取 is_fresh() 已确认有效的缓存结果"""
+        row = self._conn.execute(
+            "SELECT result FROM documents WHERE kind = ? AND path = ?", (kind, os.path.abspath(path))).fetchone()
+        self.hits += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def lookup(self, kind: str, path: str):
+        """
+        查找文档的缓存结果。
+
+        返回:
+            (是否命中, 缓存的解析结果)
+        """
+        if not self.is_fresh(kind, path):
+            return False, None
+        return True, self.load(kind, path)
+
+    def store(self, kind: str, path: str, result, fingerprint: tuple = None):
+        """
+        保存文档的解析结果。
+
+        参数:
+            fingerprint: 解析之前取得的文件指纹（见 fingerprint()）；为空时现在计算，
+                解析期间文档被修改时缓存的结果会与指纹不一致，应尽量传入解析前的指纹
+        """
+        path = os.path.abspath(path)
+        if fingerprint is None:
+            try:
+                fingerprint = self.fingerprint(path)
+            except OSError:
+                return
+        size, mtime_ns, sha1 = fingerprint
+        self._conn.execute(
+            "INSERT OR REPLACE INTO documents (kind, path, size, mtime_ns, sha1, result) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, path, size, mtime_ns, sha1, json.dumps(result, ensure_ascii=False)))
+        self._unsaved += 1
+        if self._unsaved >= self.COMMIT_EVERY:
+            self._conn.commit()
+            self._unsaved = 0
+
+    def evict_missing(self, kind: str, root: str, seen_paths) -> int:
+        """删除 root 目录下本次未找到（已被删除或改名）的文档的缓存记录"""
+        root = os.path.join(os.path.abspath(root), '')
+        seen = {os.path.abspath(p) for p in seen_paths}
+        stale = [
+            (kind, path) for (path,) in self._conn.execute(
+                "SELECT path FROM documents WHERE kind = ? AND substr(path, 1, ?) = ?",
+                (kind, len(root), root))
+            if path not in seen
+        ]
+        self._conn.executemany("DELETE FROM documents WHERE kind = ? AND path = ?", stale)
+        self.evicted += len(stale)
+        return len(stale)
+
+    def summary(self) -> str:
+        """缓存命中情况摘要"""
+        return f"缓存命中 {self.hits} 个，未命中 {self.misses} 个，清除失效记录 {self.evicted} 个"
+
+    def close(self):
+        """提交并关闭缓存数据库"""
+        self._conn.commit()
+        self._conn.close()
@@ -0,0 +1,332 @@
+import os
+import time
+import threading
+
+from file_utils import FileUtils
+from file_manipulator import OperationCancelled
+
+
+def watchdog_available() -> bool:
+    """是否已安装 watchdog（使用系统的文件变化通知：Linux inotify、Windows ReadDirectoryChangesW 等）"""
+    import importlib.util
+
+    return importlib.util.find_spec('watchdog') is not None
+
+
+class PollingSource:
+    """定期扫描源目录中文档的大小和修改时间（未安装 watchdog 或指定定时扫描时使用）"""
+
+    name = "定时扫描"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_scan = 0.0
+
+    def start(self, root: str):
+        self._next_scan = time.monotonic() + self.interval
+
+    def stop(self):
+        pass
+
+    def collect(self):
+        """
+        返回自上次调用以来的变化提示。
+
+        返回:
+            (可能变化的文件路径集合, 是否需要扫描整个目录)
+        """
+        now = time.monotonic()
+        if now < self._next_scan:
+            return set(), False
+        self._next_scan = now + self.interval
+        return set(), True
+
+
+class WatchdogSource:
+    """通过 watchdog 接收文件变化通知，只需检查通知中的文件"""
+
+    name = "文件变化通知"
+
+    def __init__(self):
+        self._observer = None
+        self._lock = threading.Lock()
+        self._paths = set()
+        self._rescan = False
+
+    def start(self, root: str):
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        source = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                source._add(event)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), root, recursive=True)
+        self._observer.start()
+
+    def _add(self, event):
+        # 在 watchdog 的线程中调用
+        with self._lock:
+            if event.is_directory:
+                # 文件夹被移动或删除时，其中的文件不会逐个通知
+                if event.event_type in ('moved', 'deleted'):
+                    self._rescan = True
+                return
+            self._paths.add(os.fsdecode(event.src_path))
+            dest_path = getattr(event, 'dest_path', None)
+            if dest_path:
+                # Word 保存时先写入临时文件，再重命名为原文件
+                self._paths.add(os.fsdecode(dest_path))
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def collect(self):
+        with self._lock:
+            paths, rescan = self._paths, self._rescan
+            self._paths, self._rescan = set(), False
+        return paths, rescan
+
+
+class ExportWatcher:
+    """
+    监视源目录，A2/A5文档变化后只重新解析变化的文档，并更新固定文件名的导出文件。
+
+    启动时完整导出一次，之后在内存中保存每个文档的解析结果。文件变化后等待 DEBOUNCE 秒内
+    不再变化（连续保存时最多等待 MAX_DELAY 秒）再处理，只解析新增和修改的文档、移除已删除
+    的文档，然后重新写出 <前缀>_latest.csv：先写入 .partial 文件，完成后替换原文件，读取方
+    始终看到完整的文件。每次都整体重写，因此不写检查点，中断时留下的 partial 文件不会被普通
+    导出或 export-finalize 当作未完成的导出继续。输出文件被占用（例如在 Excel 中打开）而无法替换时，每隔
+    RETRY_INTERVAL 秒重试。临时文件（~$ 等）的判断与 FileUtils.find_files_by_name 相同。
+    """
+
+    DEBOUNCE = 1.0
+    MAX_DELAY = 10.0
+    POLL_INTERVAL = 2.0
+    RETRY_INTERVAL = 5.0
+    # 等待变化时检查取消请求和变化提示的间隔
+    TICK = 0.25
+    OUTPUT_TIMESTAMP = 'latest'
+
+    # 文档处理方式 -> 解析方法名
+    READERS = {'A2': 'read_A2', 'A5': 'read_A5'}
+
+    def __init__(self, manipulator, output_dir: str, kinds=('A2', 'A5'), workers: int = 1,
+                 backend: str = 'docx', cache_path: str = None, compress: bool = False,
+                 fmt: str = 'csv', sniff: bool = False):
+        self.manipulator = manipulator
+        self.root = manipulator.str_newpath
+        self.output_dir = output_dir
+        self.readers = {kind: self.READERS[kind] for kind in kinds}
+        self.workers = workers
+        self.backend = backend
+        self.cache_path = cache_path
+        self.compress = compress
+        self.fmt = fmt
+        self.sniff = sniff
+        self.registry = FileUtils.registry()
+        self.known = {}    # 文档路径 -> (大小, 修改时间)
+        self.results = {reader_name: {} for reader_name in self.readers.values()}
+        self._unwritten = set()  # 需要重新写出的解析方法名
+
+    def _reader_of(self, path: str):
+        """文档对应的解析方法名，不需要监视的文件返回 None"""
+        name = os.path.basename(path)
+        if FileUtils.is_temp_file(name) or os.path.splitext(name)[1].lower() != '.docx':
+            return None
+        return self.readers.get(self.registry.form_handler(name))
+
+    @staticmethod
+    def _state(path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _scan(self) -> dict:
+        """扫描整个源目录，返回 文档路径 -> (大小, 修改时间)"""
+        pathes = FileUtils.find_files_by_name(
+            self.root, '', 'docx', match=lambda name: self.registry.form_handler(name) in self.readers)
+        states = {}
+        for path in pathes:
+            state = self._state(path)
+            if state is not None:
+                states[os.path.abspath(path)] = state
+        return states
+
+    def _changes(self, paths: set, rescan: bool) -> dict:
+        """与已处理的状态比较，返回 变化的文档路径 -> 当前状态（已删除为 None）"""
+        if rescan:
+            current = self._scan()
+            changes = {path: state for path, state in current.items() if self.known.get(path) != state}
+            changes.update((path, None) for path in self.known if path not in current)
+            return changes
+        changes = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            if path in self.known or self._reader_of(path) is not None:
+                state = self._state(path)
+                if self.known.get(path) != state:
+                    changes[path] = state
+        return changes
+
+    def run(self, poll: bool = False, interval: float = None) -> bool:
+        """
+        开始监视，直到请求取消（界面上的"取消"或 Ctrl+C）。
+
+        参数:
+            poll: 为 True 时始终定时扫描，否则在安装了 watchdog 时使用文件变化通知
+            interval: 定时扫描的间隔（秒），默认 POLL_INTERVAL
+        """
+        manipulator = self.manipulator
+        if poll or not watchdog_available():
+            source = PollingSource(interval or self.POLL_INTERVAL)
+        else:
+            source = WatchdogSource()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.fmt = manipulator._resolve_export_format(self.fmt)
+        try:
+            # 先开始接收通知，再做首次导出，导出期间的修改不会遗漏
+            source.start(self.root)
+            self._initial_export()
+            manipulator.log(f"正在监视 '{self.root}'（{source.name}），文档保存后将自动更新导出文件，"
+                            f"点击取消或按 Ctrl+C 停止")
+            self._watch(source)
+        except OperationCancelled:
+            pass
+        finally:
+            source.stop()
+        manipulator.log("已停止监视。")
+        return True
+
+    def _initial_export(self):
+        manipulator = self.manipulator
+        with manipulator.tracer.span("首次导出"):
+            self.known = self._scan()
+            for kind, reader_name in self.readers.items():
+                pathes = sorted(path for path in self.known if self._reader_of(path) == reader_name)
+                manipulator.log(f"共找到 {len(pathes)} 个{kind}文档。")
+                cache = manipulator._open_export_cache(self.cache_path)
+                try:
+                    self._extract(reader_name, pathes, cache)
+                finally:
+                    manipulator._close_export_cache(cache, reader_name, pathes)
+            self._write_outputs(set(self.readers.values()))
+
+    def _watch(self, source):
+        manipulator = self.manipulator
+        pending = {}        # 等待稳定的文档路径 -> 最近一次看到的状态
+        first_seen = settle_at = 0.0
+        retry_at = time.monotonic() + self.RETRY_INTERVAL
+
+        while not manipulator.wait_cancelled(self.TICK):
+            now = time.monotonic()
+            paths, rescan = source.collect()
+            # 等待稳定的文档每次都重新检查，仍在变化则继续等待
+            paths |= pending.keys()
+            changes = self._changes(paths, rescan)
+            changed = {path: state for path, state in changes.items() if pending.get(path, ()) != state}
+            for path in pending.keys() - changes.keys():
+                # 又恢复为已处理的状态（例如临时修改后撤销）
+                del pending[path]
+            if changed:
+                if not pending:
+                    first_seen = now
+                pending.update(changed)
+                settle_at = min(now + self.DEBOUNCE, first_seen + self.MAX_DELAY)
+
+            if pending and now >= settle_at:
+                self._refresh(pending, first_seen)
+                pending = {}
+                retry_at = now + self.RETRY_INTERVAL
+            elif self._unwritten and now >= retry_at:
+                self._write_outputs(set(self._unwritten))
+                retry_at = now + self.RETRY_INTERVAL
+
+    def _refresh(self, pending: dict, first_seen: float):
+        """重新解析变化的文档并更新导出文件"""
+        manipulator = self.manipulator
+        start = time.monotonic()
+        with manipulator.tracer.span("更新导出", documents=len(pending)):
+            removed = 0
+            affected = set()
+            for reader_name in self.readers.values():
+                changed = sorted(path for path, state in pending.items()
+                                 if state is not None and self._reader_of(path) == reader_name)
+                deleted = [path for path, state in pending.items()
+                           if state is None and path in self.results[reader_name]]
+                for path in deleted:
+                    self.results[reader_name].pop(path, None)
+                removed += len(deleted)
+                if changed:
+                    cache = manipulator._open_export_cache(self.cache_path)
+                    try:
+                        self._extract(reader_name, changed, cache)
+                    finally:
+                        if cache is not None:
+                            cache.close()
+                if changed or deleted:
+                    affected.add(reader_name)
+
+            # 解析过程中文件可能再次变化，记录的是解析前看到的状态，再次变化时会重新处理
+            for path, state in pending.items():
+                if state is None:
+                    self.known.pop(path, None)
+                else:
+                    self.known[path] = state
+            self._write_outputs(affected | self._unwritten)
+
+        end = time.monotonic()
+        updated = sum(1 for state in pending.values() if state is not None)
+        manipulator.log(f"已更新 {updated} 个文档、移除 {removed} 个文档，用时 {end - start:.2f} 秒"
+                        f"（从检测到修改到更新完成 {end - first_seen:.2f} 秒）")
+
+    def _extract(self, reader_name: str, pathes: list, cache):
+        results = self.results[reader_name]
+        for path, result in self.manipulator._extract_documents(
+                reader_name, pathes, self.workers, self.backend, cache, self.sniff):
+            results[os.path.abspath(path)] = result
+
+    def _write_outputs(self, reader_names: set):
+        """重新写出这些解析方法的全部导出文件，无法替换的留待稍后重试"""
+        manipulator = self.manipulator
+        for reader_name in sorted(reader_names):
+            results = self.results.get(reader_name)
+            if results is None:
+                continue
+            try:
+                self._write_reader_outputs(reader_name, results)
+                self._unwritten.discard(reader_name)
+            except OSError as e:
+                self._unwritten.add(reader_name)
+                manipulator.log(f"写入导出文件失败（文件可能正被其他程序打开），"
+                                f"{self.RETRY_INTERVAL:.0f} 秒后重试: {e}")
+
+    def _write_reader_outputs(self, reader_name: str, results: dict):
+        manipulator = self.manipulator
+        outputs = manipulator.EXPORT_OUTPUTS[reader_name]
+        for index, (prefix, title, types) in enumerate(outputs):
+            writer = manipulator._open_export_output(self.output_dir, prefix, self.OUTPUT_TIMESTAMP, title, types,
+                                                     self.fmt, self.compress, False, resumable=False)
+            try:
+                for path in sorted(results):
+                    writer.write_document(path, manipulator.export_rows(reader_name, results[path])[index])
+                rows = writer.finalize()
+            except BaseException:
+                writer.abort(keep=False)
+                raise
+            if rows:
+                manipulator.tracer.record_file_io(written_path=writer.path)
+                manipulator.log(f"已更新 {writer.path}（{rows} 条数据）")
+            elif os.path.exists(writer.path):
+                # 没有数据时不保留旧的导出文件
+                os.remove(writer.path)
+                manipulator.log(f"没有有效数据，已删除 {writer.path}")
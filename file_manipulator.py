@@ -1,16 +1,180 @@
 import os
+import io
 import shutil
 import time
 import datetime
+import contextlib
+import threading
+import functools
 from file_utils import FileUtils
-import csv
+from tracer import Tracer, NULL_TRACER, use_tracer
+from tree_snapshot import TreeSnapshot
+from operation_plan import OperationPlan, PlannedFolder, PlannedFile
+
+
+def _extract_document(reader_name: str, path: str, backend: str = 'docx', trace: bool = False,
+                      sniff: bool = False, fingerprint: bool = False):
+    """
+    解析单个文档（可在子进程中执行）。
+
+    FileUtils.read_A2/read_A5 通过 print 报告错误，这里将其捕获后随结果一并返回，
+    以便主进程统一写入日志。
+
+    参数:
+        trace: 是否记录耗时和读取的数据量
+        sniff: 是否先进行快速预检查（见 DocxSniffer），确定没有数据的文档不再解析
+        fingerprint: 是否在解析之前计算文件指纹（见 ExportCache.fingerprint），用于写入导出缓存；
+            解析期间文档被保存时，缓存记录的是解析前的指纹，下次导出时会重新解析
+
+    返回:
+        (解析结果, 输出信息列表, 未捕获的错误信息或None, 预检查的拒绝原因或None,
+         Tracer.export_state() 的结果或None, 文件指纹或None)
+    """
+    buffer = io.StringIO()
+    result = state = None
+    error = rejected = None
+    tracer = Tracer() if trace else NULL_TRACER
+    with contextlib.redirect_stdout(buffer), use_tracer(tracer):
+        try:
+            if fingerprint:
+                from export_cache import ExportCache
+
+                state = ExportCache.fingerprint(path)
+            with tracer.span(reader_name, 'document', file=os.path.basename(path)):
+                if sniff:
+                    from docx_sniff import DocxSniffer
+
+                    t = tracer.start()
+                    rejected = DocxSniffer.check(path, reader_name)
+                    tracer.phase('sniff', t)
+                if rejected is None:
+                    result = getattr(FileUtils, reader_name)(path, backend)
+            if tracer.enabled:
+                tracer.record_file_io(read_path=path)
+        except Exception as e:
+            error = str(e)
+    return result, buffer.getvalue().splitlines(), error, rejected, tracer.export_state(), state
+
+
+def _edit_document(method_name: str, args: tuple, head_list: list, form_types: dict, save_backend: str,
+                   template_cache_mb: int = 0, trace: bool = False):
+    """
+    修改单个文档（可在子进程中执行）。
+
+    子进程不会继承主进程中根据配置修改过的 FileUtils 类属性，因此 head_list、form_types、保存方式和
+    模板缓存上限随任务一起传入。模板缓存保存在各进程中，同一进程处理的后续任务可以直接使用。
+
+    参数:
+        trace: 是否记录打开、修改、保存各阶段的耗时和读写的数据量
+
+    返回:
+        (修改方法的返回值, 错误信息（成功时为 None）, Tracer.export_state() 的结果或None)
+    """
+    FileUtils.head_list = head_list
+    FileUtils.form_types = form_types
+    FileUtils.save_backend = save_backend
+    FileUtils.template_cache_mb = template_cache_mb
+    tracer = Tracer() if trace else NULL_TRACER
+    result = error = None
+    with use_tracer(tracer):
+        try:
+            with tracer.span(method_name, 'document', file=args[1]):
+                result = getattr(FileUtils, method_name)(*args)
+        except Exception as e:
+            error = str(e)
+    return result, error, tracer.export_state()
+
+
+# 修改文档的共享进程池（启用模板缓存时使用，进程数 -> 进程池），在多次任务之间保留，
+# 子进程中已缓存的模板可以继续使用。不同进程数的任务使用各自的进程池，不会影响正在执行的任务。
+# 进程池的工作进程不是守护进程，进程退出前必须关闭（见 shutdown_shared_executors）
+_shared_executors = {}
+_shared_executors_lock = threading.Lock()
+_shared_executors_finalizer = None
+
+
+def _get_shared_executor(workers: int):
+    """获取 workers 个进程的共享进程池，不存在时创建"""
+    global _shared_executors_finalizer
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _shared_executors_lock:
+        if _shared_executors_finalizer is None:
+            # 进程退出时（包括 multiprocessing 子进程）在等待子进程结束之前关闭共享进程池，
+            # 否则退出时会一直等待共享进程池中的工作进程。优先级须高于进程池内部队列的
+            # 关闭处理（10），否则队列先关闭，通知工作进程退出的消息无法发出
+            from multiprocessing import util
+
+            _shared_executors_finalizer = util.Finalize(None, shutdown_shared_executors, exitpriority=100)
+        executor = _shared_executors.get(workers)
+        if executor is None:
+            executor = _shared_executors[workers] = ProcessPoolExecutor(max_workers=workers)
+        return executor
+
+
+def _discard_shared_executor(executor):
+    """进程池损坏（子进程异常退出）后丢弃，下次使用时重新创建"""
+    with _shared_executors_lock:
+        for workers, shared in list(_shared_executors.items()):
+            if shared is executor:
+                del _shared_executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_shared_executors():
+    """
+    关闭所有共享进程池（需先结束使用进程池的任务）。
+
+    各入口（界面关闭、cli.main、批量任务进程、性能测试步骤）结束时调用；进程退出时也会自动调用。
+    """
+    with _shared_executors_lock:
+        executors = list(_shared_executors.values())
+        _shared_executors.clear()
+    for executor in executors:
+        executor.shutdown(cancel_futures=True)
+
+
+def _stage(name: str):
+    """将方法的执行时间记录为 FileManipulator.tracer 中的一个步骤"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class OperationCancelled(Exception):
+    """操作被用户取消"""
+
 
 class FileManipulator:
-    def __init__(self, str_oldpath: str, str_newpath: str, max_file_dict: dict, output_callback=None):
+    # 任务数少于此值时不启动进程池，进程启动的开销超过并行带来的收益
+    MIN_PARALLEL_TASKS = 8
+
+    # 导出文件：解析方法名 -> [(文件名前缀, 表头, 列类型)]，列类型见 ParquetStreamWriter（None 表示全部为文本）
+    EXPORT_OUTPUTS = {
+        'read_A2': [('A2', ['包名称', '记录名称', '迁移验证环境日期', '迁移正式环境日期'],
+                     ['string', 'string', 'date', 'date'])],
+        'read_A5': [('A5_tb1', ['包名称', '理由', '相关文件'], None),
+                    ('A5_tb2', ['包名称', '记录名称', '操作类型', '分类', '风险评估'], None)],
+    }
+
+    def __init__(self, str_oldpath: str, str_newpath: str, max_file_dict: dict, output_callback=None,
+                 progress_callback=None, tracer: Tracer = None, numbering=None):
         self.str_oldpath = str_oldpath
         self.str_newpath = str_newpath
         self.max_file_dict = max_file_dict
         self.output_callback = output_callback
+        self.progress_callback = progress_callback
+        self._cancel_event = threading.Event()
+        # 各步骤共用的目录树快照，复制、删除、重命名时同步更新
+        self.snapshot = TreeSnapshot()
+        # 性能统计，未启用时为不做任何事的 NULL_TRACER
+        self.tracer = tracer if tracer is not None else NULL_TRACER
+        # 编号登记表（NumberingRegistry），为 None 时与之前相同，新编号为源目录中的最大编号加一
+        self.numbering = numbering
 
     def log(self, message):
         """记录日志信息，如果有回调函数则使用它，否则打印到控制台"""
@@ -19,29 +183,246 @@ class FileManipulator:
         else:
             print(message)
 
-    def cp_files(self):
+    def report_progress(self, current: int, total: int):
+        """报告当前步骤的处理进度（第 current 项，共 total 项）"""
+        if self.progress_callback:
+            self.progress_callback(current, total)
+
+    def cancel(self):
+        """请求取消正在执行的操作（可从其他线程调用），操作会在处理完当前文件后停止"""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._cancel_event.is_set()
+
+    def wait_cancelled(self, timeout: float) -> bool:
+        """等待 timeout 秒，期间请求取消时立即返回；返回是否已请求取消"""
+        return self._cancel_event.wait(timeout)
+
+    def check_cancelled(self):
+        """如果已请求取消，则抛出 OperationCancelled"""
+        if self._cancel_event.is_set():
+            raise OperationCancelled()
+
+    def _log_fs_calls(self, stage: str):
+        """输出当前步骤实际发生的文件系统元数据调用次数"""
+        counters = self.snapshot.take_counters()
+        self.log(f"{stage}：文件系统元数据调用 scandir {counters['scandir']} 次，stat {counters['stat']} 次")
+        self.tracer.count('scandir', counters['scandir'])
+        self.tracer.count('stat', counters['stat'])
+
+    def report_trace(self, trace_path: str = None):
         """
-        将文件夹从 'str_oldpath' 复制到 'str_newpath'，文件夹中的文件名会根据各类别中文件名的最高数字索引进行更新。
-        如果 'str_newpath' 目录已经存在，会将目标文件复制移动到一个带有时间戳的同名目录，然后清空目标文件。
+        启用性能统计时，在日志末尾输出统计表，并将 Chrome trace JSON 写入 trace_path。
+
+        参数:
+            trace_path: trace 文件路径，为空时只输出统计表
         """
-        self.log("开始复制文件...")
-        str_oldpath = self.str_oldpath
+        tracer = self.tracer
+        if not tracer.enabled or not tracer.events:
+            return
+        for line in tracer.summary_lines():
+            self.log(line)
+        if trace_path:
+            try:
+                tracer.write_chrome_trace(trace_path)
+                self.log(f"性能跟踪文件已保存（可在 chrome://tracing 或 ui.perfetto.dev 中打开）: {trace_path}")
+            except Exception as e:
+                self.log(f"保存性能跟踪文件失败: {e}")
+
+    @staticmethod
+    def resolve_workers(workers) -> int:
+        """将配置中的进程数转换为实际进程数（0或None表示使用全部CPU核心）"""
+        try:
+            workers = int(workers or 0)
+        except (TypeError, ValueError):
+            workers = 0
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        return workers
+
+    def _parse_documents(self, reader_name: str, pathes: list, workers: int = 1,
+                         backend: str = 'docx', sniff: bool = False, fingerprint: bool = False):
+        """
+        解析文档并按 pathes 的原始顺序产出 _extract_document 的返回值。
+
+        参数:
+            reader_name: FileUtils 中的解析方法名（'read_A2' 或 'read_A5'）
+            pathes: 文档路径列表
+            workers: 并行进程数，1 表示在当前进程中串行处理
+            backend: 文档解析方式，见 FileUtils.iter_tables
+            sniff: 是否在解析前进行快速预检查
+            fingerprint: 是否在解析前计算文件指纹（写入导出缓存时使用）
+        """
+        trace = self.tracer.enabled
+        return self._pool_map(_extract_document,
+                              [(reader_name, path, backend, trace, sniff, fingerprint) for path in pathes],
+                              workers, "解析")
+
+    def _pool_map(self, func, arg_lists: list, workers: int, action: str, shared: bool = False):
+        """
+        对每组参数调用 func，并按 arg_lists 的原始顺序产出返回值。
+
+        参数:
+            func: 模块级函数（需要能够传递到子进程）
+            arg_lists: 参数元组列表
+            workers: 并行进程数，1 或任务较少时在当前进程中串行执行
+            action: 日志中的操作名称，例如"解析"、"修改"
+            shared: 是否使用在多次任务之间保留的共享进程池（子进程中的缓存可以继续使用）
+        """
+        total = len(arg_lists)
+        if total < self.MIN_PARALLEL_TASKS or workers <= 1:
+            for args in arg_lists:
+                yield func(*args)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        if shared:
+            executor = _get_shared_executor(workers)
+        else:
+            workers = min(workers, total)
+            executor = ProcessPoolExecutor(max_workers=workers)
+        self.log(f"使用 {workers} 个进程并行{action}文档")
+        try:
+            # 按块分发以减少进程间通信开销，map 保证结果顺序与输入一致；
+            # 提前结束（取消）时 map 会取消尚未开始的任务
+            chunksize = max(1, min(16, total // (workers * 4)))
+            yield from executor.map(func, *zip(*arg_lists), chunksize=chunksize)
+        except BrokenProcessPool:
+            if shared:
+                _discard_shared_executor(executor)
+            raise
+        finally:
+            if not shared:
+                executor.shutdown(cancel_futures=True)
+
+    def _edit_documents(self, tasks: list, workers: int = 1):
+        """
+        执行文档修改任务，并按 tasks 的原始顺序产出结果。
+
+        每个任务相互独立（读取一个文件、写回一个文件），单个任务失败不影响其他任务。
+
+        参数:
+            tasks: (FileUtils 中的修改方法名, 参数元组) 列表
+            workers: 并行进程数，1 表示在当前进程中串行处理
+
+        产出:
+            每个任务的 (修改方法的返回值, 错误信息)，成功时错误信息为 None
+        """
+        total = len(tasks)
+        head_list, form_types, save_backend = FileUtils.head_list, FileUtils.form_types, FileUtils.save_backend
+        template_cache_mb = FileUtils.template_cache_mb
+        results = self._pool_map(
+            _edit_document,
+            [(method_name, args, head_list, form_types, save_backend, template_cache_mb, self.tracer.enabled)
+             for method_name, args in tasks],
+            workers, "修改", shared=template_cache_mb > 0 and save_backend == 'patch')
+        try:
+            for i in range(total):
+                self.check_cancelled()
+                result, error, trace_state = next(results)
+                self.tracer.merge(trace_state)
+                self.report_progress(i + 1, total)
+                yield result, error
+        finally:
+            results.close()
+
+    def _extract_documents(self, reader_name: str, pathes: list, workers: int = 1,
+                           backend: str = 'docx', cache=None, sniff: bool = False):
+        """
+        逐个解析文档并按 pathes 的原始顺序产出结果。
+
+        参数:
+            reader_name: FileUtils 中的解析方法名（'read_A2' 或 'read_A5'）
+            pathes: 文档路径列表
+            workers: 并行进程数，1 表示在当前进程中串行处理
+            backend: 文档解析方式，见 FileUtils.iter_tables
+            cache: ExportCache 实例，命中缓存的文档不再解析。开始前只确定需要解析的文档，
+                缓存的结果在产出时逐个读取，内存占用不随文档数量增长
+            sniff: 是否在解析前进行快速预检查，未通过的文档不解析（结果为 None），完成后汇总拒绝原因
+
+        产出:
+            (文档路径, 解析结果)；解析失败时结果为 None
+        """
+        total = len(pathes)
+        if cache is not None:
+            uncached = [path for path in pathes if not cache.is_fresh(reader_name, path)]
+        else:
+            uncached = pathes
+        uncached_set = set(uncached)
+
+        parsed = self._parse_documents(reader_name, uncached, workers, backend, sniff, cache is not None)
+        rejections = {}  # 拒绝原因 -> 文档数
+        try:
+            for i, path in enumerate(pathes):
+                self.check_cancelled()
+                self.report_progress(i + 1, total)
+                if path not in uncached_set:
+                    # 开始前已确认缓存有效，直接读取缓存的结果
+                    self.log(f"正在处理第 {i+1}/{total} 个文件（未变化，使用缓存）: {os.path.basename(path)}")
+                    yield path, cache.load(reader_name, path)
+                    continue
+
+                self.log(f"正在处理第 {i+1}/{total} 个文件: {os.path.basename(path)}")
+                result, messages, error, rejected, trace_state, state = next(parsed)
+                self.tracer.merge(trace_state)
+                for message in messages:
+                    self.log(message)
+                if rejected is not None:
+                    # 预检查未通过的文档不写入缓存，下次导出时仍会报告原因
+                    rejections[rejected] = rejections.get(rejected, 0) + 1
+                    self.log(f"预检查未通过，跳过解析（{rejected}）: {path}")
+                elif error is not None:
+                    self.log(f"处理文件 {path} 时发生未捕获错误: {error}")
+                    result = None
+                elif cache is not None and state is not None:
+                    cache.store(reader_name, path, result, state)
+                yield path, result
+        finally:
+            parsed.close()
+
+        if rejections:
+            details = "，".join(f"{reason} {count} 个" for reason, count in rejections.items())
+            self.log(f"预检查共跳过 {sum(rejections.values())} 个文档：{details}")
+
+    def _open_export_cache(self, cache_path: str):
+        """打开导出缓存，失败时记录日志并退化为不使用缓存"""
+        if not cache_path:
+            return None
+        from export_cache import ExportCache
+
+        try:
+            return ExportCache(cache_path)
+        except Exception as e:
+            self.log(f"打开导出缓存失败，本次不使用缓存: {e}")
+            return None
+
+    def _close_export_cache(self, cache, reader_name: str, pathes: list):
+        """清除已删除文档的缓存记录，输出命中情况并关闭缓存"""
+        if cache is None:
+            return
+        try:
+            cache.evict_missing(reader_name, self.str_newpath, pathes)
+            self.log(cache.summary())
+        finally:
+            cache.close()
+
+    def _prepare_target_dir(self):
+        """检查目标目录，如果已存在，则重命名为原名称_时间戳，并创建空的目标目录"""
         str_newpath = self.str_newpath
-        max_file_dict = self.max_file_dict
-        
-        # 检查源目录是否存在
-        if not os.path.exists(str_oldpath):
-            self.log(f"源目录不存在：{str_oldpath}")
-            return False
+        snapshot = self.snapshot
 
-        # 检查目标目录，如果已存在，则重命名为原名称_时间戳，并创建空的目标目录
-        if os.path.exists(str_newpath):
+        if snapshot.exists(str_newpath):
             # 获取当前时间戳
             timestamp = int(time.time())
             # 构建新的目录名
             new_target_path = f"{str_newpath}_{timestamp}"
             # 重命名现有目录
             os.rename(str_newpath, new_target_path)
+            snapshot.rename(str_newpath, new_target_path)
             self.log(f"目标目录已存在，已重命名为: {new_target_path}")
             # 创建新的空目录
             os.makedirs(str_newpath)
@@ -50,13 +431,17 @@ class FileManipulator:
             # 如果目标目录不存在，直接创建
             os.makedirs(str_newpath)
             self.log(f"已创建目标目录: {str_newpath}")
+        snapshot.add_dir(str_newpath, empty=True)
 
-        files = os.listdir(str_oldpath)
+    def _update_max_file_dict(self, files: list):
+        """根据源目录中的类别文件夹（类别-编号）更新各类别的最大编号"""
+        str_oldpath = self.str_oldpath
+        max_file_dict = self.max_file_dict
 
         for f_name in files:
             i_var1 = f_name.rfind("-")  # -所在的位置
             # 新增封面文件判断逻辑处理
-            if i_var1 != -1 and os.path.isdir(os.path.join(str_oldpath, f_name)):
+            if i_var1 != -1 and self.snapshot.isdir(os.path.join(str_oldpath, f_name)):
                 try:
                     file_index = int(f_name[i_var1 + 1:])
                     file_code = f_name[i_var1 + 1:]
@@ -70,7 +455,89 @@ class FileManipulator:
                 except ValueError:
                     self.log(f"文件名 '{f_name}' 的数字部分无效，跳过处理")
 
+    def _allocate_numbers(self, files: list) -> dict:
+        """
+        各类别的模板文件夹编号和新编号。
+
+        未使用编号登记表时扫描源目录，新编号为最大编号加一；使用登记表时从登记表读取模板编号
+        （首次使用、请求重新扫描或登记已过时时才重新解析各类别文件夹的编号），并由登记表分配新编号。
+        判断登记是否过时仍需要源目录的名称列表 files（生成文件时本来就要列出源目录）。
+
+        返回:
+            类别 -> (模板文件夹编号, 新编号)，编号为字符串
+        """
+        numbering = self.numbering
+        if numbering is None:
+            self._update_max_file_dict(files)
+            numbers = {}
+            for key, value in self.max_file_dict.items():
+                try:
+                    numbers[key] = (value, "{:04d}".format(int(value) + 1))
+                except ValueError:
+                    self.log(f"类别 '{key}' 的索引值 '{value}' 无效，跳过处理")
+            return numbers
+
+        from numbering_registry import normalize_root
+
+        root = normalize_root(self.str_oldpath)
+        registered = {} if numbering.rescan else numbering.load(root)
+        if registered and not numbering.is_stale(registered, set(files)):
+            templates = {key: template for key, (template, _) in registered.items()}
+            self.log(f"使用编号登记表中的 {len(templates)} 个类别编号（未扫描源目录）")
+        else:
+            self._update_max_file_dict(files)
+            templates = dict(self.max_file_dict)
+            numbering.record_scan(root, templates)
+            self.log(f"已扫描源目录并更新编号登记表：{len(templates)} 个类别")
+
+        allocated = numbering.allocate(root, list(templates), normalize_root(self.str_newpath))
+        numbers = {}
+        for key, template in templates.items():
+            number = allocated.get(key)
+            if number is None:
+                # 其他任务同时重新扫描后该类别已不在登记表中，按模板编号加一生成
+                number = int(template) + 1
+                self.log(f"类别 '{key}' 未能从编号登记表分配编号，使用模板编号加一")
+            numbers[key] = (template, "{:04d}".format(number))
+            if number != int(template) + 1:
+                self.log(f"类别 '{key}' 分配的新编号为 {number:04d}（模板编号 {template}）")
+        return numbers
+
+    @_stage("复制文件")
+    def cp_files(self, workers: int = 0):
+        """
+        将文件夹从 'str_oldpath' 复制到 'str_newpath'，文件夹中的文件名会根据各类别中文件名的最高数字索引进行更新。
+        如果 'str_newpath' 目录已经存在，会将目标文件复制移动到一个带有时间戳的同名目录，然后清空目标文件。
+
+        参数:
+            workers: 并行复制的线程数，0 表示自动，见 CopyEngine
+        """
+        from copy_engine import CopyEngine
+
+        self.log("开始复制文件...")
+        str_oldpath = self.str_oldpath
+        str_newpath = self.str_newpath
+        max_file_dict = self.max_file_dict
+        
+        snapshot = self.snapshot
+
+        # 检查源目录是否存在
+        if not snapshot.isdir(str_oldpath):
+            self.log(f"源目录不存在：{str_oldpath}")
+            return False
+
+        self._prepare_target_dir()
+
+        files = snapshot.listdir(str_oldpath)
+        self._update_max_file_dict(files)
+
+        # 先创建所有目标文件夹并收集要复制的文件，再由复制引擎并行复制
+        folders = []  # (源文件夹, 目标文件夹, 需要复制属性的子目录列表)
+        jobs = []     # (源文件, 目标文件, 是否保留修改时间, 所属文件夹序号；封面文件为 None)
+        folder_errors = {}  # 文件夹序号 -> [(源路径, 目标路径, 错误信息)]
         for key, value in max_file_dict.items():
+            self.check_cancelled()
+
             # 在新文件名中增加索引数字
             try:
                 new_code = "{:04d}".format(int(value) + 1)
@@ -83,47 +550,79 @@ class FileManipulator:
             target_folder = os.path.join(str_newpath, f"{key}-{new_code}")
 
             # 检查源文件夹是否存在
-            if not os.path.exists(source_folder):
+            if not snapshot.exists(source_folder):
                 self.log(f"源文件夹不存在：{source_folder}")
                 continue
 
             # 如果目标文件夹不存在，则复制源文件夹
-            if not os.path.exists(target_folder):
+            if not snapshot.exists(target_folder):
                 try:
-                    shutil.copytree(source_folder, target_folder)
-                    # 复制文件属性并设置时间戳
-                    shutil.copystat(source_folder, target_folder)
-                    os.utime(target_folder, (time.time(), time.time()))
-                    self.log(f"已复制: {source_folder} -> {target_folder}")
+                    dirs, folder_files, list_errors = CopyEngine.list_tree(source_folder, target_folder)
+                    for _, target_dir in dirs:
+                        os.makedirs(target_dir)
                 except Exception as e:
                     self.log(f"复制文件夹时出错: {e}")
+                    continue
+                index = len(folders)
+                folders.append((source_folder, target_folder, dirs))
+                if list_errors:
+                    # 无法读取的子目录与复制失败的文件一并报告
+                    folder_errors[index] = list_errors
+                jobs.extend((source, target, True, index) for source, target in folder_files)
             else:
                 self.log(f"文件夹已存在于：{target_folder}")
 
-        self.max_file_dict = max_file_dict
-
         # 复制封面文件
         for f_name in files:
             source_file = os.path.join(str_oldpath, f_name)
-            if not os.path.isdir(source_file):
-                target_file = os.path.join(str_newpath, f_name)
+            if snapshot.isdir(source_file):
+                continue
+            target_file = os.path.join(str_newpath, f_name)
 
-                # 如果目标文件不存在，则复制
-                if not os.path.exists(target_file):
-                    try:
-                        shutil.copy(source_file, target_file)
-                        # 复制文件属性并设置时间戳
-                        shutil.copystat(source_file, target_file)
-                        os.utime(target_file, (time.time(), time.time()))
-                        self.log(f"已复制文件: {f_name}")
-                    except Exception as e:
-                        self.log(f"复制文件时出错: {e}")
+            # 如果目标文件不存在，则复制
+            if not snapshot.exists(target_file):
+                jobs.append((source_file, target_file, False, None))
+            else:
+                self.log(f"文件已存在于：{target_file}")
+
+        engine = CopyEngine(workers)
+        results = engine.copy_files(jobs)
+        try:
+            for done, ((source, target, _, index), error) in enumerate(results, 1):
+                self.check_cancelled()
+                self.report_progress(done, len(jobs))
+                if index is not None:
+                    if error is not None:
+                        folder_errors.setdefault(index, []).append((source, target, str(error)))
+                elif error is None:
+                    snapshot.add_file(target)
+                    self.log(f"已复制文件: {os.path.basename(source)}")
                 else:
-                    self.log(f"文件已存在于：{target_file}")
+                    self.log(f"复制文件时出错: {error}")
+        finally:
+            results.close()
 
+        for index, (source_folder, target_folder, dirs) in enumerate(folders):
+            try:
+                # 与 copytree 相同，子目录在其中的文件复制完成后再复制属性
+                for source_dir, target_dir in reversed(dirs):
+                    shutil.copystat(source_dir, target_dir)
+                # 设置时间戳
+                os.utime(target_folder, (time.time(), time.time()))
+                snapshot.add_dir(target_folder)
+                if index in folder_errors:
+                    raise shutil.Error(folder_errors[index])
+                self.log(f"已复制: {source_folder} -> {target_folder}")
+            except Exception as e:
+                self.log(f"复制文件夹时出错: {e}")
+
+        self.log(engine.summary())
+        self._record_copy_io(engine)
+        self._log_fs_calls("复制文件")
         self.log("文件复制完成")
         return True
 
+    @_stage("删除临时文件")
     def del_files(self):
         """
         删除给定目标路径下的文件
@@ -136,18 +635,22 @@ class FileManipulator:
         """
         self.log("开始删除临时文件...")
         str_tarpath = self.str_newpath
+        snapshot = self.snapshot
 
         try:
             # 遍历目标路径下的所有子项：Analysis、Product...
-            for folder_item in os.listdir(str_tarpath):
+            folder_items = snapshot.listdir(str_tarpath)
+            for i, folder_item in enumerate(folder_items):
+                self.check_cancelled()
+                self.report_progress(i + 1, len(folder_items))
                 folder_path = os.path.join(str_tarpath, folder_item)
 
                 # 判断是否为文件夹
-                if not os.path.isdir(folder_path):
+                if not snapshot.isdir(folder_path):
                     continue  # 跳过非文件夹项
 
                 # 遍历文件夹内的所有子项：Data Pack、证据...
-                for item_name in os.listdir(folder_path):
+                for item_name, is_dir in snapshot.scandir(folder_path):
                     item_path = os.path.join(folder_path, item_name)
 
                     # 判断文件名以 ~$ 开头
@@ -155,13 +658,14 @@ class FileManipulator:
                         # 删除临时文件
                         try:
                             os.remove(item_path)
+                            snapshot.remove(item_path)
                             self.log(f"已删除临时文件: {item_name}")
                         except Exception as e:
                             self.log(f"删除临时文件时出错: {e}")
-                    elif os.path.isdir(item_path):
+                    elif is_dir:
                         # 如果是文件夹，则递归删除内部所有内容
                         try:
-                            FileUtils.recursively_delete_contents(item_path)
+                            FileUtils.recursively_delete_contents(item_path, snapshot)
                             self.log(f"已删除文件夹: {item_path}")
                         except Exception as e:
                             self.log(f"删除文件夹时出错: {e}")
@@ -169,38 +673,45 @@ class FileManipulator:
             self.log(f"发生错误：{e}")
             return False
 
+        self._log_fs_calls("删除临时文件")
         self.log("临时文件删除完成")
         return True
 
+    @_stage("重命名文件")
     def ren_files(self):
         """
         对指定目录下文件进行重命名：0038-->0039
         """
         self.log("开始重命名文件...")
         str_tarpath = self.str_newpath
+        snapshot = self.snapshot
         try:
             # 遍历目标路径下的所有子项：Analysis、Product...
-            for folder_item in os.listdir(str_tarpath):
+            folder_items = snapshot.listdir(str_tarpath)
+            for i, folder_item in enumerate(folder_items):
+                self.check_cancelled()
+                self.report_progress(i + 1, len(folder_items))
                 folder_path = os.path.join(str_tarpath, folder_item)
 
                 # 判断是否为文件夹
-                if not os.path.isdir(folder_path):
+                if not snapshot.isdir(folder_path):
                     # 不是文件夹  则是封面文件
                     newFileName = FileUtils.increment_filename_number(folder_item)
                     new_file_path = os.path.join(str_tarpath, newFileName)
                     try:
                         os.rename(folder_path, new_file_path)  # 使用完整路径重命名
+                        snapshot.rename(folder_path, new_file_path)
                         self.log(f"已重命名文件: {folder_item} -> {newFileName}")
                     except Exception as e:
                         self.log(f"重命名文件时出错: {e}")
                     continue  # 跳过非文件夹项
 
                 # 遍历文件夹内的所有子项：Data Pack、证据...
-                for item_name in os.listdir(folder_path):
+                for item_name, is_dir in snapshot.scandir(folder_path):
                     item_path = os.path.join(folder_path, item_name)
 
                     # 检查是否为文件，且文件名不以 ~$ 开头
-                    if os.path.isfile(item_path) and not item_name.startswith('~$'):
+                    if not is_dir and not item_name.startswith('~$'):
                         # 设置分隔符  括号
                         start_bracket = '(' if item_name.find('(') != -1 else '（'
                         end_bracket = ')' if item_name.find(')') != -1 else '）'
@@ -213,6 +724,7 @@ class FileManipulator:
                         # 重命名文件
                         try:
                             os.rename(item_path, new_file_path)
+                            snapshot.rename(item_path, new_file_path)
                             self.log(f"已重命名: {item_name} -> {new_file_name}")
                         except Exception as e:
                             self.log(f"重命名文件时出错: {e}")
@@ -220,41 +732,60 @@ class FileManipulator:
             self.log(f"发生错误：{e}")
             return False
 
+        self._log_fs_calls("重命名文件")
         self.log("文件重命名完成")
         return True
 
-    def edt_docx(self):
+    @_stage("编辑Word文档")
+    def edt_docx(self, workers: int = 1):
+        """
+        修改目标目录中的封面文件以及各类别文件夹中的A2、A5文档。
+
+        参数:
+            workers: 并行进程数，大于1时使用进程池并行修改文档
+        """
         self.log("开始编辑Word文档...")
         str_tarpath = self.str_newpath
 
-        for head_file_name in os.listdir(str_tarpath):
+        # 先收集所有修改任务：(所在目录, 文件名, 成功日志, 失败日志)
+        edits = []
+        registry = FileUtils.registry()
+        for head_file_name in self.snapshot.listdir(str_tarpath):
             current_directory = os.path.join(str_tarpath, head_file_name)
 
-            if not os.path.isdir(current_directory):
-                try:
-                    FileUtils.edt_docx(str_tarpath, head_file_name)
-                    self.log(f"已编辑封面: {head_file_name}")  # 添加日志
-                except Exception as e:
-                    self.log(f"编辑封面文件时出错: {e}")
+            if not self.snapshot.isdir(current_directory):
+                edits.append((str_tarpath, head_file_name, "已编辑封面", "编辑封面文件时出错"))
                 continue
 
-            for file_name in os.listdir(current_directory):
-                file_path = os.path.join(current_directory, file_name)
-                try:
-                    if "REC-Q680003-A2" in file_name:
-                        FileUtils.edt_docx(current_directory, file_name)
-                        self.log(f"已编辑迁移表: {file_name}")
-                    elif "REC-Q680003-A5" in file_name:
-                        FileUtils.edt_docx(current_directory, file_name)
-                        self.log(f"已编辑申请表: {file_name}")
-                except Exception as e:
-                    self.log(f"编辑Word文档时出错: {e}")
+            for file_name in self.snapshot.listdir(current_directory):
+                handler = registry.form_handler(file_name)
+                if handler == 'A2':
+                    edits.append((current_directory, file_name, "已编辑迁移表", "编辑Word文档时出错"))
+                elif handler == 'A5':
+                    edits.append((current_directory, file_name, "已编辑申请表", "编辑Word文档时出错"))
 
+        tasks = [('edt_docx', (directory, file_name)) for directory, file_name, _, _ in edits]
+        for (_, file_name, done_message, error_message), (_, error) in zip(edits, self._edit_documents(tasks, workers)):
+            if error is None:
+                self.log(f"{done_message}: {file_name}")
+            else:
+                self.log(f"{error_message}: {error}")
+
+        self._log_fs_calls("编辑Word文档")
         self.log("Word文档编辑完成")
         return True
     
-    def edt_A2_docx(self, target_dir: str, to_val_date: str, to_prod_date: str = ''):
-        """递归修改A2文档中的日期"""        
+    @_stage("设置迁移日期")
+    def edt_A2_docx(self, target_dir: str, to_val_date: str, to_prod_date: str = '', workers: int = 1):
+        """
+        递归修改A2文档中的日期。
+
+        日期已是目标值的文档不会重新保存（先用流式XML读取器检查，见 FileUtils.A2_dates_match），
+        重复设置同一日期时只需读取文档，文件修改时间保持不变。
+
+        参数:
+            workers: 并行进程数，大于1时使用进程池并行修改文档
+        """
         if not to_val_date:
             self.log("错误的迁移日期，工作终止")
             return False
@@ -263,110 +794,499 @@ class FileManipulator:
         if not to_prod_date:
             to_prod_date = to_val_date
         
-        # 遍历目标目录中的所有项目
-        for item in os.listdir(target_dir):
+        # 先收集目标目录（含子目录）中的所有A2文档，以便报告处理进度
+        with self.tracer.span("查找A2文档"):
+            a2_files = self._find_A2_files(target_dir)
+        tasks = [('edit_A2_docx', (directory, item, to_val_date, to_prod_date)) for directory, item in a2_files]
+        changed = unchanged = failed = 0
+        try:
+            for (_, item), (modified, error) in zip(a2_files, self._edit_documents(tasks, workers)):
+                if error is not None:
+                    failed += 1
+                    self.log(f"修改《{item}》时出错: {error}")
+                elif modified:
+                    changed += 1
+                    self.log(f"已修改: {item}")
+                else:
+                    unchanged += 1
+                    self.log(f"日期已是目标值，未修改: {item}")
+        except OperationCancelled:
+            self.log("日期设置已取消")
+            return False
+        finally:
+            self.log(f"共 {len(a2_files)} 个A2文档：已修改 {changed} 个，无需修改 {unchanged} 个，出错 {failed} 个")
+        self._log_fs_calls("设置迁移日期")
+        return True
+
+    def _find_A2_files(self, target_dir: str) -> list:
+        """按目录遍历顺序递归查找A2文档，返回 (所在目录, 文件名) 列表"""
+        a2_files = []
+        registry = FileUtils.registry()
+        for item, is_dir in self.snapshot.scandir(target_dir):
             item_path = os.path.join(target_dir, item)
             
-            if os.path.isdir(item_path):
+            if is_dir:
                 # 递归处理子目录
-                self.edt_A2_docx(item_path, to_val_date, to_prod_date)
-            else:
-                try:
-                    if "REC-Q680003-A2" in item:
-                        # 处理单个文件
-                        FileUtils.edit_A2_docx(target_dir, item, to_val_date, to_prod_date)
-                        self.log(f"已修改: {item}")
-                except Exception as e:
-                    self.log(f"修改《{item}》时出错: {e}")
-        return True
+                a2_files.extend(self._find_A2_files(item_path))
+            elif registry.form_handler(item) == 'A2':
+                a2_files.append((target_dir, item))
+        return a2_files
+
+    def _find_form_documents(self, handler: str, extension: str) -> list:
+        """递归查找 form_types 中使用指定处理方式（'A2' 或 'A5'）的表单文档"""
+        registry = FileUtils.registry()
+        return FileUtils.find_files_by_name(
+            self.str_newpath, '', extension, snapshot=self.snapshot,
+            match=lambda name: registry.form_handler(name) == handler)
+
+    @staticmethod
+    def export_rows(reader_name: str, result) -> list:
+        """解析结果在各导出文件中的数据行，与 EXPORT_OUTPUTS[reader_name] 中的输出一一对应"""
+        if reader_name == 'read_A2':
+            return [result or []]
+        # A5：表1为一行，表2为多行（添加结果有效性检查）
+        result = result or []
+        return [[result[0]] if len(result) >= 1 and result[0] else [],
+                result[1] if len(result) >= 2 and result[1] else []]
+
+    def _resolve_export_format(self, fmt: str) -> str:
+        """检查导出格式，选择 parquet 但未安装 pyarrow 时退回 csv"""
+        if fmt != 'parquet':
+            return 'csv'
+        from parquet_stream import ParquetStreamWriter
+
+        if not ParquetStreamWriter.available():
+            self.log("未安装 pyarrow，无法导出Parquet，将导出为CSV。")
+            return 'csv'
+        return fmt
+
+    def _open_export_output(self, output_csv: str, prefix: str, timestamp: str, title: list, types: list = None,
+                            fmt: str = 'csv', compress: bool = False, resume: bool = False,
+                            resumable: bool = True):
+        """
+        创建流式导出输出；CSV 在 resume 为 True 时优先继续同一源目录上次中断的导出。
+
+        参数:
+            prefix: 文件名前缀，例如 'A2'、'A5_tb1'
+            types: 各列的类型（Parquet 使用），见 ParquetStreamWriter
+            fmt: 'csv' 或 'parquet'（需先经过 _resolve_export_format 检查）
+            resumable: 为 False 时 CSV 不写检查点（每次整体重写的输出，不能继续导出或 export-finalize）
+        """
+        if fmt == 'parquet':
+            from parquet_stream import ParquetStreamWriter
+
+            return ParquetStreamWriter(os.path.join(output_csv, f"{prefix}_{timestamp}.parquet"), title, types)
+
+        from csv_stream import CsvStreamWriter
+
+        source = os.path.abspath(self.str_newpath)
+        if resume:
+            for path in CsvStreamWriter.pending_outputs(output_csv, prefix):
+                writer = CsvStreamWriter.resume(path)
+                if writer is not None and writer.meta.get('source') == source and writer.compress == compress:
+                    self.log(f"继续上次中断的导出: {path}（已完成 {len(writer.done)} 个文档，{writer.rows} 条数据）")
+                    if writer.discarded:
+                        self.log(f"有文档在中断后被修改或删除，{writer.discarded} 个文档将重新导出")
+                    return writer
+
+        path = os.path.join(output_csv, f"{prefix}_{timestamp}.csv" + (".gz" if compress else ""))
+        return CsvStreamWriter(path, title, compress, {'source': source}, resumable)
+
+    def _abort_export_outputs(self, writers: list, keep: bool):
+        """导出取消或出错时关闭输出；keep 为 True 时保留已导出的部分（仅CSV），以便继续导出"""
+        kept = False
+        for writer in writers:
+            try:
+                kept = writer.abort(keep) or kept
+            except Exception as e:
+                self.log(f"保存导出断点时出错: {e}")
+        if kept:
+            self.log("已导出的数据已保存为 .partial 文件，再次导出时将从断点继续。")
+
+    def _log_invalid_dates(self, writer):
+        """Parquet 导出时报告无法识别为日期的单元格数量"""
+        for column, count in getattr(writer, 'invalid', {}).items():
+            if count:
+                self.log(f"警告: 有 {count} 个“{column}”无法识别为日期，已保存为空值")
+
+    @_stage("导出A2数据")
+    def read_A2_to_csv(self, output_csv, workers: int = 1, backend: str = 'docx', cache_path: str = None,
+                       compress: bool = False, resume: bool = False, fmt: str = 'csv', sniff: bool = False):
+        """
+        导出A2数据为CSV（或Parquet）。
+
+        每个文档解析后立即写入CSV，内存占用与文档数量无关；导出过程中定期写入检查点，
+        中断后已导出的数据保留在 .partial 文件中。
 
-    def read_A2_to_csv(self,output_csv):
-        # 初始化数据存储
-        all_data = []
+        参数:
+            output_csv: CSV输出目录
+            workers: 并行进程数，大于1时使用进程池并行解析文档
+            backend: 文档解析方式，见 FileUtils.iter_tables
+            cache_path: 增量导出缓存文件路径，为空时不使用缓存
+            compress: 是否输出gzip压缩的CSV（.csv.gz）
+            resume: 是否继续上次中断的导出（跳过已导出的文档）
+            fmt: 输出格式，'csv' 或 'parquet'（需要 pyarrow，两个日期列保存为日期类型）
+            sniff: 是否在解析前快速检查文档（是否有'数据包名称'表格），跳过必然没有数据的文档
+        """
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-        a2_csv_path = os.path.join(output_csv,f"A2_{timestamp}.csv")
+        fmt = self._resolve_export_format(fmt)
+        label = 'Parquet' if fmt == 'parquet' else 'CSV'
 
-        name_contains='REC-Q680003-A2'
         extension='docx'
 
         self.log(f"开始在目录 '{self.str_newpath}' 中查找A2文档...") 
-        pathes = FileUtils.find_files_by_name(self.str_newpath,name_contains,extension)
+        with self.tracer.span("查找A2文档"):
+            pathes = self._find_form_documents('A2', extension)
         self.log(f"共找到 {len(pathes)} 个A2文档。") 
 
-        # 处理每个文档并收集数据
-        total = len(pathes)
-        for i, path_a2 in enumerate(pathes): 
-            self.log(f"正在处理第 {i+1}/{total} 个文件: {os.path.basename(path_a2)}") 
-            a2_data = FileUtils.read_A2(path_a2)
-            if a2_data:
-                all_data.extend(a2_data)
-        
-        # 写入CSV文件
-        if all_data:
-            title=['包名称', '记录名称', '迁移验证环境日期', '迁移正式环境日期']
-            self.log(f"开始将 {len(all_data)} 条数据写入到 {a2_csv_path}")
-            FileUtils.write_to_csv(all_data, a2_csv_path,title)
-            self.log(f"成功生成CSV文件: {a2_csv_path}")
+        (prefix, title, types), = self.EXPORT_OUTPUTS['read_A2']
+        writer = self._open_export_output(output_csv, prefix, timestamp, title, types, fmt, compress, resume)
+        remaining = [path for path in pathes if os.path.abspath(path) not in writer.done]
+
+        # 逐个处理文档并写入CSV
+        cache = self._open_export_cache(cache_path)
+        try:
+            for path_a2, a2_data in self._extract_documents('read_A2', remaining, workers, backend, cache, sniff):
+                rows, = self.export_rows('read_A2', a2_data)
+                writer.write_document(os.path.abspath(path_a2), rows)
+        except OperationCancelled:
+            self._abort_export_outputs([writer], keep=True)
+            self.log("导出已取消。")
+            return False
+        except Exception:
+            self._abort_export_outputs([writer], keep=True)
+            raise
+        finally:
+            self._close_export_cache(cache, 'read_A2', pathes)
+
+        rows = writer.finalize()
+        self.tracer.record_file_io(written_path=writer.path)
+        if rows:
+            self.log(f"已将 {rows} 条数据写入到 {writer.path}")
+            self._log_invalid_dates(writer)
+            self.log(f"成功生成{label}文件: {writer.path}")
         else:
-            self.log("未找到有效数据，未生成CSV文件。")
+            self.log(f"未找到有效数据，未生成{label}文件。")
+        return True
 
-    def read_A5_to_csv(self,output_csv):
-        name_contains = "REC-Q680003-A5"
+    @_stage("导出A5数据")
+    def read_A5_to_csv(self, output_csv, workers: int = 1, backend: str = 'docx', cache_path: str = None,
+                       compress: bool = False, resume: bool = False, fmt: str = 'csv', sniff: bool = False):
+        """
+        导出A5数据的表1和表2为CSV（或Parquet），两个表分别保存为单独的文件。
+
+        参数:
+            output_csv: CSV输出目录
+            workers: 并行进程数，大于1时使用进程池并行解析文档
+            backend: 文档解析方式，见 FileUtils.iter_tables
+            cache_path: 增量导出缓存文件路径，为空时不使用缓存
+            compress: 是否输出gzip压缩的CSV（.csv.gz）
+            resume: 是否继续上次中断的导出（跳过已导出的文档）
+            fmt: 输出格式，'csv' 或 'parquet'（需要 pyarrow）
+            sniff: 是否在解析前快速检查文档（表格数量），跳过必然没有数据的文档
+        """
         extension = "docx"
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-        # 修改文件路径定义
-        a5_tb1_path = os.path.join(
-            output_csv, 
-            f"A5_tb1_{timestamp}.csv"  # 添加时间戳
-        )
-        a5_tb2_path = os.path.join(
-            output_csv, 
-            f"A5_tb2_{timestamp}.csv"  # 添加时间戳
-        )
+        fmt = self._resolve_export_format(fmt)
+        label = 'Parquet' if fmt == 'parquet' else 'CSV'
 
         self.log(f"开始在目录 '{self.str_newpath}' 中查找A5文档...") 
-        pathes = FileUtils.find_files_by_name(self.str_newpath, name_contains, extension)
+        with self.tracer.span("查找A5文档"):
+            pathes = self._find_form_documents('A5', extension)
         self.log(f"共找到 {len(pathes)} 个A5文档。") 
         
-        # 准备收集数据的列表
-        all_tb1_data = []  # 存储所有文档的tb1数据
-        all_tb2_data = []  # 存储所有文档的tb2数据
-        
-        # 定义CSV表头
-        tb1_title = ['包名称', '理由', '相关文件']
-        tb2_title = ['包名称', '记录名称', '操作类型', '分类','风险评估']
+        # 表1、表2分别写入各自的文件（文件名中添加时间戳）
+        writers = [self._open_export_output(output_csv, prefix, timestamp, title, types, fmt, compress, resume)
+                   for prefix, title, types in self.EXPORT_OUTPUTS['read_A5']]
+        tb1_writer, tb2_writer = writers
+        remaining = [path for path in pathes
+                     if not all(os.path.abspath(path) in writer.done for writer in writers)]
 
-        total = len(pathes)
-        for i, path_a5 in enumerate(pathes):
-            self.log(f"正在处理第 {i+1}/{total} 个文件: {os.path.basename(path_a5)}")            
-            try:
-                # 获取当前文档的数据
-                result = FileUtils.read_A5(path_a5)
-                
-                # 添加结果有效性检查
-                if len(result) >= 1 and result[0]:
-                    all_tb1_data.append(result[0])
-                    
-                if len(result) >= 2 and result[1]:
-                    all_tb2_data.extend(result[1])
-                    
-            except Exception as e:
-                self.log(f"处理文件 {path_a5} 时发生未捕获错误: {str(e)}")
-                continue  # 继续处理下一个文件
-        
-        # 写入CSV文件
-        if all_tb1_data:
-           FileUtils.write_to_csv(all_tb1_data, a5_tb1_path, tb1_title)
-           self.log(f"成功生成A5表1的CSV文件: {a5_tb1_path}") 
+        cache = self._open_export_cache(cache_path)
+        try:
+            for path_a5, result in self._extract_documents('read_A5', remaining, workers, backend, cache, sniff):
+                key = os.path.abspath(path_a5)
+                for writer, rows in zip(writers, self.export_rows('read_A5', result)):
+                    writer.write_document(key, rows)
+        except OperationCancelled:
+            self._abort_export_outputs(writers, keep=True)
+            self.log("导出已取消。")
+            return False
+        except Exception:
+            self._abort_export_outputs(writers, keep=True)
+            raise
+        finally:
+            self._close_export_cache(cache, 'read_A5', pathes)
+
+        tb1_rows, tb2_rows = tb1_writer.finalize(), tb2_writer.finalize()
+        for writer in writers:
+            self.tracer.record_file_io(written_path=writer.path)
+
+        if tb1_rows:
+           self.log(f"成功生成A5表1的{label}文件: {tb1_writer.path}") 
         else:
             self.log("警告: 没有收集到表1数据")
         
-        if all_tb2_data:
-            FileUtils.write_to_csv(all_tb2_data, a5_tb2_path, tb2_title)
-            self.log(f"成功生成A5表2的CSV文件: {a5_tb2_path}")
+        if tb2_rows:
+            self.log(f"成功生成A5表2的{label}文件: {tb2_writer.path}")
         else:
             self.log("警告: 没有收集到表2数据")
+        return True
     
+    def watch_exports(self, output_dir: str, kinds=('A2', 'A5'), workers: int = 1, backend: str = 'docx',
+                      cache_path: str = None, compress: bool = False, fmt: str = 'csv', sniff: bool = False,
+                      poll: bool = False, interval: float = None):
+        """
+        监视模式：先完整导出一次，之后文档变化时只重新解析变化的文档，并更新固定文件名的
+        导出文件（A2_latest.csv 等），直到请求取消。详见 ExportWatcher。
+
+        参数:
+            output_dir: 导出文件目录
+            kinds: 要导出的文档类型，'A2' 和/或 'A5'
+            poll: 为 True 时定时扫描目录，否则在安装了 watchdog 时使用文件变化通知
+            interval: 定时扫描的间隔（秒）
+            其余参数与 read_A2_to_csv 相同
+        """
+        from export_watch import ExportWatcher
+
+        watcher = ExportWatcher(self, output_dir, kinds, workers, backend, cache_path, compress, fmt, sniff)
+        return watcher.run(poll, interval)
+
+    @_stage("计算执行计划")
+    def plan_operations(self):
+        """
+        计算文件生成操作的执行计划，不修改文件系统。
+
+        计划与依次执行 cp_files、del_files、ren_files、edt_docx 得到的目标目录结构相同：
+        类别文件夹编号加一，文件名中的编号递增，~$ 临时文件不复制，
+        类别文件夹中的子文件夹（证据等）只创建空目录，封面、A2、A5文档标记为需要修改。
+
+        返回:
+            OperationPlan；源目录不存在时返回 None
+        """
+        self.log("开始计算执行计划...")
+        str_oldpath = self.str_oldpath
+        snapshot = self.snapshot
+
+        # 检查源目录是否存在
+        if not snapshot.isdir(str_oldpath):
+            self.log(f"源目录不存在：{str_oldpath}")
+            return None
+
+        files = snapshot.listdir(str_oldpath)
+        numbers = self._allocate_numbers(files)
+
+        plan = OperationPlan(str_oldpath, self.str_newpath)
+        registry = FileUtils.registry()
+        steps = {}  # 类别 -> 编号递增的数值
+        for key, (value, new_code) in numbers.items():
+            # 在新文件名中增加索引数字
+            step = steps[key] = int(new_code) - int(value)
+
+            # 源文件夹和目标文件夹路径
+            source_folder = os.path.join(str_oldpath, f"{key}-{value}")
+            target_folder = os.path.join(self.str_newpath, f"{key}-{new_code}")
+
+            # 检查源文件夹是否存在
+            if not snapshot.isdir(source_folder):
+                self.log(f"源文件夹不存在：{source_folder}")
+                continue
+
+            folder = PlannedFolder(source_folder, target_folder)
+            for item_name, is_dir in snapshot.scandir(source_folder):
+                item_path = os.path.join(source_folder, item_name)
+
+                if item_name.startswith('~$'):
+                    # 临时文件不复制
+                    plan.skipped.append(item_path)
+                elif is_dir:
+                    # 子文件夹（证据等）只保留空目录，其中的内容不复制
+                    folder.subfolders.append(item_name)
+                    plan.skipped.append(item_path)
+                else:
+                    # 设置分隔符  括号
+                    start_bracket = '(' if item_name.find('(') != -1 else '（'
+                    end_bracket = ')' if item_name.find(')') != -1 else '）'
+
+                    new_file_name = FileUtils.increment_filename_number(item_name, start_bracket, end_bracket, step)
+                    edit = registry.form_handler(new_file_name) is not None
+                    folder.files.append(PlannedFile(item_path, target_folder, new_file_name, edit, step))
+            plan.folders.append(folder)
+
+        # 封面文件
+        for f_name in files:
+            source_file = os.path.join(str_oldpath, f_name)
+            if snapshot.isdir(source_file):
+                continue
+            # 封面文件名为 类别-编号.docx，编号与所属类别一同递增
+            category = os.path.splitext(f_name)[0].rpartition('-')[0]
+            new_file_name = FileUtils.increment_filename_number(f_name, step=steps.get(category, 1))
+            plan.cover_files.append(PlannedFile(source_file, self.str_newpath, new_file_name,
+                                                FileUtils.is_editable_docx(new_file_name)))
+
+        self.log(f"执行计划：{plan.summary()}")
+        return plan
+
+    @_stage("生成文件")
+    def apply_plan(self, plan: OperationPlan, workers: int = 1, copy_workers: int = 0, resume: bool = False):
+        """
+        一次遍历执行计划：每个文件只以最终文件名写入一次，需要修改的文档在复制时直接修改后保存。
+
+        执行过程记录在目标目录的进度日志中（见 PipelineJournal），全部完成后删除。
+
+        参数:
+            workers: 修改文档的并行进程数
+            copy_workers: 复制其余文件的并行线程数，0 表示自动，见 CopyEngine
+            resume: 目标目录中有同一执行计划未完成的进度日志时，保留目标目录并跳过已完成的文件；
+                    否则（与之前相同）将已存在的目标目录重命名后重新生成
+        """
+        from copy_engine import CopyEngine
+        from pipeline_journal import PipelineJournal
+
+        self.log("开始按计划生成文件...")
+        snapshot = self.snapshot
+        journal = PipelineJournal.resume(plan) if resume and snapshot.isdir(self.str_newpath) else None
+        resuming = journal is not None
+        if resuming:
+            self.log(f"目标目录中有未完成的生成进度，将从中断处继续（已完成 {len(journal.done)} 个文件）")
+            if journal.failed:
+                self.log(f"上次修改失败、按原内容复制的 {len(journal.failed)} 个文档将重新修改")
+            snapshot.add_dir(self.str_newpath)
+        else:
+            self._prepare_target_dir()
+            journal = PipelineJournal.create(plan)
+            snapshot.add_file(journal.path)
+
+        try:
+            total = plan.file_count()
+            done = 0
+            created = []
+            copies = []  # (源路径, 目标路径, 是否保留源文件时间, 计划中的文件)，由复制引擎并行复制
+            edits = []   # (计划中的文件, 是否保留源文件时间)，在复制完其他文件后统一（并行）修改
+            with self.tracer.span("创建目录"):
+                for folder in plan.folders:
+                    try:
+                        os.makedirs(folder.target, exist_ok=resuming)
+                        snapshot.add_dir(folder.target, empty=not resuming)
+                        for name in folder.subfolders:
+                            subfolder = os.path.join(folder.target, name)
+                            os.makedirs(subfolder, exist_ok=resuming)
+                            snapshot.add_dir(subfolder, empty=not resuming)
+                            self.log(f"已创建空文件夹: {subfolder}")
+                    except Exception as e:
+                        self.log(f"创建文件夹时出错: {e}")
+                        total -= len(folder.files)
+                        continue
+                    created.append(folder)
+
+                    for planned in folder.files:
+                        if planned.edit:
+                            edits.append((planned, True))
+                        else:
+                            copies.append((planned.source, planned.target, True, planned))
+
+            # 封面文件的时间戳设置为当前时间
+            for planned in plan.cover_files:
+                if planned.edit:
+                    edits.append((planned, False))
+                else:
+                    copies.append((planned.source, planned.target, False, planned))
+
+            if journal.done:
+                # 跳过之前的运行中已完成的文件
+                pending = len(copies) + len(edits)
+                copies = [job for job in copies if not self._resume_done(journal, job[3])]
+                edits = [edit for edit in edits if not self._resume_done(journal, edit[0])]
+                done = pending - len(copies) - len(edits)
+                self.log(f"跳过已完成的文件 {done} 个，剩余 {len(copies) + len(edits)} 个")
+                self.report_progress(done, total)
+
+            engine = CopyEngine(copy_workers)
+            with self.tracer.span("复制文件"):
+                copied = engine.copy_files(copies)
+                try:
+                    for (_, _, _, planned), error in copied:
+                        self.check_cancelled()
+                        done += 1
+                        self.report_progress(done, total)
+                        self._log_planned_copy(planned, error)
+                        if error is None:
+                            journal.record(planned)
+                finally:
+                    copied.close()
+
+            # 需要修改的文档：读取源文件，修改后直接保存到最终位置
+            with self.tracer.span("修改文档"):
+                tasks = [('edt_docx', (planned.target_dir, planned.name, planned.source, planned.step))
+                         for planned, _ in edits]
+                results = self._edit_documents(tasks, workers)
+                try:
+                    for (planned, preserve_times), (_, error) in zip(edits, results):
+                        done += 1
+                        self.report_progress(done, total)
+                        if error is not None:
+                            self.log(f"编辑Word文档时出错: {error}，将按原内容复制")
+                            try:
+                                engine.copy_file(planned.source, planned.target, preserve_times)
+                                error = None
+                            except Exception as e:
+                                error = e
+                            self._log_planned_copy(planned, error)
+                            # 记为修改失败，继续生成时重新修改，而不是当作未处理或已完成
+                            journal.record(planned, failed=True)
+                            continue
+                        try:
+                            shutil.copymode(planned.source, planned.target)
+                        except OSError:
+                            pass
+                        snapshot.add_file(planned.target)
+                        journal.record(planned)
+                        self.log(f"已复制并编辑: {os.path.basename(planned.source)} -> {planned.name}")
+                finally:
+                    results.close()
+
+            with self.tracer.span("设置文件夹属性"):
+                for folder in created:
+                    # 复制文件夹属性并设置时间戳
+                    try:
+                        shutil.copystat(folder.source, folder.target)
+                        os.utime(folder.target, (time.time(), time.time()))
+                    except Exception as e:
+                        self.log(f"设置文件夹属性时出错: {e}")
+                    self.log(f"已生成: {folder.source} -> {folder.target}")
+
+            if engine.files:
+                self.log(engine.summary())
+                self._record_copy_io(engine)
+        finally:
+            # 未完成（出错或取消）时保留进度日志，再次生成时从中断处继续
+            journal.close()
+        journal.complete()
+        snapshot.remove(journal.path)
+        self._log_fs_calls("生成文件")
+        self.log("文件生成完成")
+        return True
+
+    def _resume_done(self, journal, planned: PlannedFile) -> bool:
+        """文件是否已在之前中断的运行中完成（是则记入目录快照）"""
+        if not journal.is_done(planned):
+            return False
+        self.snapshot.add_file(planned.target)
+        return True
+
+    def _record_copy_io(self, engine):
+        """将复制引擎复制的数据量计入性能统计"""
+        self.tracer.count('bytes_read', engine.bytes)
+        self.tracer.count('bytes_written', engine.bytes)
+
+    def _log_planned_copy(self, planned: PlannedFile, error):
+        """记录计划中的一个文件按原内容复制的结果"""
+        if error is None:
+            self.snapshot.add_file(planned.target)
+            self.log(f"已复制: {os.path.basename(planned.source)} -> {planned.name}")
+        else:
+            self.log(f"复制文件时出错: {error}")
+
     def get_directory_tree(self, path: str, indent=0):
         """
         获取指定路径下的文件树结构。
@@ -375,40 +1295,49 @@ class FileManipulator:
         :return: 目录树字符串
         """
         tree = ""
+        # 每个目录检查一次取消请求（目录很大时可以在界面上取消）
+        self.check_cancelled()
         try:
-            for entry in os.listdir(path):
+            for entry, is_dir in self.snapshot.scandir(path):
                 entry_path = os.path.join(path, entry)
-                if os.path.isfile(entry_path):
-                    tree += ' ' * indent + '|-- ' + entry + '\n'
-                elif os.path.isdir(entry_path):
-                    tree += ' ' * indent + '|-- ' + entry + '\n'
+                tree += ' ' * indent + '|-- ' + entry + '\n'
+                if is_dir:
                     tree += self.get_directory_tree(entry_path, indent + 4)
+        except OperationCancelled:
+            raise
         except Exception as e:
             self.log(f"获取目录树时出错: {e}")
         return tree
 
-    def execute_operations(self):
+    @_stage("文件生成流程")
+    def execute_operations(self, workers: int = 1, copy_workers: int = 0, resume: bool = False):
+        """
+        执行文件生成流程：计算执行计划后一次遍历完成复制、重命名和文档修改。
+
+        参数:
+            workers: 修改文档的并行进程数
+            copy_workers: 复制文件的并行线程数，0 表示自动
+            resume: 是否从上次中断处继续生成，见 apply_plan
+        """
         self.log("=" * 50)
         self.log("开始执行文件操作流程")
         self.log("=" * 50)
         
-        if not self.cp_files():
-            self.log("文件复制失败，中止操作")
-            return False
-            
-        if not self.del_files():
-            self.log("文件删除失败，中止操作")
-            return False
-            
-        if not self.ren_files():
-            self.log("文件重命名失败，中止操作")
-            return False
-            
-        if not self.edt_docx():
-            self.log("文件编辑失败，中止操作")
+        try:
+            # 先计算最终的目标目录结构，再一次遍历完成复制、重命名和文档修改
+            plan = self.plan_operations()
+            if plan is None:
+                self.log("执行计划计算失败，中止操作")
+                return False
+
+            if not self.apply_plan(plan, workers, copy_workers, resume):
+                self.log("文件生成失败，中止操作")
+                return False
+        except OperationCancelled:
+            self.log("操作已取消，已完成的步骤不会回滚")
             return False
             
         self.log("=" * 50)
         self.log("所有操作成功完成")
         self.log("=" * 50)
-        return True
\ No newline at end of file
+        return True
@@ -2,9 +2,10 @@ import re
 import os
 import json
 import sys
-import docx
-from docx.enum.text import WD_COLOR_INDEX
-import csv
+import itertools
+from tracer import get_tracer
+
+# python-docx、lxml、csv 在第一次处理文档时才导入（见各方法内的 import），缩短程序启动时间
 
 if __name__ == "__main__":
     # 当直接运行此脚本时初始化配置
@@ -23,16 +24,60 @@ class FileUtils:
         'Table Master', 'Table Template', 'Units', 'User Dialog', 'vendor', 'Stage'
     ]
 
+    # 表单编号 -> 处理方式（'A2' 或 'A5'），文件名中包含该编号的文档按对应的表单修改和导出
+    form_types = {
+        'REC-Q680003-A2': 'A2',
+        'REC-Q680003-A5': 'A5',
+    }
+    _registry = None  # 由 head_list 和 form_types 编译的 DocumentRegistry，见 registry()
+
+    # 修改文档后的保存方式：'patch' 只重写正文XML，其余部件原样复制；'docx' 使用 python-docx 完整保存
+    save_backend = 'patch'
+
+    # 生成文件时模板缓存的内存上限（MB），0 表示不缓存，见 template_cache()
+    template_cache_mb = 64
+    _template_cache = None
+
+    @classmethod
+    def registry(cls):
+        """根据文件名判断文档类型的分派表（head_list 或 form_types 变化后自动重新编译）"""
+        registry = cls._registry
+        if registry is None or not registry.compiled_from(cls.head_list, cls.form_types):
+            from doc_registry import DocumentRegistry
+            registry = cls._registry = DocumentRegistry(cls.head_list, cls.form_types)
+        return registry
+
     @staticmethod
-    def get_config_path():
-        """获取配置文件路径（支持打包环境）"""
+    def get_app_dir():
+        """获取程序所在目录（支持打包环境）"""
         if getattr(sys, 'frozen', False):
             # 打包环境 - 使用exe所在目录
-            base_path = os.path.dirname(sys.executable)
-        else:
-            # 开发环境 - 使用脚本所在目录
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, 'config.json')
+            return os.path.dirname(sys.executable)
+        # 开发环境 - 使用脚本所在目录
+        return os.path.dirname(os.path.abspath(__file__))
+
+    @staticmethod
+    def get_config_path():
+        """获取配置文件路径（支持打包环境）"""
+        return os.path.join(FileUtils.get_app_dir(), 'config.json')
+
+    @staticmethod
+    def get_export_cache_path():
+        """获取导出缓存文件路径（与配置文件位于同一目录）"""
+        return os.path.join(FileUtils.get_app_dir(), 'export_cache.sqlite3')
+
+    @staticmethod
+    def get_numbering_registry_path():
+        """获取编号登记表文件路径（与配置文件位于同一目录）"""
+        return os.path.join(FileUtils.get_app_dir(), 'numbering.sqlite3')
+
+    @staticmethod
+    def get_trace_path(name: str):
+        """获取性能跟踪文件路径（程序目录下的 logs 目录，文件名包含任务名称和时间）"""
+        import datetime
+
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        return os.path.join(FileUtils.get_app_dir(), 'logs', f'trace_{name}_{timestamp}.json')
 
     @staticmethod
     def save_config(config):
@@ -49,51 +94,79 @@ class FileUtils:
         """从文件加载配置（支持打包环境）"""
         config = {
             'head_list': FileUtils.head_list,
+            'form_types': FileUtils.form_types,  # 表单编号 -> 处理方式（A2 或 A5），可添加新的表单编号
             'default_old_path': '',
             'default_new_path': '',
+            'export_workers': 0,  # 导出时的并行进程数，0表示使用全部CPU核心
+            'copy_workers': 0,  # 复制文件的并行线程数，0表示自动
+            'edit_workers': 0,  # 生成文件、设置日期时修改文档的并行进程数，0表示使用全部CPU核心
+            'read_backend': 'xml',  # 导出时的文档解析方式：xml（流式XML读取）或 docx（python-docx）
+            'export_cache': True,  # 导出时是否使用增量缓存，仅重新解析新增或变化的文档
+            'export_compress': False,  # 是否导出为gzip压缩的CSV（.csv.gz）
+            'export_format': 'csv',  # 导出格式：csv 或 parquet（需要安装 pyarrow）
+            'export_resume': True,  # 导出中断后再次导出时是否从断点继续
+            'export_sniff': True,  # 导出时是否先快速检查文档，跳过必然没有数据的文档
+            'generate_resume': True,  # 生成文件中断后再次生成到同一目标目录时是否从中断处继续
+            'batch_workers': 0,  # 批量任务（cli.py batch）共用的总进程数，0表示使用全部CPU核心
+            'numbering_registry': False,  # 是否由编号登记表分配新编号（多人同时生成时编号不重复）
+            'log_max_lines': 5000,  # 界面日志区域保留的最大行数，完整日志保存在 logs 目录
+            'trace': False,  # 是否记录各步骤和每个文档的耗时，任务结束时输出统计表并保存 Chrome trace 文件
+            'template_cache_mb': 64,  # 生成文件时缓存已解析模板的内存上限（MB），0表示不缓存
+            'docx_save': 'patch',  # 修改文档后的保存方式：patch（只重写正文XML）或 docx（python-docx 完整保存）
         }
         config_path = FileUtils.get_config_path()
         
         try:
+            # 配置文件不存在时直接使用默认配置，启动时不写入磁盘（保存配置时才创建文件）
             if os.path.exists(config_path):
                 with open(config_path, 'r', encoding='utf-8') as f:
                     loaded_config = json.load(f)
                     config.update(loaded_config)
-            else:
-                # 如果配置文件不存在，创建默认配置
-                FileUtils.save_config(config)
         except Exception as e:
             print(f"加载配置失败: {e}")
         
         return config
         
     @staticmethod
-    def recursively_delete_contents(folder_path):
+    def recursively_delete_contents(folder_path, snapshot=None):
         """
         递归删除文件夹内的所有内容。
 
         参数:
             folder_path (str): 要删除内容的文件夹路径。
+            snapshot (TreeSnapshot, optional): 目录树快照，提供时用其列目录并同步记录删除结果
 
         返回:
             None
         """
+        if snapshot is not None:
+            items = snapshot.scandir(folder_path)
+        else:
+            items = [(name, None) for name in os.listdir(folder_path)]
+
         # 遍历文件夹中的所有子项
-        for item_name in os.listdir(folder_path):
+        for item_name, is_dir in items:
             item_path = os.path.join(folder_path, item_name)
+            if is_dir is None:
+                is_dir = os.path.isdir(item_path)
+                if not is_dir and not os.path.isfile(item_path):
+                    continue
 
             # 检查是否为文件或文件夹
-            if os.path.isfile(item_path):
+            if not is_dir:
                 # 如果是文件，则删除
                 os.remove(item_path)
-            elif os.path.isdir(item_path):
+            else:
                 # 如果是文件夹，则递归删除该文件夹及内部所有内容
-                FileUtils.recursively_delete_contents(item_path)
+                FileUtils.recursively_delete_contents(item_path, snapshot)
                 # 删除空文件夹
                 os.rmdir(item_path)
 
+        if snapshot is not None:
+            snapshot.clear_dir(folder_path)
+
     @staticmethod
-    def increment_filename_number(filename: str, start_sep: str = '', end_sep: str = '') -> str:
+    def increment_filename_number(filename: str, start_sep: str = '', end_sep: str = '', step: int = 1) -> str:
         """
         文件名数字递增方法
         
@@ -101,6 +174,7 @@ class FileUtils:
             filename: 原始文件名
             start_sep: 起始定位字符串
             end_sep: 结束定位字符串
+            step: 递增的数值，默认加1（使用编号登记表分配的编号时可能大于1）
             
         返回:
             处理后的新文件名
@@ -138,10 +212,10 @@ class FileUtils:
         start_pos = match.start()
         end_pos = match.end()
         
-        # 转换为整数并+1
+        # 转换为整数并+step
         try:
             number_value = int(number_part)
-            new_number = number_value + 1
+            new_number = number_value + step
             new_number_str = str(new_number)
         except ValueError:
             return filename
@@ -175,6 +249,8 @@ class FileUtils:
     @staticmethod
     def run_paragraph(cells):
         """加红色底纹"""
+        from docx.enum.text import WD_COLOR_INDEX
+
         for cell in cells:
             for paragraph in cell.paragraphs:
                 for run in paragraph.runs:
@@ -182,7 +258,13 @@ class FileUtils:
         return
 
     @staticmethod
-    def find_files_by_name(search_path, name_contains:str, extension=None, exclude_temp=True):
+    def is_temp_file(name: str) -> bool:
+        """是否为常见的临时文件（Word锁定文件 ~$、.~ 开头的文件，.tmp/.temp 文件）"""
+        return name.startswith('~$') or name.startswith('.~') or name.endswith('.tmp') or name.endswith('.temp')
+
+    @staticmethod
+    def find_files_by_name(search_path, name_contains:str, extension=None, exclude_temp=True, snapshot=None,
+                           match=None):
         """
         查找指定路径下文件名包含特定字符的文件
         
@@ -191,6 +273,8 @@ class FileUtils:
         name_contains (str): 文件名需要包含的字符串
         extension (str, optional): 文件后缀名（如'txt'或'.txt'），默认None表示不限后缀
         exclude_temp (bool, optional): 是否排除临时文件，默认True（排除）
+        snapshot (TreeSnapshot, optional): 目录树快照，提供时复用已缓存的目录内容遍历
+        match (callable, optional): 判断文件名是否匹配的函数，提供时代替 name_contains
         
         返回:
         list: 匹配文件的完整路径列表
@@ -204,17 +288,15 @@ class FileUtils:
             normalized_extension = f".{extension.lstrip('.')}" if extension else ""
         
         # 遍历目录树
-        for root, _, files in os.walk(search_path):
+        walker = snapshot.walk(search_path) if snapshot is not None else os.walk(search_path)
+        for root, _, files in walker:
             for file in files:
                 # 检查是否临时文件（如果需要排除）
-                if exclude_temp:
-                    # 排除常见临时文件模式
-                    if file.startswith('~$') or file.startswith('.~') or \
-                    file.endswith('.tmp') or file.endswith('.temp'):
-                        continue
+                if exclude_temp and FileUtils.is_temp_file(file):
+                    continue
                 
                 # 检查文件名是否包含目标字符串
-                if name_contains in file:
+                if (match(file) if match is not None else name_contains in file):
                     file_path = os.path.join(root, file)
                     
                     # 检查后缀条件
@@ -228,18 +310,76 @@ class FileUtils:
         
         return matched_files
 
+    @classmethod
+    def template_cache(cls):
+        """当前进程中的模板缓存（template_cache_mb 为 0 时返回 None）"""
+        max_bytes = int(cls.template_cache_mb or 0) * 1048576
+        if max_bytes <= 0:
+            return None
+        cache = cls._template_cache
+        if cache is None:
+            from docx_patch import TemplateCache
+            cache = cls._template_cache = TemplateCache(max_bytes)
+        elif cache.max_bytes != max_bytes:
+            cache.resize(max_bytes)
+        return cache
+
     @staticmethod
-    def edt_docx(doc_path: str, doc_name: str):
-        file_path = os.path.join(doc_path, doc_name)
+    def open_docx(path: str, cached: bool = False):
+        """
+        打开要修改的文档，返回的对象提供 tables 属性和 save(path) 方法（见 save_backend）。
 
-        # 使用类变量head_list
-        if any(doc_name.startswith(head) for head in FileUtils.head_list):
+        参数:
+            cached: 是否使用模板缓存（只用于生成时反复读取的模板文件，仅 patch 保存方式）
+        """
+        if FileUtils.save_backend == 'patch':
+            from docx_patch import DocxPatcher
+            cache = FileUtils.template_cache() if cached else None
+            if cache is None:
+                return DocxPatcher.open(path)
+            hits = cache.hits
+            doc = cache.open(path)
+            get_tracer().count('template_cache_hit' if cache.hits > hits else 'template_cache_miss')
+            return doc
+        import docx
+        return docx.Document(path)
+
+    @staticmethod
+    def is_editable_docx(doc_name: str) -> bool:
+        """判断 edt_docx 是否会修改该文档（封面文件、A2或A5文档）"""
+        return FileUtils.registry().classify(doc_name) is not None
+
+    @staticmethod
+    def edt_docx(doc_path: str, doc_name: str, source_path: str = None, step: int = 1):
+        """
+        修改生成的封面、A2、A5文档内容。
+
+        参数:
+            doc_path: 文档所在目录
+            doc_name: 文档的（最终）文件名，封面内容和递增后的编号以此为准
+            source_path: 可选，从该文件读取原始内容并保存到 doc_path/doc_name，
+                         用于复制的同时完成修改，不必先复制再打开一次
+            step: A2、A5文档中编号递增的数值，与文件名中编号的递增量相同
+        """
+        from table_grid import TableGrid
+
+        file_path = os.path.join(doc_path, doc_name)
+        source_path = source_path or file_path
+        # 从模板生成时（source_path 与目标不同）使用模板缓存，再次生成时不必重新解析模板
+        cached = source_path != file_path
+        tracer = get_tracer()
+
+        # 按 head_list 和 form_types 判断文档类型
+        kind = FileUtils.registry().classify(doc_name)
+        if kind == 'cover':
             # 处理封面文件
-            doc = docx.Document(file_path)
-            tab = doc.tables[0]
+            t = tracer.start()
+            doc = FileUtils.open_docx(source_path, cached)
+            t = tracer.phase('open', t)
+            grid = TableGrid(doc.tables[0])
 
             # 获取目标单元格
-            target_cell = tab.rows[2].cells[0]
+            target_cell = grid.cell(2, 0)
 
             # 保存原始格式的文本运行(runs)
             original_runs = target_cell.paragraphs[0].runs.copy()
@@ -264,67 +404,107 @@ class FileUtils:
             else:
                 # 如果没有原始运行，直接添加文本
                 new_paragraph.add_run(doc_name.replace(".docx", ""))
+            t = tracer.phase('modify', t)
             doc.save(file_path)
-        elif "REC-Q680003-A2" in doc_name:
+            tracer.phase('save', t)
+        elif kind == 'A2':
             # 如果是"REC-Q680003-A2-01  LIMS数据迁移表单"
-            doc = docx.Document(file_path)
+            t = tracer.start()
+            doc = FileUtils.open_docx(source_path, cached)
+            t = tracer.phase('open', t)
             tables = doc.tables
 
             for tab in tables:
-                if tab.rows and "数据包名称" in tab.rows[0].cells[0].text:
+                grid = TableGrid(tab)
+                if len(grid) and "数据包名称" in grid.text(0, 0):
                     # 修改表头
-                    new_text = FileUtils.increment_filename_number(tab.rows[0].cells[1].text)
-                    tab.rows[0].cells[1].text = new_text
+                    new_text = FileUtils.increment_filename_number(grid.text(0, 1), step=step)
+                    grid.set_text(0, 1, new_text)
                 else:
-                    for t_row in tab.rows:
-                        if t_row.cells and FileUtils.is_str_number(t_row.cells[0].text):
+                    for r in range(len(grid)):
+                        if grid.cells(r) and FileUtils.is_str_number(grid.text(r, 0)):
                             # 添加红色底纹
-                            FileUtils.run_paragraph(t_row.cells)
+                            FileUtils.run_paragraph(grid.cells(r))
+            t = tracer.phase('modify', t)
             doc.save(file_path)
+            tracer.phase('save', t)
 
-        elif "REC-Q680003-A5" in doc_name:
+        elif kind == 'A5':
             # 如果是"REC-Q680003-A5-01  LIMS主数据申请表"
-            doc = docx.Document(file_path)
+            t = tracer.start()
+            doc = FileUtils.open_docx(source_path, cached)
+            t = tracer.phase('open', t)
             tables = doc.tables
-            rows = tables[0].rows
+            grid = TableGrid(tables[0])
             rows_index = [2, 3, 5, 7]  # 添加红色底纹的行
             
-            new_text = FileUtils.increment_filename_number(rows[0].cells[2].text)
-            rows[0].cells[2].text = new_text
+            new_text = FileUtils.increment_filename_number(grid.text(0, 2), step=step)
+            grid.set_text(0, 2, new_text)
             
             for r in rows_index:
-                if len(rows) > r:
-                    FileUtils.run_paragraph(rows[r].cells)
+                if len(grid) > r:
+                    FileUtils.run_paragraph(grid.cells(r))
 
             if len(tables) > 2:
-                for t_row in tables[2].rows:
-                    if t_row.cells and t_row.cells[0].text == new_text:
-                        FileUtils.run_paragraph(t_row.cells)
+                records = TableGrid(tables[2])
+                for r in range(len(records)):
+                    if records.cells(r) and records.text(r, 0) == new_text:
+                        FileUtils.run_paragraph(records.cells(r))
 
+            t = tracer.phase('modify', t)
             doc.save(file_path)
+            tracer.phase('save', t)
+        else:
+            return
+
+        if tracer.enabled:
+            tracer.record_file_io(source_path, file_path)
 
     @staticmethod
-    def edit_A2_docx(current_directory: str, file_name: str, to_val_date: str, to_prod_date: str):
-        """批量修改迁移日期"""
+    def edit_A2_docx(current_directory: str, file_name: str, to_val_date: str, to_prod_date: str,
+                     skip_unchanged: bool = True) -> bool:
+        """
+        批量修改迁移日期。
+
+        参数:
+            skip_unchanged: 所有日期已是目标值时不修改、不保存文档（修改时间保持不变）
+
+        返回:
+            bool: 是否修改并保存了文档
+        """
+        from table_grid import TableGrid
+
         file_path = os.path.join(current_directory, file_name)
-        doc = docx.Document(file_path)
+        tracer = get_tracer()
+        if tracer.enabled:
+            tracer.record_file_io(read_path=file_path)
+        t = tracer.start()
+        if skip_unchanged:
+            unchanged = FileUtils.A2_dates_match(file_path, to_val_date, to_prod_date)
+            t = tracer.phase('check', t)
+            if unchanged:
+                return False
+        doc = FileUtils.open_docx(file_path)
+        t = tracer.phase('open', t)
         tables = doc.tables
 
         for tab in tables:
-            if tab.rows and "数据包名称" in tab.rows[0].cells[0].text:
+            grid = TableGrid(tab)
+            if len(grid) and "数据包名称" in grid.text(0, 0):
                 continue
                 
-            for t_row in tab.rows:
-                if not t_row.cells:
+            for r in range(len(grid)):
+                cells = grid.cells(r)
+                if not cells:
                     continue
                     
-                if FileUtils.is_str_number(t_row.cells[0].text):
-                    if len(t_row.cells) < 5:
+                if FileUtils.is_str_number(grid.text(r, 0)):
+                    if len(cells) < 5:
                         continue
                         
                     # 获取单元格引用
-                    val_data_cell = t_row.cells[3]
-                    prod_data_cell = t_row.cells[4]
+                    val_data_cell = cells[3]
+                    prod_data_cell = cells[4]
                     
                     # 处理验证日期单元格
                     # 保存原始段落格式
@@ -376,37 +556,93 @@ class FileUtils:
                         prod_run.font.name = base_run.font.name
                         prod_run.font.size = base_run.font.size
 
+                    grid.invalidate(val_data_cell)
+                    grid.invalidate(prod_data_cell)
+
+        t = tracer.phase('modify', t)
         # 统一保存文档
         doc.save(file_path)
+        tracer.phase('save', t)
+        if tracer.enabled:
+            tracer.record_file_io(written_path=file_path)
+        return True
 
     @staticmethod
-    def read_A2(path_a2: str) -> list:
+    def A2_dates_match(path: str, to_val_date: str, to_prod_date: str) -> bool:
+        """
+        检查A2文档中所有编号行的两个日期是否已是目标值（与 edit_A2_docx 修改的单元格相同）。
+
+        使用流式XML读取器只读取表格文本，不加载完整文档；无法读取时返回 False，
+        由 edit_A2_docx 按原方式打开文档并报告错误。
+        """
+        from docx_reader import XmlTableReader
+
+        try:
+            for rows in XmlTableReader.iter_tables(path):
+                if rows and "数据包名称" in rows[0][0]:
+                    continue
+                for cells in rows:
+                    if cells and FileUtils.is_str_number(cells[0]) and len(cells) >= 5:
+                        if cells[3] != to_val_date or cells[4] != to_prod_date:
+                            return False
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def iter_tables(path: str, backend: str = 'docx'):
+        """
+        逐个产出文档中各表格的单元格文本。
+
+        参数:
+            path: .docx 文件路径
+            backend: 'docx' 使用 python-docx 解析；'xml' 使用轻量级的流式XML读取器
+
+        产出:
+            list: 表格的行列表，每行为 row.cells 各单元格文本组成的列表
+        """
+        if backend == 'xml':
+            from docx_reader import XmlTableReader
+            yield from XmlTableReader.iter_tables(path)
+            return
+
+        import docx
+        from table_grid import TableGrid
+
+        doc = docx.Document(path)
+        for tab in doc.tables:
+            yield TableGrid(tab).texts()
+
+    @staticmethod
+    def read_A2(path_a2: str, backend: str = 'docx') -> list:
         put_list=[]
         try:
-            doc = docx.Document(path_a2)
-            tbs = doc.tables
+            tables = FileUtils.iter_tables(path_a2, backend)
             
             # 查找包含"数据包名称"的表格
-            pack_name_table_idx = None
-            for tb_idx, tab in enumerate(tbs):
+            pack_name_rows = None
+            for rows in tables:
                 try:
-                    if "数据包名称" in tab.cell(0, 0).text.strip() :
-                        pack_name_table_idx = tb_idx
+                    if "数据包名称" in rows[0][0].strip() :
+                        pack_name_rows = rows
                         break
                 except IndexError:
                     continue
             
-            if pack_name_table_idx is None:
+            if pack_name_rows is None:
                 print(f"在文档 {os.path.basename(path_a2)} 中未找到'数据包名称'表格")
                 return
             
-            target_table = tbs[pack_name_table_idx +1]
-            package_name = tbs[pack_name_table_idx].cell(0, 1).text.strip()
+            # 目标表格紧跟在"数据包名称"表格之后，读取到即可停止解析
+            target_rows = next(tables, None)
+            if target_rows is None:
+                raise IndexError("'数据包名称'表格之后没有数据表格")
+            package_name = pack_name_rows[0][1].strip()
             
             # 处理目标表格中的行
-            for r_idx,row in enumerate(target_table.rows):
+            for r_idx,cells in enumerate(target_rows):
                 try:
-                    cell0_text = row.cells[0].text.strip()
+                    cell0_text = cells[0].strip()
                     # 第一行为标题，跳过
                     if r_idx == 0:
                         continue 
@@ -415,9 +651,9 @@ class FileUtils:
                         break
                     
                     # 获取其他列的内容（注意索引从0开始）
-                    record_name = row.cells[2].text.strip() if len(row.cells) > 2 else ""
-                    to_val_date = row.cells[3].text.strip() if len(row.cells) > 3 else ""
-                    to_prod_date = row.cells[4].text.strip() if len(row.cells) > 4 else ""
+                    record_name = cells[2].strip() if len(cells) > 2 else ""
+                    to_val_date = cells[3].strip() if len(cells) > 3 else ""
+                    to_prod_date = cells[4].strip() if len(cells) > 4 else ""
                     
                     put_list.append((package_name, record_name, to_val_date, to_prod_date))
                     
@@ -429,38 +665,38 @@ class FileUtils:
         return put_list
 
     @staticmethod
-    def read_A5(path_a5: str) -> list:
+    def read_A5(path_a5: str, backend: str = 'docx') -> list:
         put_list = []
         tb2_list = []
 
         try:
-            doc = docx.Document(path_a5)
-            tbs = doc.tables
+            # 只需要前三个表格，读取到第三个表格即可停止解析
+            tbs = list(itertools.islice(FileUtils.iter_tables(path_a5, backend), 3))
             
             # 添加表格存在性检查
             if len(tbs) < 3:
                 print(f"文档表格不足: {path_a5}")
                 return [[], []]
             
-            pack_name = tbs[0].cell(0, 2).text.strip()  # 包名称
-            justification = tbs[0].cell(5, 0).text.strip()  # 理由
-            related_doc = tbs[0].cell(7, 0).text.strip()  # 相关文件
+            pack_name = tbs[0][0][2].strip()  # 包名称
+            justification = tbs[0][5][0].strip()  # 理由
+            related_doc = tbs[0][7][0].strip()  # 相关文件
 
             tb1_list = (pack_name, justification, related_doc)
 
             # 处理目标表格中的行
-            for row in tbs[2].rows:
+            for cells in tbs[2]:
                 try:
                     # 添加单元格存在性检查
-                    if not row.cells or len(row.cells) < 5:
+                    if not cells or len(cells) < 5:
                         continue
-                    if row.cells[0].text.lower() != pack_name[0:len(pack_name)-5].lower():
+                    if cells[0].lower() != pack_name[0:len(pack_name)-5].lower():
                         continue
                     
-                    record_name = row.cells[1].text.strip() 
-                    oper_type = row.cells[2].text.strip() 
-                    classification = row.cells[3].text.strip()
-                    criticality  = row.cells[4].text.strip()
+                    record_name = cells[1].strip() 
+                    oper_type = cells[2].strip() 
+                    classification = cells[3].strip()
+                    criticality  = cells[4].strip()
                     
                     
                     tb2_list.append((pack_name, record_name, oper_type, classification, criticality))
@@ -477,6 +713,8 @@ class FileUtils:
     @staticmethod
     def write_to_csv(data: list, output_path: str,title:list=[]):
         """将数据写入CSV文件"""
+        import csv
+
         try:
             with open(output_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
                 writer = csv.writer(csvfile)
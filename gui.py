@@ -1,11 +1,35 @@
 import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QLabel, QLineEdit, QPushButton, QTextEdit, QFileDialog, QGroupBox,
+                            QLabel, QLineEdit, QPushButton, QPlainTextEdit, QFileDialog, QGroupBox,
                             QFormLayout, QMessageBox, QTabWidget, QTableWidget, QTableWidgetItem,
-                            QHeaderView, QAbstractItemView, QSplitter)
-from PyQt5.QtCore import Qt
+                            QHeaderView, QAbstractItemView, QSplitter, QSpinBox, QProgressBar,
+                            QCheckBox, QComboBox)
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from file_utils import FileUtils
-from file_manipulator import FileManipulator
+from file_manipulator import FileManipulator, OperationCancelled, shutdown_shared_executors
+from log_sink import LogSink
+from tracer import Tracer
+
+
+class OperationWorker(QThread):
+    """在后台线程中执行文件操作，通过信号把进度和结果发送回界面线程，日志写入 LogSink"""
+
+    progress_signal = pyqtSignal(int, int)
+    finished_signal = pyqtSignal(bool)
+
+    def __init__(self, log_callback, parent=None):
+        super().__init__(parent)
+        self.log_callback = log_callback
+        self.job = None
+
+    def run(self):
+        try:
+            success = bool(self.job())
+        except Exception as e:
+            self.log_callback(f"\n❌ 执行过程中发生错误: {e}")
+            success = False
+        self.finished_signal.emit(success)
+
 
 class FileManagerApp(QMainWindow):
     def __init__(self):
@@ -16,7 +40,28 @@ class FileManagerApp(QMainWindow):
         # 加载配置
         self.config = FileUtils.load_config()
         FileUtils.head_list = self.config.get('head_list', FileUtils.head_list)
-        
+        FileUtils.form_types = self.config.get('form_types', FileUtils.form_types)
+        FileUtils.save_backend = self.config.get('docx_save', FileUtils.save_backend)
+        FileUtils.template_cache_mb = self.config.get('template_cache_mb', FileUtils.template_cache_mb)
+        
+        # 后台任务：同一时间只允许执行一个任务
+        self.worker = None
+        self.job_tab = None
+        self.job_controls = {}
+
+        # 日志：各选项卡的日志先写入缓冲区，由定时器批量刷新到界面，完整日志写入滚动日志文件
+        self.log_max_lines = int(self.config.get('log_max_lines', 5000) or 5000)
+        self.file_logger, self.log_listener = LogSink.create_file_logger(
+            os.path.join(FileUtils.get_app_dir(), 'logs', 'operation.log'))
+        self.log_sinks = {
+            tab_key: LogSink(self.log_max_lines, self.file_logger)
+            for tab_key in ('main', 'date', 'export')
+        }
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(100)
+        self.log_timer.timeout.connect(self.flush_logs)
+        self.log_timer.start()
+
         # 主控件和布局 - 使用选项卡
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -26,15 +71,31 @@ class FileManagerApp(QMainWindow):
         self.tab_widget = QTabWidget()
         main_layout.addWidget(self.tab_widget, 1)  # 选项卡占据大部分空间
         
-        # 创建四个选项卡页面
-        self.create_main_tab()
-        self.create_date_tab()
-        self.create_export_tab()
-        self.create_config_tab()
-        
         # 初始化文件管理器
         self.file_manipulator = None
 
+        # 日期设置页的目标文件夹，在该页创建前选择的路径先记录在这里
+        self.date_target_path = self.config.get('default_new_path', '')
+
+        # 四个选项卡页面先放入空白占位页，第一次显示时才创建控件，缩短启动时间
+        self.tab_builders = {}
+        for title, builder in (("主操作", self.create_main_tab), ("日期设置", self.create_date_tab),
+                               ("数据导出", self.create_export_tab), ("配置", self.create_config_tab)):
+            page = QWidget()
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self.tab_builders[self.tab_widget.addTab(page, title)] = builder
+        self.tab_widget.currentChanged.connect(self.ensure_tab_built)
+        self.ensure_tab_built(self.tab_widget.currentIndex())
+
+    def ensure_tab_built(self, index):
+        """选项卡第一次显示时创建其控件"""
+        builder = self.tab_builders.pop(index, None)
+        if builder is None:
+            return
+        self.tab_widget.widget(index).layout().addWidget(builder())
+        # 后台任务执行期间新建的执行按钮同样需要禁用
+        self.set_job_buttons_enabled(not self.is_job_running())
+
     def create_main_tab(self):
         """创建主操作选项卡（包含日志区域）"""
         tab = QWidget()
@@ -111,13 +172,13 @@ class FileManagerApp(QMainWindow):
         # 添加组件到上半部分
         top_layout.addWidget(path_group)
         top_layout.addLayout(button_layout)
+        top_layout.addLayout(self.create_job_controls('main'))
         top_layout.addStretch(1)  # 添加弹性空间
         
         # 下半部分：日志区域（高度增加）
         log_group = QGroupBox("操作日志")
         log_layout = QVBoxLayout()
-        self.log_text_main = QTextEdit()  # 主操作页面的日志
-        self.log_text_main.setReadOnly(True)
+        self.log_text_main = self.create_log_view()  # 主操作页面的日志
         log_layout.addWidget(self.log_text_main)
         log_group.setLayout(log_layout)
         
@@ -131,7 +192,7 @@ class FileManagerApp(QMainWindow):
         # 添加分割器到主布局
         layout.addWidget(splitter)
         
-        self.tab_widget.addTab(tab, "主操作")
+        return tab
 
     def create_date_tab(self):
         """创建日期设置选项卡（包含日志区域）"""
@@ -149,7 +210,7 @@ class FileManagerApp(QMainWindow):
         path_group = QGroupBox("目标文件夹")
         path_layout = QHBoxLayout()
         
-        self.date_target_edit = QLineEdit(self.config.get('default_new_path', ''))
+        self.date_target_edit = QLineEdit(self.date_target_path)
         self.date_target_edit.setPlaceholderText("选择目标文件夹路径...")
         self.date_target_button = QPushButton("浏览...")
         self.date_target_button.clicked.connect(lambda: self.browse_path(self.date_target_edit))
@@ -192,13 +253,13 @@ class FileManagerApp(QMainWindow):
         top_layout.addWidget(path_group)
         top_layout.addWidget(date_group)
         top_layout.addWidget(self.date_execute_button)
+        top_layout.addLayout(self.create_job_controls('date'))
         top_layout.addStretch(1)  # 添加弹性空间
         
         # 下半部分：日志区域（高度增加）
         log_group = QGroupBox("操作日志")
         log_layout = QVBoxLayout()
-        self.log_text_date = QTextEdit()  # 日期设置页面的日志
-        self.log_text_date.setReadOnly(True)
+        self.log_text_date = self.create_log_view()  # 日期设置页面的日志
         log_layout.addWidget(self.log_text_date)
         log_group.setLayout(log_layout)
         
@@ -212,7 +273,7 @@ class FileManagerApp(QMainWindow):
         # 添加分割器到主布局
         layout.addWidget(splitter)
         
-        self.tab_widget.addTab(tab, "日期设置")
+        return tab
 
     def create_export_tab(self):
         """创建数据导出选项卡"""
@@ -257,18 +318,23 @@ class FileManagerApp(QMainWindow):
         self.export_a5_button = QPushButton("导出A5数据为CSV")
         self.export_a5_button.clicked.connect(self.execute_read_a5)
         
+        self.watch_export_button = QPushButton("监视并自动导出")
+        self.watch_export_button.setToolTip("先导出一次，之后文档保存时自动更新 A2_latest.csv 等文件，点击取消停止")
+        self.watch_export_button.clicked.connect(self.execute_watch_export)
+        
         button_layout.addWidget(self.export_a2_button)
         button_layout.addWidget(self.export_a5_button)
+        button_layout.addWidget(self.watch_export_button)
         
         top_layout.addWidget(path_group)
         top_layout.addLayout(button_layout)
+        top_layout.addLayout(self.create_job_controls('export'))
         top_layout.addStretch(1)
         
         # 日志区域
         log_group = QGroupBox("导出日志")
         log_layout = QVBoxLayout()
-        self.log_text_export = QTextEdit()
-        self.log_text_export.setReadOnly(True)
+        self.log_text_export = self.create_log_view()
         log_layout.addWidget(self.log_text_export)
         log_group.setLayout(log_layout)
         
@@ -277,20 +343,20 @@ class FileManagerApp(QMainWindow):
         splitter.setSizes([int(self.height() * 0.4), int(self.height() * 0.6)])
         
         layout.addWidget(splitter)
-        self.tab_widget.addTab(tab, "数据导出")
+        return tab
 
-    def execute_read_a2(self):
-        """执行读取A2文档并导出为CSV的操作"""
+    def get_export_paths(self):
+        """检查导出的源文档目录和输出目录（输出目录不存在时询问是否创建），取消时返回 None"""
         source_dir = self.export_source_edit.text().strip()
         output_dir = self.csv_output_edit.text().strip()
 
         if not source_dir or not output_dir:
             QMessageBox.warning(self, "路径错误", "请选择源文档目录和CSV输出目录！")
-            return
+            return None
             
         if not os.path.exists(source_dir):
             QMessageBox.warning(self, "路径错误", "源文档目录不存在！")
-            return
+            return None
             
         if not os.path.exists(output_dir):
             reply = QMessageBox.question(self, '确认操作', f'目录 "{output_dir}" 不存在，是否要创建它？', 
@@ -298,52 +364,63 @@ class FileManagerApp(QMainWindow):
             if reply == QMessageBox.Yes:
                 os.makedirs(output_dir)
             else:
-                return
+                return None
+        return source_dir, output_dir
+
+    def get_export_options(self):
+        """导出的进程数、解析方式、缓存路径、是否压缩、是否断点续写、输出格式和是否预检查（来自配置）"""
+        workers = FileManipulator.resolve_workers(self.config.get('export_workers', 0))
+        backend = self.config.get('read_backend', 'xml')
+        cache_path = FileUtils.get_export_cache_path() if self.config.get('export_cache', True) else None
+        compress = bool(self.config.get('export_compress', False))
+        resume = bool(self.config.get('export_resume', True))
+        fmt = self.config.get('export_format', 'csv')
+        sniff = bool(self.config.get('export_sniff', True))
+        return workers, backend, cache_path, compress, resume, fmt, sniff
+
+    def execute_read_a2(self):
+        """执行读取A2文档并导出为CSV的操作"""
+        paths = self.get_export_paths()
+        if paths is None:
+            return
+        source_dir, output_dir = paths
+        workers, backend, cache_path, compress, resume, fmt, sniff = self.get_export_options()
 
-        self.log_text_export.clear()
-        
         # str_newpath 在 FileManipulator 中代表要处理的目录
-        self.file_manipulator = FileManipulator("", source_dir, {}, self.log_message)
-        
-        self.log_message("开始导出A2数据...")
-        try:
-            self.file_manipulator.read_A2_to_csv(output_dir)
-            self.log_message("\n✅ A2数据导出完成！")
-        except Exception as e:
-            self.log_message(f"\n❌ 导出过程中发生错误: {e}")
+        self.start_job(
+            'export', "", source_dir,
+            lambda manipulator: manipulator.read_A2_to_csv(output_dir, workers, backend, cache_path,
+                                                           compress, resume, fmt, sniff),
+            "开始导出A2数据...", "\n✅ A2数据导出完成！", "\n❌ A2数据导出失败！")
 
     def execute_read_a5(self):
         """执行读取A5文档并导出为CSV的操作"""
-        source_dir = self.export_source_edit.text().strip()
-        output_dir = self.csv_output_edit.text().strip()
-
-        if not source_dir or not output_dir:
-            QMessageBox.warning(self, "路径错误", "请选择源文档目录和CSV输出目录！")
+        paths = self.get_export_paths()
+        if paths is None:
             return
-            
-        if not os.path.exists(source_dir):
-            QMessageBox.warning(self, "路径错误", "源文档目录不存在！")
-            return
-
-        if not os.path.exists(output_dir):
-            reply = QMessageBox.question(self, '确认操作', f'目录 "{output_dir}" 不存在，是否要创建它？', 
-                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
-            if reply == QMessageBox.Yes:
-                os.makedirs(output_dir)
-            else:
-                return
+        source_dir, output_dir = paths
+        workers, backend, cache_path, compress, resume, fmt, sniff = self.get_export_options()
 
-        self.log_text_export.clear()
-        
         # str_newpath 在 FileManipulator 中代表要处理的目录
-        self.file_manipulator = FileManipulator("", source_dir, {}, self.log_message)
+        self.start_job(
+            'export', "", source_dir,
+            lambda manipulator: manipulator.read_A5_to_csv(output_dir, workers, backend, cache_path,
+                                                           compress, resume, fmt, sniff),
+            "开始导出A5数据...", "\n✅ A5数据导出完成！", "\n❌ A5数据导出失败！")
 
-        self.log_message("开始导出A5数据...")
-        try:
-            self.file_manipulator.read_A5_to_csv(output_dir)
-            self.log_message("\n✅ A5数据导出完成！")
-        except Exception as e:
-            self.log_message(f"\n❌ 导出过程中发生错误: {e}")
+    def execute_watch_export(self):
+        """监视源文档目录，A2/A5文档变化时自动更新导出文件，点击取消停止"""
+        paths = self.get_export_paths()
+        if paths is None:
+            return
+        source_dir, output_dir = paths
+        workers, backend, cache_path, compress, _, fmt, sniff = self.get_export_options()
+
+        self.start_job(
+            'export', "", source_dir,
+            lambda manipulator: manipulator.watch_exports(output_dir, ('A2', 'A5'), workers, backend, cache_path,
+                                                          compress, fmt, sniff),
+            "开始监视并自动导出A2、A5数据...", "\n✅ 已停止监视。", "\n❌ 监视导出失败！")
 
     def create_config_tab(self):
         """创建配置选项卡（不包含日志区域）"""
@@ -376,6 +453,68 @@ class FileManagerApp(QMainWindow):
         path_layout.addRow("目标文件夹:", new_path_layout)
         path_group.setLayout(path_layout)
         
+        # 性能设置区域
+        perf_group = QGroupBox("性能设置")
+        perf_layout = QFormLayout()
+
+        self.export_workers_spin = QSpinBox()
+        self.export_workers_spin.setRange(0, 64)
+        self.export_workers_spin.setSpecialValueText("自动（全部CPU核心）")
+        self.export_workers_spin.setValue(int(self.config.get('export_workers', 0) or 0))
+        perf_layout.addRow("导出并行进程数:", self.export_workers_spin)
+
+        self.edit_workers_spin = QSpinBox()
+        self.edit_workers_spin.setRange(0, 64)
+        self.edit_workers_spin.setSpecialValueText("自动（全部CPU核心）")
+        self.edit_workers_spin.setValue(int(self.config.get('edit_workers', 0) or 0))
+        perf_layout.addRow("修改文档并行进程数:", self.edit_workers_spin)
+
+        self.copy_workers_spin = QSpinBox()
+        self.copy_workers_spin.setRange(0, 64)
+        self.copy_workers_spin.setSpecialValueText("自动")
+        self.copy_workers_spin.setValue(int(self.config.get('copy_workers', 0) or 0))
+        perf_layout.addRow("复制文件并行线程数:", self.copy_workers_spin)
+
+        self.template_cache_spin = QSpinBox()
+        self.template_cache_spin.setRange(0, 4096)
+        self.template_cache_spin.setSuffix(" MB")
+        self.template_cache_spin.setSpecialValueText("不缓存")
+        self.template_cache_spin.setValue(int(self.config.get('template_cache_mb', 64) or 0))
+        self.template_cache_spin.setToolTip("缓存已解析的模板文档，再次生成时不必重新解析（每个进程分别缓存）")
+        perf_layout.addRow("模板缓存上限:", self.template_cache_spin)
+
+        self.export_format_combo = QComboBox()
+        self.export_format_combo.addItem("CSV", 'csv')
+        self.export_format_combo.addItem("Parquet（需要安装 pyarrow）", 'parquet')
+        self.export_format_combo.setCurrentIndex(
+            max(0, self.export_format_combo.findData(self.config.get('export_format', 'csv'))))
+        perf_layout.addRow("导出格式:", self.export_format_combo)
+
+        self.export_compress_check = QCheckBox("导出为gzip压缩的CSV（.csv.gz）")
+        self.export_compress_check.setChecked(bool(self.config.get('export_compress', False)))
+        perf_layout.addRow(self.export_compress_check)
+
+        self.export_resume_check = QCheckBox("导出中断后再次导出时从断点继续")
+        self.export_resume_check.setChecked(bool(self.config.get('export_resume', True)))
+        perf_layout.addRow(self.export_resume_check)
+
+        self.export_sniff_check = QCheckBox("导出前快速检查文档，跳过必然没有数据的文档")
+        self.export_sniff_check.setChecked(bool(self.config.get('export_sniff', True)))
+        perf_layout.addRow(self.export_sniff_check)
+
+        self.generate_resume_check = QCheckBox("生成文件中断后再次生成时从中断处继续")
+        self.generate_resume_check.setChecked(bool(self.config.get('generate_resume', True)))
+        perf_layout.addRow(self.generate_resume_check)
+
+        self.numbering_registry_check = QCheckBox("由编号登记表分配新编号（多人同时生成时编号不重复，不必每次扫描源文件夹）")
+        self.numbering_registry_check.setChecked(bool(self.config.get('numbering_registry', False)))
+        perf_layout.addRow(self.numbering_registry_check)
+
+        self.trace_check = QCheckBox("记录性能统计（日志末尾输出各步骤耗时，并在 logs 目录保存 trace 文件）")
+        self.trace_check.setChecked(bool(self.config.get('trace', False)))
+        perf_layout.addRow(self.trace_check)
+        perf_group.setLayout(perf_layout)
+
         # head_list 编辑区域
         head_group = QGroupBox("封面文件类型配置 (head_list)")
         head_layout = QVBoxLayout()
@@ -420,13 +559,14 @@ class FileManagerApp(QMainWindow):
         
         # 添加组件到布局
         layout.addWidget(path_group)
+        layout.addWidget(perf_group)
         layout.addWidget(head_group, 1)  # head_group占据更多空间
         layout.addWidget(self.save_config_button)
         
         # 初始化表格数据
         self.load_head_list_table()
         
-        self.tab_widget.addTab(tab, "配置")
+        return tab
 
     def load_head_list_table(self):
         """加载head_list到表格"""
@@ -459,6 +599,18 @@ class FileManagerApp(QMainWindow):
         self.config['head_list'] = FileUtils.head_list
         self.config['default_old_path'] = self.config_old_path_edit.text()
         self.config['default_new_path'] = self.config_new_path_edit.text()
+        self.config['export_workers'] = self.export_workers_spin.value()
+        self.config['edit_workers'] = self.edit_workers_spin.value()
+        self.config['copy_workers'] = self.copy_workers_spin.value()
+        self.config['template_cache_mb'] = self.template_cache_spin.value()
+        FileUtils.template_cache_mb = self.config['template_cache_mb']
+        self.config['export_compress'] = self.export_compress_check.isChecked()
+        self.config['export_format'] = self.export_format_combo.currentData()
+        self.config['export_resume'] = self.export_resume_check.isChecked()
+        self.config['export_sniff'] = self.export_sniff_check.isChecked()
+        self.config['generate_resume'] = self.generate_resume_check.isChecked()
+        self.config['numbering_registry'] = self.numbering_registry_check.isChecked()
+        self.config['trace'] = self.trace_check.isChecked()
         
         # 保存到文件
         FileUtils.save_config(self.config)
@@ -466,7 +618,7 @@ class FileManagerApp(QMainWindow):
         # 更新主界面的默认值
         self.old_path_edit.setText(self.config['default_old_path'])
         self.new_path_edit.setText(self.config['default_new_path'])
-        self.date_target_edit.setText(self.config['default_new_path'])
+        self.set_date_target_path(self.config['default_new_path'])
         
         QMessageBox.information(self, "配置保存", "配置已成功保存！")
 
@@ -480,6 +632,12 @@ class FileManagerApp(QMainWindow):
         if path:
             self.new_path_edit.setText(path)
             # 同时更新日期设置页的目标文件夹
+            self.set_date_target_path(path)
+
+    def set_date_target_path(self, path):
+        """更新日期设置页的目标文件夹（该页尚未创建时在创建时使用）"""
+        self.date_target_path = path
+        if hasattr(self, 'date_target_edit'):
             self.date_target_edit.setText(path)
 
     def browse_path(self, target_edit):
@@ -488,24 +646,179 @@ class FileManagerApp(QMainWindow):
         if path:
             target_edit.setText(path)
 
+    def create_job_controls(self, tab_key):
+        """创建后台任务的进度条和取消按钮"""
+        progress_bar = QProgressBar()
+        progress_bar.setFormat("%v/%m")
+        progress_bar.setValue(0)
+        progress_bar.setVisible(False)
+
+        cancel_button = QPushButton("取消")
+        cancel_button.setVisible(False)
+        cancel_button.clicked.connect(self.cancel_job)
+
+        layout = QHBoxLayout()
+        layout.addWidget(progress_bar, 1)
+        layout.addWidget(cancel_button)
+
+        self.job_controls[tab_key] = (progress_bar, cancel_button)
+        return layout
+
+    def create_log_view(self):
+        """创建只保留最近 log_max_lines 行的日志控件"""
+        log_view = QPlainTextEdit()
+        log_view.setReadOnly(True)
+        log_view.setMaximumBlockCount(self.log_max_lines)
+        return log_view
+
+    def job_log_text(self, tab_key):
+        """任务对应选项卡的日志区域，选项卡尚未创建时返回 None"""
+        return getattr(self, {
+            'main': 'log_text_main',
+            'date': 'log_text_date',
+            'export': 'log_text_export',
+        }[tab_key], None)
+
+    def is_job_running(self):
+        return self.worker is not None and self.worker.isRunning()
+
+    def set_job_buttons_enabled(self, enabled):
+        """任务执行期间禁用所有执行按钮，防止重复启动（尚未创建的选项卡跳过）"""
+        for name in ('execute_button', 'tree_button', 'date_execute_button',
+                     'export_a2_button', 'export_a5_button', 'watch_export_button'):
+            button = getattr(self, name, None)
+            if button is not None:
+                button.setEnabled(enabled)
+
+    def start_job(self, tab_key, old_path, new_path, job, start_message, success_message, failure_message):
+        """
+        在后台线程中执行 job(file_manipulator)。
+
+        参数:
+            tab_key: 任务所属的选项卡（'main'、'date'、'export'），日志和进度显示在该选项卡
+            old_path, new_path: 传给 FileManipulator 的源路径和目标路径
+            job: 接收 FileManipulator 并返回是否成功的可调用对象
+            start_message, success_message, failure_message: 开始、成功和失败时的日志信息
+        """
+        if self.is_job_running():
+            QMessageBox.warning(self, "任务执行中", "已有任务正在执行，请等待完成或先取消！")
+            return
+
+        log_sink = self.log_sinks[tab_key]
+        progress_bar, cancel_button = self.job_controls[tab_key]
+        self.clear_log(tab_key)
+
+        worker = OperationWorker(log_sink.put, self)
+        tracer = Tracer() if self.config.get('trace', False) else None
+        manipulator = FileManipulator(
+            old_path, new_path, {}, log_sink.put, worker.progress_signal.emit, tracer
+        )
+
+        def run_job():
+            try:
+                return job(manipulator)
+            finally:
+                manipulator.report_trace(FileUtils.get_trace_path(tab_key))
+
+        worker.job = run_job
+        worker.progress_signal.connect(lambda current, total: self.update_progress(progress_bar, current, total))
+        worker.finished_signal.connect(
+            lambda success: self.on_job_finished(tab_key, success, success_message, failure_message)
+        )
+
+        self.file_manipulator = manipulator
+        self.worker = worker
+        self.job_tab = tab_key
+
+        progress_bar.setRange(0, 0)  # 总数未知前显示忙碌状态
+        progress_bar.setVisible(True)
+        cancel_button.setEnabled(True)
+        cancel_button.setVisible(True)
+        self.set_job_buttons_enabled(False)
+
+        log_sink.put(start_message)
+        worker.start()
+
+    def update_progress(self, progress_bar, current, total):
+        progress_bar.setRange(0, max(total, 1))
+        progress_bar.setValue(current)
+
+    def cancel_job(self):
+        """请求取消当前任务，任务会在处理完当前文件后停止"""
+        if not self.is_job_running():
+            return
+        self.file_manipulator.cancel()
+        for _, cancel_button in self.job_controls.values():
+            cancel_button.setEnabled(False)
+        self.log_sinks[self.job_tab].put("正在取消，请等待当前文件处理完成...")
+
+    def on_job_finished(self, tab_key, success, success_message, failure_message):
+        log_sink = self.log_sinks[tab_key]
+        progress_bar, cancel_button = self.job_controls[tab_key]
+
+        if self.file_manipulator.is_cancelled():
+            log_sink.put("\n⚠️ 操作已取消！")
+        elif success:
+            log_sink.put(success_message)
+        else:
+            log_sink.put(failure_message)
+        self.flush_logs()
+
+        progress_bar.setVisible(False)
+        cancel_button.setVisible(False)
+        self.set_job_buttons_enabled(True)
+
+        self.worker.wait()
+        self.worker.deleteLater()
+        self.worker = None
+        self.job_tab = None
+
+    def closeEvent(self, event):
+        """关闭窗口时取消并等待后台任务结束"""
+        if self.is_job_running():
+            self.file_manipulator.cancel()
+            self.worker.wait()
+        shutdown_shared_executors()
+        self.log_timer.stop()
+        self.log_listener.stop()  # 写完剩余的文件日志
+        super().closeEvent(event)
+
+    def flush_logs(self):
+        """将各选项卡缓冲区中的日志批量写入日志控件"""
+        for tab_key, log_sink in self.log_sinks.items():
+            log_text = self.job_log_text(tab_key)
+            if log_text is None:
+                continue  # 选项卡尚未创建，日志保留在缓冲区中
+            lines = log_sink.drain()
+            if not lines:
+                continue
+            log_text.appendPlainText("\n".join(lines))
+            # 自动滚动到底部
+            log_text.verticalScrollBar().setValue(
+                log_text.verticalScrollBar().maximum()
+            )
+
+    def clear_log(self, tab_key):
+        """清空选项卡的日志控件及其缓冲区"""
+        self.log_sinks[tab_key].clear()
+        log_text = self.job_log_text(tab_key)
+        if log_text is not None:
+            log_text.clear()
+
     def log_message(self, message):
         """将消息添加到当前活动选项卡的日志区域"""
         current_tab = self.tab_widget.currentIndex()
-        log_text = None
+        tab_key = None
         
         if current_tab == 0:  # 主操作选项卡
-            log_text = self.log_text_main
+            tab_key = 'main'
         elif current_tab == 1:  # 日期设置选项卡
-            log_text = self.log_text_date
+            tab_key = 'date'
         elif current_tab == 2:  # 数据导出选项卡
-            log_text = self.log_text_export
+            tab_key = 'export'
         
-        if log_text:
-            log_text.append(message)
-            # 自动滚动到底部
-            log_text.verticalScrollBar().setValue(
-                log_text.verticalScrollBar().maximum()
-            )
+        if tab_key:
+            self.log_sinks[tab_key].put(message)
 
     def execute_operations(self):
         """执行文件操作"""
@@ -520,22 +833,22 @@ class FileManagerApp(QMainWindow):
             QMessageBox.warning(self, "路径错误", "源文件夹路径不存在！")
             return
             
-        # 清空日志
-        self.log_text_main.clear()
-        
-        # 创建文件操作器
-        self.file_manipulator = FileManipulator(
-            old_path, new_path, {}, self.log_message
-        )
-        
-        # 执行操作
-        self.log_message("开始文件操作流程...")
-        success = self.file_manipulator.execute_operations()
-        
-        if success:
-            self.log_message("\n✅ 所有操作成功完成！")
-        else:
-            self.log_message("\n❌ 操作过程中出现错误！")
+        # 在后台线程中执行操作
+        workers = FileManipulator.resolve_workers(self.config.get('edit_workers', 0))
+        copy_workers = self.config.get('copy_workers', 0)
+        resume = bool(self.config.get('generate_resume', True))
+        numbering = None
+        if self.config.get('numbering_registry', False):
+            from numbering_registry import NumberingRegistry
+            numbering = NumberingRegistry(FileUtils.get_numbering_registry_path())
+
+        def job(manipulator):
+            manipulator.numbering = numbering
+            return manipulator.execute_operations(workers, copy_workers, resume)
+
+        self.start_job(
+            'main', old_path, new_path, job,
+            "开始文件操作流程...", "\n✅ 所有操作成功完成！", "\n❌ 操作过程中出现错误！")
 
     def execute_date_setting(self):
         """执行日期设置操作"""
@@ -555,22 +868,12 @@ class FileManagerApp(QMainWindow):
             QMessageBox.warning(self, "路径错误", "目标文件夹路径不存在！")
             return
             
-        # 清空日志
-        self.log_text_date.clear()
-        
-        # 创建文件操作器（不需要源路径）
-        self.file_manipulator = FileManipulator(
-            "", target_dir, {}, self.log_message
-        )
-        
-        # 执行日期设置
-        self.log_message("开始设置迁移日期...")
-        success = self.file_manipulator.edt_A2_docx(target_dir, val_date, prod_date)
-        
-        if success:
-            self.log_message("\n✅ 日期设置成功完成！")
-        else:
-            self.log_message("\n❌ 日期设置过程中出现错误！")
+        # 在后台线程中执行日期设置（不需要源路径）
+        workers = FileManipulator.resolve_workers(self.config.get('edit_workers', 0))
+        self.start_job(
+            'date', "", target_dir,
+            lambda manipulator: manipulator.edt_A2_docx(target_dir, val_date, prod_date, workers),
+            "开始设置迁移日期...", "\n✅ 日期设置成功完成！", "\n❌ 日期设置过程中出现错误！")
 
     def show_directory_tree(self):
         """显示目录结构"""
@@ -583,14 +886,13 @@ class FileManagerApp(QMainWindow):
             QMessageBox.warning(self, "路径错误", "目标文件夹路径不存在！")
             return
             
-        # 清空日志
-        self.log_text_main.clear()
-        
-        if not self.file_manipulator:
-            self.file_manipulator = FileManipulator(
-                "", path, {}, self.log_message
-            )
-            
-        self.log_message("目录结构:\n")
-        tree = self.file_manipulator.get_directory_tree(path)
-        self.log_message(tree)
\ No newline at end of file
+        # 与其他操作相同在后台线程中遍历目录，目标文件夹很大时界面不会卡住
+        def job(manipulator):
+            try:
+                tree = manipulator.get_directory_tree(path)
+            except OperationCancelled:
+                return False
+            manipulator.log(tree)
+            return True
+
+        self.start_job('main', "", path, job, "目录结构:\n", "\n✅ 目录结构显示完成。", "\n❌ 获取目录结构失败！")
\ No newline at end of file
@@ -0,0 +1,74 @@
+import os
+import queue
+import logging
+import threading
+import collections
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+
+class LogSink:
+    """
+    线程安全的日志缓冲区。
+
+    工作线程通过 put() 写入日志，界面线程定时调用 drain() 批量取出并显示。
+    缓冲区有最大行数限制，超出部分丢弃最早的行（日志控件本身也只保留最近的行），
+    完整日志由后台线程写入滚动日志文件，因此日志开销与处理的文件数量无关。
+    """
+
+    def __init__(self, max_lines: int = 5000, file_logger: logging.Logger = None):
+        self._pending = collections.deque(maxlen=max_lines)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self.file_logger = file_logger
+
+    def put(self, message):
+        """写入一条日志（可从任意线程调用）"""
+        message = str(message)
+        if self.file_logger is not None:
+            self.file_logger.info(message)
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(message)
+
+    def drain(self) -> list:
+        """取出所有待显示的日志"""
+        with self._lock:
+            lines = list(self._pending)
+            dropped = self._dropped
+            self._pending.clear()
+            self._dropped = 0
+        if dropped:
+            lines.insert(0, f"……（已省略 {dropped} 条日志，完整日志请查看日志文件）")
+        return lines
+
+    def clear(self):
+        """丢弃所有待显示的日志"""
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+
+    @staticmethod
+    def create_file_logger(log_path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 5):
+        """
+        创建写入滚动日志文件的 logger。
+
+        日志记录先放入内存队列，由后台线程写入文件，调用方不会因磁盘I/O阻塞。
+
+        返回:
+            (logger, listener)：程序退出前需调用 listener.stop() 以写完剩余日志
+        """
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count,
+                                           encoding='utf-8', delay=True)
+        file_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+
+        logger = logging.getLogger(f'log_sink.{log_path}')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers[:] = [QueueHandler(log_queue)]
+        return logger, listener
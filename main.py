@@ -1,7 +1,10 @@
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
 from gui import FileManagerApp
 
 if __name__ == "__main__":
+    # 打包为exe后，进程池的子进程需要此调用才能正确启动
+    multiprocessing.freeze_support()
     app = QApplication([])
     window = FileManagerApp()
     window.show()
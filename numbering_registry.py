@@ -0,0 +1,144 @@
+import os
+import time
+import sqlite3
+
+
+class NumberingRegistry:
+    """
+    各类别编号的登记表（SQLite），在多次运行和多个同时执行的任务之间共享。
+
+    按源目录记录每个类别的模板文件夹编号（源目录中编号最大的 类别-编号 文件夹）和已分配的
+    最大编号。只有第一次使用某个源目录、请求重新扫描或登记的模板已过时时才需要重新确定各类别
+    的编号，之后直接从登记表读取。判断是否过时仍需要源目录的名称列表（is_stale），登记表的
+    作用主要是在多个任务之间分配不重复的编号，而不是省去列出源目录。
+
+    分配新编号在 BEGIN IMMEDIATE 事务中完成：事务开始时即取得写锁，同时执行的任务依次
+    读取并递增已分配的最大编号，不会得到相同的编号。同一目标目录再次生成（包括中断后继续
+    生成）时沿用之前分配的编号。
+
+    sqlite3 连接不能跨线程使用，每次操作都打开新的连接（界面在主线程中创建、在后台线程中使用）。
+    """
+
+    # 等待其他任务释放写锁的最长时间（秒）
+    LOCK_TIMEOUT = 30.0
+
+    def __init__(self, db_path: str, rescan: bool = False):
+        """
+        参数:
+            db_path: 登记表文件路径
+            rescan: 为 True 时下一次使用时重新扫描源目录
+        """
+        self.db_path = db_path
+        self.rescan = rescan
+
+    def _connect(self):
+        # isolation_level=None：由代码显式开始和提交事务
+        conn = sqlite3.connect(self.db_path, timeout=self.LOCK_TIMEOUT, isolation_level=None)
+        conn.execute("CREATE TABLE IF NOT EXISTS categories ("
+                     "root TEXT, category TEXT, template TEXT, latest INTEGER, scanned_at REAL, "
+                     "PRIMARY KEY (root, category))")
+        conn.execute("CREATE TABLE IF NOT EXISTS allocations ("
+                     "root TEXT, category TEXT, target TEXT, number INTEGER, allocated_at REAL, "
+                     "PRIMARY KEY (root, category, target))")
+        return conn
+
+    def load(self, root: str) -> dict:
+        """
+        读取源目录的登记内容。
+
+        返回:
+            类别 -> (模板文件夹编号, 已分配的最大编号)；未登记时为空字典
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT category, template, latest FROM categories WHERE root = ?", (root,))
+            return {category: (template, latest) for category, template, latest in rows}
+        finally:
+            conn.close()
+
+    def record_scan(self, root: str, templates: dict):
+        """
+        登记扫描源目录得到的各类别模板文件夹编号（类别 -> 编号），已分配的编号不会变小。
+        源目录中已不存在的类别从登记表中移除。
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM categories WHERE root = ? AND category NOT IN (%s)"
+                             % ",".join("?" * len(templates)), (root, *templates))
+                for category, template in templates.items():
+                    conn.execute(
+                        "INSERT INTO categories (root, category, template, latest, scanned_at) "
+                        "VALUES (?, ?, ?, ?, ?) ON CONFLICT (root, category) DO UPDATE SET "
+                        "template = excluded.template, latest = MAX(latest, excluded.latest), "
+                        "scanned_at = excluded.scanned_at",
+                        (root, category, template, int(template), now))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        self.rescan = False
+
+    def allocate(self, root: str, categories: list, target: str) -> dict:
+        """
+        为生成到 target 的各类别分配新编号（一个事务内完成）。
+
+        返回:
+            类别 -> 新编号（整数）；未登记的类别不分配
+        """
+        now = time.time()
+        numbers = {}
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for category in categories:
+                    row = conn.execute("SELECT number FROM allocations WHERE root = ? AND category = ? AND target = ?",
+                                       (root, category, target)).fetchone()
+                    if row is not None:
+                        numbers[category] = row[0]
+                        continue
+                    row = conn.execute("SELECT latest FROM categories WHERE root = ? AND category = ?",
+                                       (root, category)).fetchone()
+                    if row is None:
+                        continue
+                    number = row[0] + 1
+                    conn.execute("UPDATE categories SET latest = ? WHERE root = ? AND category = ?",
+                                 (number, root, category))
+                    conn.execute("INSERT INTO allocations (root, category, target, number, allocated_at) "
+                                 "VALUES (?, ?, ?, ?, ?)", (root, category, target, number, now))
+                    numbers[category] = number
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return numbers
+
+    @staticmethod
+    def is_stale(registered: dict, names) -> bool:
+        """
+        登记的模板是否已过时：模板文件夹已不存在，或源目录中已出现比模板更新的编号文件夹
+        （例如已将之前生成的文件夹放回模板目录）。只检查登记的编号，不解析目录中的名称。
+
+        参数:
+            registered: load() 的返回值
+            names: 源目录中的名称集合
+        """
+        for category, (template, latest) in registered.items():
+            if f"{category}-{template}" not in names:
+                return True
+            for number in range(int(template) + 1, latest + 1):
+                if f"{category}-{number:0{len(template)}d}" in names:
+                    return True
+        return False
+
+
+def normalize_root(path: str) -> str:
+    """登记表中源目录的键（绝对路径，Windows 上不区分大小写）"""
+    return os.path.normcase(os.path.abspath(path))
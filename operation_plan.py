@@ -0,0 +1,63 @@
+import os
+
+
+class PlannedFile:
+    """计划中的一个文件：从源路径复制到目标目录，并以最终文件名保存"""
+
+    __slots__ = ('source', 'target_dir', 'name', 'edit', 'step')
+
+    def __init__(self, source: str, target_dir: str, name: str, edit: bool, step: int = 1):
+        self.source = source          # 源文件路径
+        self.target_dir = target_dir  # 目标所在目录
+        self.name = name              # 最终文件名（已递增编号）
+        self.edit = edit              # 复制时是否需要修改文档内容
+        self.step = step              # 编号递增的数值（修改文档内容中的编号时使用）
+
+    @property
+    def target(self) -> str:
+        return os.path.join(self.target_dir, self.name)
+
+
+class PlannedFolder:
+    """计划中的一个类别文件夹，例如 Analysis-0038 -> Analysis-0039"""
+
+    __slots__ = ('source', 'target', 'subfolders', 'files')
+
+    def __init__(self, source: str, target: str):
+        self.source = source
+        self.target = target
+        self.subfolders = []  # 需要创建的空子文件夹（证据等，内容不复制）
+        self.files = []       # PlannedFile 列表
+
+
+class OperationPlan:
+    """
+    文件生成操作的执行计划。
+
+    由 FileManipulator.plan_operations() 根据源目录一次性计算得到最终的目标目录结构：
+    需要复制的文件及其递增后的文件名、需要修改内容的文档、只保留空目录的子文件夹。
+    计划本身不修改文件系统，由 FileManipulator.apply_plan() 一次遍历执行。
+    """
+
+    def __init__(self, source_root: str, target_root: str):
+        self.source_root = source_root
+        self.target_root = target_root
+        self.folders = []      # PlannedFolder 列表
+        self.cover_files = []  # 目标根目录下的封面文件（PlannedFile 列表）
+        self.skipped = []      # 不会被复制的源路径（临时文件、子文件夹中的内容）
+
+    def iter_files(self):
+        """按执行顺序产出计划中的所有文件"""
+        for folder in self.folders:
+            yield from folder.files
+        yield from self.cover_files
+
+    def file_count(self) -> int:
+        return sum(len(folder.files) for folder in self.folders) + len(self.cover_files)
+
+    def summary(self) -> str:
+        """执行计划摘要"""
+        edits = sum(1 for planned in self.iter_files() if planned.edit)
+        subfolders = sum(len(folder.subfolders) for folder in self.folders)
+        return (f"类别文件夹 {len(self.folders)} 个，文件 {self.file_count()} 个（需修改 {edits} 个），"
+                f"空子文件夹 {subfolders} 个，跳过 {len(self.skipped)} 项")
@@ -0,0 +1,131 @@
+import os
+import re
+import datetime
+
+# 日期单元格的常见写法：2025.05.05、2025-5-5、2025/05/05、2025年5月5日、20250505
+_DATE_PATTERN = re.compile(r'^\s*(\d{4})\s*(?:[.\-/年]\s*(\d{1,2})\s*[.\-/月]\s*(\d{1,2})\s*日?|(\d{2})(\d{2}))\s*$')
+
+
+def parse_date(text: str):
+    """
+    把单元格文本解析为日期。
+
+    返回:
+        datetime.date；空文本或无法识别时返回 None
+    """
+    match = _DATE_PATTERN.match(text or '')
+    if not match:
+        return None
+    year, month, day, compact_month, compact_day = match.groups()
+    try:
+        return datetime.date(int(year), int(month or compact_month), int(day or compact_day))
+    except ValueError:
+        return None
+
+
+class ParquetStreamWriter:
+    """
+    按文档逐个写入的Parquet输出（需要安装 pyarrow）。
+
+    与 CsvStreamWriter 的用法相同：数据行先缓存在内存中，每满 ROW_GROUP_ROWS 行写出一个行组，
+    内存占用与文档数量无关。数据写入 <输出文件>.partial，finalize() 写入文件尾后重命名为最终文件。
+    Parquet 文件写完文件尾才能读取，因此不支持断点续写，中止时直接删除 partial 文件。
+
+    列类型:
+        'string': 文本
+        'date': 日期（date32），无法识别的文本保存为空值，并在 invalid 中计数
+    """
+
+    ROW_GROUP_ROWS = 50000
+    COMPRESSION = 'zstd'
+
+    def __init__(self, path: str, title: list, types: list = None):
+        """
+        参数:
+            path: 最终输出文件路径
+            title: 列名
+            types: 各列的类型（'string' 或 'date'），默认全部为文本
+        """
+        import pyarrow as pa
+
+        self.path = path
+        self.title = list(title)
+        self.types = list(types or ['string'] * len(self.title))
+        self.partial_path = path + '.partial'
+        self.rows = 0
+        self.done = set()  # 不支持断点续写，始终为空
+        self.invalid = {name: 0 for name, kind in zip(self.title, self.types) if kind == 'date'}
+        self.schema = pa.schema([
+            pa.field(name, pa.date32() if kind == 'date' else pa.string())
+            for name, kind in zip(self.title, self.types)
+        ])
+        self._columns = [[] for _ in self.title]
+        self._writer = None
+
+    @staticmethod
+    def available() -> bool:
+        """是否已安装 pyarrow"""
+        import importlib.util
+
+        return importlib.util.find_spec('pyarrow') is not None
+
+    def write_document(self, key: str, rows: list) -> bool:
+        """写入一个文档的所有数据行"""
+        for row in rows:
+            for i, column in enumerate(self._columns):
+                value = row[i] if i < len(row) else None
+                if self.types[i] == 'date':
+                    parsed = parse_date(value)
+                    if parsed is None and value:
+                        self.invalid[self.title[i]] += 1
+                    value = parsed
+                column.append(value)
+        self.rows += len(rows)
+        if len(self._columns[0]) >= self.ROW_GROUP_ROWS:
+            self._write_row_group()
+        return True
+
+    def finalize(self) -> int:
+        """
+        写入剩余数据和文件尾，并将 partial 文件重命名为最终文件。
+
+        返回:
+            int: 数据行数，没有数据时不生成文件并返回 0
+        """
+        if not self.rows:
+            return 0
+        self._write_row_group()
+        self._writer.close()
+        self._writer = None
+        os.replace(self.partial_path, self.path)
+        return self.rows
+
+    def abort(self, keep: bool = True) -> bool:
+        """
+        中止写入并删除 partial 文件（未写入文件尾的Parquet文件无法读取）。
+
+        返回:
+            bool: 始终为 False，表示没有保留可继续的输出
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        try:
+            os.remove(self.partial_path)
+        except FileNotFoundError:
+            pass
+        return False
+
+    def _write_row_group(self):
+        if not self._columns[0]:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.partial_path, self.schema, compression=self.COMPRESSION)
+        table = pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(self._columns, self.schema)],
+            schema=self.schema)
+        self._writer.write_table(table, row_group_size=len(self._columns[0]))
+        self._columns = [[] for _ in self.title]
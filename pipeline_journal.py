@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import hashlib
+
+
+class PipelineJournal:
+    """
+    文件生成的进度日志，保存在目标目录中（JOURNAL_NAME），用于中断后从中断处继续生成。
+
+    第一行记录源目录和执行计划的指纹，之后每完成一个文件追加一行：目标文件的相对路径
+    以及当时源文件的大小和修改时间。修改文档失败、按原内容复制的文件在行末加上 "failed"，
+    继续生成时重新修改。全部完成后删除日志文件。
+
+    再次生成时，只有执行计划相同（源目录结构和编号未变化）的日志才会被继续使用；
+    源文件在中断后被修改过、或目标文件已不存在的项目会重新处理。
+    复制和修改都是以源文件为输入、覆盖写入目标文件，重复执行不会产生不同的结果，
+    因此日志不需要每项都立即写入磁盘：每 FLUSH_ITEMS 项或每隔 FLUSH_INTERVAL 秒写出一次，
+    未写出的项目在继续生成时重新处理即可。
+    """
+
+    JOURNAL_NAME = '.pipeline_journal.jsonl'
+    VERSION = 1
+    FLUSH_ITEMS = 200
+    FLUSH_INTERVAL = 2.0
+
+    def __init__(self, target_root: str, fingerprint: str):
+        self.target_root = target_root
+        self.fingerprint = fingerprint
+        self.path = os.path.join(target_root, self.JOURNAL_NAME)
+        self.done = {}  # 相对路径 -> [源文件大小, 源文件修改时间]
+        self.failed = {}  # 修改失败、按原内容复制的文件，相对路径 -> [源文件大小, 源文件修改时间]
+        self._file = None
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def plan_fingerprint(plan) -> str:
+        """执行计划的指纹：源目录、所有目标文件夹和文件（含是否需要修改）"""
+        digest = hashlib.sha1()
+        digest.update(os.path.abspath(plan.source_root).encode('utf-8'))
+        for folder in plan.folders:
+            digest.update(f"\0D{os.path.relpath(folder.target, plan.target_root)}".encode('utf-8'))
+            for name in folder.subfolders:
+                digest.update(f"\0S{name}".encode('utf-8'))
+        for planned in plan.iter_files():
+            digest.update(f"\0F{planned.source}\0{planned.name}\0{int(planned.edit)}".encode('utf-8'))
+        return digest.hexdigest()
+
+    @classmethod
+    def resume(cls, plan):
+        """
+        读取目标目录中与执行计划匹配的进度日志。
+
+        返回:
+            PipelineJournal；日志不存在、已损坏或属于其他执行计划时返回 None
+        """
+        journal = cls(plan.target_root, cls.plan_fingerprint(plan))
+        try:
+            with open(journal.path, encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if header.get('version') != cls.VERSION or header.get('plan') != journal.fingerprint:
+                    return None
+                for line in f:
+                    try:
+                        key, size, mtime, *status = json.loads(line)
+                    except ValueError:
+                        # 最后一行可能只写入了一部分
+                        break
+                    if status == ['failed']:
+                        journal.done.pop(key, None)
+                        journal.failed[key] = [size, mtime]
+                    else:
+                        journal.failed.pop(key, None)
+                        journal.done[key] = [size, mtime]
+        except (OSError, ValueError, AttributeError):
+            return None
+        journal._file = open(journal.path, 'a', encoding='utf-8')
+        return journal
+
+    @classmethod
+    def create(cls, plan):
+        """在（新建的）目标目录中开始新的进度日志"""
+        journal = cls(plan.target_root, cls.plan_fingerprint(plan))
+        journal._file = open(journal.path, 'w', encoding='utf-8')
+        header = {'version': cls.VERSION, 'plan': journal.fingerprint, 'source': plan.source_root}
+        journal._file.write(json.dumps(header, ensure_ascii=False) + '\n')
+        journal._file.flush()
+        return journal
+
+    def _key(self, target: str) -> str:
+        return os.path.relpath(target, self.target_root)
+
+    @staticmethod
+    def _source_state(source: str):
+        st = os.stat(source)
+        return [st.st_size, st.st_mtime_ns]
+
+    def is_done(self, planned) -> bool:
+        """文件是否已在之前的运行中完成（源文件未变化且目标文件存在）"""
+        state = self.done.get(self._key(planned.target))
+        if state is None:
+            return False
+        try:
+            return state == self._source_state(planned.source) and os.path.isfile(planned.target)
+        except OSError:
+            return False
+
+    def record(self, planned, failed: bool = False):
+        """
+        记录一个文件已完成。
+
+        参数:
+            failed: 为 True 表示修改文档失败（已按原内容复制），继续生成时不跳过，重新修改
+        """
+        try:
+            state = self._source_state(planned.source)
+        except OSError:
+            return
+        key = self._key(planned.target)
+        entry = [key] + state
+        if failed:
+            self.done.pop(key, None)
+            self.failed[key] = state
+            entry.append('failed')
+        else:
+            self.failed.pop(key, None)
+            self.done[key] = state
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._unflushed += 1
+        if self._unflushed >= self.FLUSH_ITEMS or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """保存进度并关闭日志（生成未完成时调用，日志保留在目标目录中）"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def complete(self):
+        """全部完成后删除日志文件"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,76 @@
+class TableGrid:
+    """
+    python-docx 表格的单元格网格缓存。
+
+    python-docx 每次访问 row.cells、table.cell(r, c) 都会重新生成整行（旧版本为整个表格）的
+    _Cell 对象，每次读取 cell.text 都会重新拼接段落和运行的文本，逐行处理时反复访问会使耗时随
+    表格大小成平方增长。TableGrid 在创建时一次遍历表格XML建立网格，单元格文本在第一次读取时缓存；
+    通过 set_text() 修改或对单元格调用 invalidate() 后，只有该单元格的文本会重新读取。
+
+    网格与 python-docx 1.x 的 row.cells 相同：每行只包含实际存在的单元格，横向合并的单元格
+    按跨越的列数重复，纵向合并的后续单元格指向合并区域第一行的单元格。
+    """
+
+    def __init__(self, table):
+        """
+        参数:
+            table: docx.table.Table
+        """
+        from docx.table import _Cell
+
+        self.table = table
+        self._rows = []
+        self._texts = {}  # id(_Cell) -> 文本，网格持有 _Cell 对象，id 在网格的生命周期内不会重复
+
+        above = {}  # 上一行：网格列位置 -> _Cell
+        for tr in table._tbl.tr_lst:
+            offset = getattr(tr, 'grid_before', 0)
+            row, current = [], {}
+            for tc in tr.tc_lst:
+                span = tc.grid_span
+                if tc.vMerge == 'continue' and offset in above:
+                    cells = [above.get(offset + i, above[offset]) for i in range(span)]
+                else:
+                    cells = [_Cell(tc, table)] * span
+                for i, cell in enumerate(cells):
+                    current[offset + i] = cell
+                row.extend(cells)
+                offset += span
+            self._rows.append(row)
+            above = current
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def cells(self, row: int) -> list:
+        """第 row 行的单元格（_Cell 列表）"""
+        return self._rows[row]
+
+    def cell(self, row: int, col: int):
+        return self._rows[row][col]
+
+    def text(self, row: int, col: int) -> str:
+        """单元格文本（与 cell.text 相同，已缓存）"""
+        cell = self._rows[row][col]
+        key = id(cell)
+        text = self._texts.get(key)
+        if text is None:
+            text = self._texts[key] = cell.text
+        return text
+
+    def row_texts(self, row: int) -> list:
+        return [self.text(row, col) for col in range(len(self._rows[row]))]
+
+    def texts(self) -> list:
+        """所有行的单元格文本"""
+        return [self.row_texts(row) for row in range(len(self._rows))]
+
+    def set_text(self, row: int, col: int, text: str):
+        """设置单元格文本（与 cell.text = text 相同）"""
+        cell = self._rows[row][col]
+        cell.text = text
+        self.invalidate(cell)
+
+    def invalidate(self, cell):
+        """单元格内容被直接修改后调用，下次读取时重新获取文本"""
+        self._texts.pop(id(cell), None)
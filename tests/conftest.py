@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """生成一个小型模板目录（见 benchmark.corpus），返回源目录路径"""
+    from benchmark.corpus import CorpusGenerator
+
+    root = tmp_path / 'src'
+    CorpusGenerator(documents=10, a2_rows=5, a5_rows=3, evidence_files=1, evidence_kb=1).generate(str(root))
+    return root
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+import docx
+
+from conftest import REPO_DIR
+
+# 任务结束后共享进程池未关闭时，进程会在退出时挂起；超时即视为失败
+TIMEOUT = 120
+
+
+def _run_cli(*args, cwd):
+    completed = subprocess.run([sys.executable, os.path.join(REPO_DIR, 'cli.py'), *args], cwd=cwd,
+                               capture_output=True, text=True, encoding='utf-8', timeout=TIMEOUT)
+    events = [json.loads(line) for line in completed.stdout.splitlines() if line.startswith('{')]
+    return completed.returncode, events
+
+
+def test_batch_generate_and_set_dates(tmp_path, corpus):
+    target = tmp_path / 'dst'
+    manifest = tmp_path / 'manifest.json'
+    report = tmp_path / 'report.json'
+    manifest.write_text(json.dumps({
+        'defaults': {'edit_workers': 2},
+        'jobs': [
+            {'name': 'gen', 'type': 'generate', 'source': str(corpus), 'target': str(target)},
+            {'name': 'dates', 'type': 'set-dates', 'target': str(target), 'val_date': '2025.05.05',
+             'after': 'gen'},
+        ],
+    }), encoding='utf-8')
+
+    code, events = _run_cli('batch', '--manifest', str(manifest), '--workers', '4', '--report', str(report),
+                            cwd=str(tmp_path))
+
+    assert code == 0
+    assert events[-1]['event'] == 'result' and events[-1]['success'] is True
+    summary = json.loads(report.read_text(encoding='utf-8'))
+    assert summary['success'] is True
+    assert [(job['name'], job['status']) for job in summary['jobs']] == [('gen', 'success'), ('dates', 'success')]
+
+    folders = sorted(p.name for p in target.iterdir() if p.is_dir())
+    assert folders and all(name.endswith('-0039') for name in folders)
+    documents = [p for p in target.rglob('*.docx') if '-A2-' in p.name or '-A5-' in p.name]
+    assert documents
+    for path in documents:
+        docx.Document(str(path))  # 修改后的文档能被 python-docx 打开
+    assert not (target / '.pipeline_journal.jsonl').exists()
+
+
+def test_batch_invalid_manifest_is_usage_error(tmp_path):
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text(json.dumps({'jobs': [{'name': 'x', 'type': 'unknown'}]}), encoding='utf-8')
+
+    code, events = _run_cli('batch', '--manifest', str(manifest), '--report', str(tmp_path / 'report.json'),
+                            cwd=str(tmp_path))
+
+    assert code == 2
+    assert any(event['event'] == 'error' for event in events)
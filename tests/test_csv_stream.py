@@ -0,0 +1,150 @@
+import csv
+import gzip
+import io
+import os
+
+import pytest
+
+from csv_stream import CsvStreamWriter
+
+TITLE = ['文档', '序号', '内容']
+
+
+def _documents(folder, count=6):
+    """写入 count 个源文档，返回 [(路径, 数据行)]"""
+    documents = []
+    for i in range(count):
+        path = folder / f"doc{i}.docx"
+        path.write_bytes(b"x" * (i + 1))
+        documents.append((str(path), [[f"doc{i}", str(k), f"内容{k}"] for k in range(3)]))
+    return documents
+
+
+def _read_rows(path, compress):
+    if compress:
+        with gzip.open(path, 'rt', encoding='utf-8-sig', newline='') as f:
+            return list(csv.reader(f))
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return list(csv.reader(f))
+
+
+def _interrupted(path, documents, compress):
+    """写入一半文档后模拟进程中断：不 finalize，检查点日志末尾留下半行"""
+    writer = CsvStreamWriter(str(path), TITLE, compress=compress)
+    writer.FLUSH_ROWS = 3  # 每个文档之后写出检查点
+    for key, rows in documents[:4]:
+        writer.write_document(key, rows)
+    # 最后一个文档已写入缓冲区但没有到达检查点
+    writer.FLUSH_ROWS = 10 ** 6
+    writer.write_document(*documents[4])
+    writer._text.flush()
+    writer._raw.flush()
+    with open(writer.checkpoint_path, 'ab') as log:
+        log.write(b'{"offset": 12')
+    return writer
+
+
+@pytest.fixture(params=[False, True], ids=['plain', 'gzip'])
+def compress(request):
+    return request.param
+
+
+def test_finalize_without_interruption(tmp_path, compress):
+    documents = _documents(tmp_path)
+    path = tmp_path / 'out.csv'
+    writer = CsvStreamWriter(str(path), TITLE, compress=compress)
+    for key, rows in documents:
+        assert writer.write_document(key, rows)
+    assert writer.finalize() == 18
+
+    assert _read_rows(path, compress) == [TITLE] + [row for _, rows in documents for row in rows]
+    assert not os.path.exists(writer.partial_path)
+    assert not os.path.exists(writer.checkpoint_path)
+
+
+def test_resume_skips_written_documents(tmp_path, compress):
+    documents = _documents(tmp_path)
+    path = tmp_path / 'out.csv'
+    _interrupted(path, documents, compress)
+
+    assert CsvStreamWriter.pending_outputs(str(tmp_path)) == [str(path)]
+    writer = CsvStreamWriter.resume(str(path))
+    assert writer is not None
+    assert writer.compress == compress
+    assert writer.rows == 12
+    written = [key for key, rows in documents if writer.write_document(key, rows)]
+    assert written == [key for key, _ in documents[4:]]
+    assert writer.finalize() == 18
+
+    assert _read_rows(path, compress) == [TITLE] + [row for _, rows in documents for row in rows]
+    assert CsvStreamWriter.pending_outputs(str(tmp_path)) == []
+
+
+def test_resume_rewrites_modified_documents(tmp_path, compress):
+    documents = _documents(tmp_path)
+    path = tmp_path / 'out.csv'
+    _interrupted(path, documents, compress)
+
+    # 中断后修改第2个文档：从它所在的检查点之前继续，之后的文档重新写入
+    changed = documents[1][0]
+    with open(changed, 'ab') as f:
+        f.write(b"changed")
+    writer = CsvStreamWriter.resume(str(path))
+    assert writer.discarded == 3
+    assert writer.rows == 3
+    for key, rows in documents:
+        writer.write_document(key, rows)
+    writer.finalize()
+
+    rows = _read_rows(path, compress)
+    assert rows == [TITLE] + [row for _, rows in documents for row in rows]
+    assert len({tuple(row) for row in rows}) == len(rows)
+
+
+def test_finalize_pending(tmp_path, compress):
+    documents = _documents(tmp_path)
+    path = tmp_path / 'out.csv'
+    _interrupted(path, documents, compress)
+
+    assert CsvStreamWriter.finalize_pending(str(tmp_path)) == [(str(path), 12)]
+    assert _read_rows(path, compress) == [TITLE] + [row for _, rows in documents[:4] for row in rows]
+
+
+def test_gzip_output_is_multi_member(tmp_path):
+    documents = _documents(tmp_path)
+    path = tmp_path / 'out.csv.gz'
+    writer = CsvStreamWriter(str(path), TITLE, compress=True)
+    writer.FLUSH_ROWS = 3
+    for key, rows in documents:
+        writer.write_document(key, rows)
+    writer.finalize()
+
+    data = path.read_bytes()
+    assert data.count(b'\x1f\x8b\x08') > 1
+    text = gzip.decompress(data).decode('utf-8-sig')
+    assert '\ufeff' not in text
+    assert len(list(csv.reader(io.StringIO(text)))) == 19
+
+
+def test_not_resumable_leaves_no_checkpoint(tmp_path):
+    documents = _documents(tmp_path)
+    path = tmp_path / 'out.csv'
+    writer = CsvStreamWriter(str(path), TITLE, resumable=False)
+    writer.FLUSH_ROWS = 3
+    for key, rows in documents[:3]:
+        writer.write_document(key, rows)
+    writer.abort(keep=True)
+
+    assert os.path.exists(writer.partial_path)
+    assert not os.path.exists(writer.checkpoint_path)
+    assert CsvStreamWriter.pending_outputs(str(tmp_path)) == []
+    assert CsvStreamWriter.resume(str(path)) is None
+
+
+def test_empty_output_is_not_created(tmp_path):
+    path = tmp_path / 'out.csv'
+    writer = CsvStreamWriter(str(path), TITLE)
+    writer.write_document(str(tmp_path / 'missing.docx'), [])
+    assert writer.finalize() == 0
+    assert not os.path.exists(path)
+    assert not os.path.exists(writer.partial_path)
@@ -0,0 +1,64 @@
+import zipfile
+
+import docx
+
+from docx_patch import DocxPatcher
+from table_grid import TableGrid
+
+
+def _source(path):
+    document = docx.Document()
+    document.add_paragraph("标题")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "旧内容"
+    table.cell(1, 1).text = "保留"
+    document.save(str(path))
+    with zipfile.ZipFile(path, 'a') as package:
+        package.writestr('word/media/image1.bin', b'\x00\x01' * 1000, compress_type=zipfile.ZIP_STORED)
+    return path
+
+
+def test_patched_document_round_trips(tmp_path):
+    source = _source(tmp_path / 'src.docx')
+    target = tmp_path / 'dst.docx'
+
+    document = DocxPatcher.open(str(source))
+    grid = TableGrid(document.tables[0])
+    grid.set_text(0, 0, "新内容")
+    document.paragraphs[0].runs[0].text = "新标题"
+    document.save(str(target))
+
+    reopened = docx.Document(str(target))
+    assert reopened.paragraphs[0].text == "新标题"
+    assert [[c.text for c in row.cells] for row in reopened.tables[0].rows] == [["新内容", ""], ["", "保留"]]
+    # 源文件不变
+    assert docx.Document(str(source)).tables[0].cell(0, 0).text == "旧内容"
+
+
+def test_other_members_are_copied_verbatim(tmp_path):
+    source = _source(tmp_path / 'src.docx')
+    target = tmp_path / 'dst.docx'
+    document = DocxPatcher.open(str(source))
+    document.tables[0].cell(1, 1).text = "修改"
+    document.save(str(target))
+
+    with zipfile.ZipFile(source) as before, zipfile.ZipFile(target) as after:
+        assert after.testzip() is None
+        assert before.namelist() == after.namelist()
+        for info in before.infolist():
+            if info.filename == document.document_part:
+                continue
+            copied = after.getinfo(info.filename)
+            assert (copied.CRC, copied.compress_type, copied.compress_size) == \
+                (info.CRC, info.compress_type, info.compress_size)
+            assert after.read(info.filename) == before.read(info.filename)
+
+
+def test_save_in_place(tmp_path):
+    source = _source(tmp_path / 'src.docx')
+    document = DocxPatcher.open(str(source))
+    document.tables[0].cell(0, 1).text = "原地保存"
+    document.save()
+
+    assert docx.Document(str(source)).tables[0].cell(0, 1).text == "原地保存"
+    assert [p.name for p in tmp_path.iterdir()] == ['src.docx']
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+
+import pytest
+
+from export_cache import ExportCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExportCache(str(tmp_path / 'cache.sqlite3'))
+    yield cache
+    cache.close()
+
+
+def _touch(path, delta_ns=10 ** 9):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + delta_ns))
+
+
+def test_store_and_load(tmp_path, cache):
+    doc = tmp_path / 'a.docx'
+    doc.write_bytes(b'content')
+    assert not cache.is_fresh('A2', str(doc))
+
+    cache.store('A2', str(doc), {'rows': [['1', '甲']]}, ExportCache.fingerprint(str(doc)))
+    assert cache.is_fresh('A2', str(doc))
+    assert cache.load('A2', str(doc)) == {'rows': [['1', '甲']]}
+    assert cache.lookup('A5', str(doc)) == (False, None)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_touched_file_stays_fresh(tmp_path, cache):
+    doc = tmp_path / 'a.docx'
+    doc.write_bytes(b'content')
+    cache.store('A2', str(doc), [1])
+    _touch(doc)
+
+    assert cache.lookup('A2', str(doc)) == (True, [1])
+    # 修改时间已更新，下次不再计算哈希
+    row = cache._conn.execute("SELECT mtime_ns FROM documents").fetchone()
+    assert row[0] == os.stat(doc).st_mtime_ns
+
+
+def test_modified_file_is_stale(tmp_path, cache):
+    doc = tmp_path / 'a.docx'
+    doc.write_bytes(b'content')
+    cache.store('A2', str(doc), [1])
+
+    doc.write_bytes(b'CONTENT')  # 大小相同、内容不同
+    _touch(doc)
+    assert not cache.is_fresh('A2', str(doc))
+    doc.write_bytes(b'longer content')
+    assert not cache.is_fresh('A2', str(doc))
+    os.remove(doc)
+    assert not cache.is_fresh('A2', str(doc))
+
+
+def test_fingerprint_before_parse(tmp_path, cache):
+    doc = tmp_path / 'a.docx'
+    doc.write_bytes(b'before')
+    fingerprint = ExportCache.fingerprint(str(doc))
+    # 解析期间文档被保存：缓存的结果对应旧内容，下次必须重新解析
+    doc.write_bytes(b'after!')
+    _touch(doc)
+    cache.store('A2', str(doc), [1], fingerprint)
+    assert not cache.is_fresh('A2', str(doc))
+
+
+def test_evict_missing(tmp_path, cache):
+    root = tmp_path / 'root'
+    root.mkdir()
+    other = tmp_path / 'root2'
+    other.mkdir()
+    kept, removed, outside = root / 'kept.docx', root / 'removed.docx', other / 'x.docx'
+    for doc in (kept, removed, outside):
+        doc.write_bytes(b'x')
+        cache.store('A2', str(doc), [])
+    cache.store('A5', str(removed), [])
+
+    assert cache.evict_missing('A2', str(root), [str(kept)]) == 1
+    assert cache.is_fresh('A2', str(kept))
+    assert not cache.is_fresh('A2', str(removed))
+    # 其他目录（即使名称前缀相同）和其他类型的记录不受影响
+    assert cache.is_fresh('A2', str(outside))
+    assert cache.is_fresh('A5', str(removed))
+
+
+def test_periodic_commit(tmp_path):
+    db_path = str(tmp_path / 'cache.sqlite3')
+    cache = ExportCache(db_path)
+    cache.COMMIT_EVERY = 2
+    for i in range(3):
+        doc = tmp_path / f'{i}.docx'
+        doc.write_bytes(b'x')
+        cache.store('A2', str(doc), [i])
+
+    # 未调用 close() 时，其他连接已能读到前两个结果
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 2
+    cache.close()
+    reopened = ExportCache(db_path)
+    assert reopened.lookup('A2', str(tmp_path / '2.docx')) == (True, [2])
+    reopened.close()
+
+
+def test_schema_change_clears_cache(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'cache.sqlite3')
+    doc = tmp_path / 'a.docx'
+    doc.write_bytes(b'x')
+    cache = ExportCache(db_path)
+    cache.store('A2', str(doc), [1])
+    cache.close()
+
+    monkeypatch.setattr(ExportCache, 'SCHEMA_VERSION', ExportCache.SCHEMA_VERSION + 1)
+    cache = ExportCache(db_path)
+    assert not cache.is_fresh('A2', str(doc))
+    cache.close()
@@ -0,0 +1,107 @@
+import os
+
+from operation_plan import OperationPlan, PlannedFile, PlannedFolder
+from pipeline_journal import PipelineJournal
+
+
+def _plan(tmp_path, names=('a.docx', 'b.docx', 'c.docx')):
+    source = tmp_path / 'src' / 'Analysis-0038'
+    source.mkdir(parents=True, exist_ok=True)
+    target_root = tmp_path / 'dst'
+    plan = OperationPlan(str(tmp_path / 'src'), str(target_root))
+    folder = PlannedFolder(str(source), str(target_root / 'Analysis-0039'))
+    for name in names:
+        (source / name).write_bytes(name.encode())
+        folder.files.append(PlannedFile(str(source / name), folder.target, name, edit=True))
+    plan.folders.append(folder)
+    os.makedirs(folder.target, exist_ok=True)
+    return plan
+
+
+def _complete(planned):
+    with open(planned.target, 'wb') as f:
+        f.write(b'done')
+
+
+def test_resume_skips_completed_files(tmp_path):
+    plan = _plan(tmp_path)
+    first, second, third = plan.iter_files()
+    journal = PipelineJournal.create(plan)
+    for planned in (first, second):
+        _complete(planned)
+        journal.record(planned)
+    journal.close()
+
+    journal = PipelineJournal.resume(plan)
+    assert journal is not None
+    assert journal.is_done(first) and journal.is_done(second)
+    assert not journal.is_done(third)
+    journal.complete()
+    assert not os.path.exists(journal.path)
+    assert PipelineJournal.resume(plan) is None
+
+
+def test_resume_rejects_other_plan(tmp_path):
+    plan = _plan(tmp_path)
+    journal = PipelineJournal.create(plan)
+    journal.record(next(plan.iter_files()))
+    journal.close()
+
+    changed = _plan(tmp_path, names=('a.docx', 'b.docx', 'd.docx'))
+    assert PipelineJournal.plan_fingerprint(changed) != PipelineJournal.plan_fingerprint(plan)
+    assert PipelineJournal.resume(changed) is None
+
+
+def test_modified_source_and_missing_target_are_redone(tmp_path):
+    plan = _plan(tmp_path)
+    first, second, third = plan.iter_files()
+    journal = PipelineJournal.create(plan)
+    for planned in (first, second, third):
+        _complete(planned)
+        journal.record(planned)
+    journal.close()
+
+    with open(first.source, 'ab') as f:
+        f.write(b'changed')
+    os.remove(second.target)
+    journal = PipelineJournal.resume(plan)
+    assert [journal.is_done(p) for p in (first, second, third)] == [False, False, True]
+    journal.close()
+
+
+def test_failed_entries_are_not_done(tmp_path):
+    plan = _plan(tmp_path)
+    first, second, _ = plan.iter_files()
+    journal = PipelineJournal.create(plan)
+    _complete(first)
+    _complete(second)
+    journal.record(first, failed=True)
+    journal.record(second)
+    journal.record(second, failed=True)
+    journal.close()
+
+    journal = PipelineJournal.resume(plan)
+    assert not journal.is_done(first)
+    assert not journal.is_done(second)
+    assert set(journal.failed) == {os.path.join('Analysis-0039', name) for name in ('a.docx', 'b.docx')}
+    # 重新修改成功后不再是失败项
+    journal.record(first)
+    journal.close()
+    journal = PipelineJournal.resume(plan)
+    assert journal.is_done(first)
+    journal.close()
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    plan = _plan(tmp_path)
+    first = next(plan.iter_files())
+    journal = PipelineJournal.create(plan)
+    _complete(first)
+    journal.record(first)
+    journal.close()
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('["Analysis-0039/b.do')
+
+    journal = PipelineJournal.resume(plan)
+    assert journal is not None and journal.is_done(first)
+    journal.close()
@@ -0,0 +1,75 @@
+import docx
+
+from docx_reader import XmlTableReader
+from table_grid import TableGrid
+
+
+def _merged_document(path):
+    """包含横向合并、纵向合并以及 gridBefore 的表格"""
+    document = docx.Document()
+    table = document.add_table(rows=4, cols=4)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"{r}-{c}"
+    table.cell(0, 0).merge(table.cell(0, 1))    # 横向合并
+    table.cell(1, 2).merge(table.cell(3, 2))    # 纵向合并
+    table.cell(2, 0).merge(table.cell(3, 1))    # 横向 + 纵向合并
+    table.cell(1, 3).paragraphs[0].add_run("b")
+    table.cell(1, 3).add_paragraph("第二段")
+
+    # 第二个表格：首行以 gridBefore 跳过一列
+    second = document.add_table(rows=2, cols=3)
+    for r, row in enumerate(second.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"s{r}-{c}"
+    tr = second.rows[0]._tr
+    tr.remove(tr.tc_lst[0])
+    tr.get_or_add_trPr()._add_gridBefore(val=1)
+    document.save(str(path))
+    return path
+
+
+def _expected(path):
+    return [[[cell.text for cell in row.cells] for row in table.rows] for table in docx.Document(str(path)).tables]
+
+
+def test_xml_reader_matches_row_cells(tmp_path):
+    path = _merged_document(tmp_path / 'merged.docx')
+    expected = _expected(path)
+
+    assert list(XmlTableReader.iter_tables(str(path))) == expected
+    assert expected[0][0][:2] == ['0-0\n0-1', '0-0\n0-1']
+    assert expected[0][3][2] == expected[0][1][2]
+
+
+def test_table_grid_matches_row_cells(tmp_path):
+    path = _merged_document(tmp_path / 'merged.docx')
+    tables = docx.Document(str(path)).tables
+
+    for table, expected in zip(tables, _expected(path)):
+        grid = TableGrid(table)
+        assert len(grid) == len(expected)
+        assert grid.texts() == expected
+
+
+def test_table_grid_set_text(tmp_path):
+    path = _merged_document(tmp_path / 'merged.docx')
+    table = docx.Document(str(path)).tables[0]
+    grid = TableGrid(table)
+    grid.text(1, 2)
+
+    grid.set_text(1, 2, "新内容")
+    # 纵向合并区域共用一个单元格，各行读到的都是新内容
+    assert [grid.text(r, 2) for r in (1, 2, 3)] == ["新内容"] * 3
+    assert grid.texts() == [[cell.text for cell in row.cells] for row in table.rows]
+
+
+def test_nested_tables_are_skipped(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "外层"
+    table.cell(0, 1).add_table(rows=1, cols=1).cell(0, 0).text = "内层"
+    path = tmp_path / 'nested.docx'
+    document.save(str(path))
+
+    assert list(XmlTableReader.iter_tables(str(path))) == _expected(path)
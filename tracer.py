@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import threading
+
+
+def _now() -> int:
+    """单调时钟（微秒）。Windows 和 Linux 上为系统范围的时钟，子进程记录的时间可以直接合并"""
+    return time.perf_counter_ns() // 1000
+
+
+class _NullSpan:
+    """不记录任何内容的上下文管理器（可重复使用）"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """
+    未启用性能统计时使用的空实现，所有方法都不做任何事。
+
+    与 Tracer 的接口相同，调用方无需判断是否启用；需要额外计算（例如获取文件大小）时
+    可先检查 enabled。
+    """
+
+    enabled = False
+
+    def span(self, name: str, cat: str = 'stage', **args):
+        return _NULL_SPAN
+
+    def start(self) -> int:
+        return 0
+
+    def phase(self, name: str, start: int, **args) -> int:
+        return 0
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def record_file_io(self, read_path: str = None, written_path: str = None):
+        pass
+
+    def export_state(self):
+        return None
+
+    def merge(self, state):
+        pass
+
+
+NULL_TRACER = NullTracer()
+_current = NULL_TRACER
+
+
+def get_tracer():
+    """当前进程中正在使用的 Tracer（未启用时为 NULL_TRACER）"""
+    return _current
+
+
+class use_tracer:
+    """在 with 块内将 tracer 设为当前进程的 Tracer，供 FileUtils 中的文档处理方法记录各阶段耗时"""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self._previous = None
+
+    def __enter__(self):
+        global _current
+        self._previous, _current = _current, self.tracer
+        return self.tracer
+
+    def __exit__(self, exc_type, exc, tb):
+        global _current
+        _current = self._previous
+        return False
+
+
+class _Span:
+    def __init__(self, tracer, name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.begin = 0
+
+    def __enter__(self):
+        self.begin = _now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.add_event(self.name, self.cat, self.begin, _now() - self.begin, self.args)
+        return False
+
+
+class Tracer:
+    """
+    记录各步骤和每个文档各阶段的耗时，以及读写的数据量和文件系统调用次数。
+
+    事件格式与 Chrome trace（Trace Event Format）的完整事件相同，write_chrome_trace() 输出的
+    JSON 可在 chrome://tracing 或 https://ui.perfetto.dev 中打开；summary_lines() 生成写在
+    日志末尾的统计表。子进程中使用各自的 Tracer，通过 export_state() / merge() 合并到主进程。
+
+    事件分类（cat）:
+        'stage': 步骤（复制文件、修改文档等）
+        'document': 单个文档的处理
+        'phase': 文档处理中的阶段（open、modify、save）
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.events = []    # (名称, 分类, 开始时间, 持续时间, 进程ID, 线程ID, 参数)
+        self.counters = {}  # 名称 -> 累计值
+        self._lock = threading.Lock()
+
+    def span(self, name: str, cat: str = 'stage', **args):
+        """记录 with 块耗时的上下文管理器"""
+        return _Span(self, name, cat, args)
+
+    def start(self) -> int:
+        """当前时间，作为 phase() 的起点"""
+        return _now()
+
+    def phase(self, name: str, start: int, **args) -> int:
+        """
+        记录从 start 到现在的文档处理阶段，返回当前时间作为下一个阶段的起点。
+
+        用于顺序执行的几个阶段（打开、修改、保存），不必把每段代码放进 with 块。
+        """
+        end = _now()
+        self.add_event(name, 'phase', start, end - start, args)
+        return end
+
+    def add_event(self, name: str, cat: str, begin: int, duration: int, args: dict = None):
+        # list.append 是原子操作，多个线程可以同时记录
+        self.events.append((name, cat, begin, duration, os.getpid(), threading.get_ident(), args or {}))
+
+    def count(self, name: str, value: int = 1):
+        """累加计数器（例如读取的字节数）"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_file_io(self, read_path: str = None, written_path: str = None):
+        """按文件大小累加读取和写入的字节数"""
+        for name, path in (('bytes_read', read_path), ('bytes_written', written_path)):
+            if path:
+                try:
+                    self.count(name, os.path.getsize(path))
+                except OSError:
+                    pass
+
+    def export_state(self):
+        """子进程中记录的内容，用于传回主进程"""
+        return self.events, self.counters
+
+    def merge(self, state):
+        """合并子进程（或其他 Tracer）记录的内容"""
+        if not state:
+            return
+        events, counters = state
+        self.events.extend(events)
+        for name, value in counters.items():
+            self.count(name, value)
+
+    def write_chrome_trace(self, path: str):
+        """写入 Chrome trace JSON 文件（时间以第一个事件为零点）"""
+        origin = min((event[2] for event in self.events), default=0)
+        main_pid = os.getpid()
+        trace_events = []
+        for pid in sorted({event[4] for event in self.events}):
+            label = "主进程" if pid == main_pid else f"工作进程 {pid}"
+            trace_events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                                 'args': {'name': label}})
+        for name, cat, begin, duration, pid, tid, args in self.events:
+            trace_events.append({'name': name, 'cat': cat, 'ph': 'X', 'ts': begin - origin, 'dur': duration,
+                                 'pid': pid, 'tid': tid, 'args': args})
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms', 'otherData': self.counters},
+                      f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def summary_lines(self) -> list:
+        """统计表：各步骤耗时、文档各阶段耗时、读写数据量和文件系统调用次数"""
+        lines = ["-" * 50, "性能统计"]
+
+        # 步骤按开始时间排序，嵌套的步骤缩进显示；同名步骤的耗时合并
+        stages = sorted((event for event in self.events if event[1] == 'stage'), key=lambda e: (e[2], -e[3]))
+        order, totals, depths = [], {}, {}
+        open_ends = []
+        for name, _, begin, duration, *_ in stages:
+            while open_ends and open_ends[-1] <= begin:
+                open_ends.pop()
+            if name not in totals:
+                order.append(name)
+                totals[name] = 0
+                depths[name] = len(open_ends)
+            totals[name] += duration
+            open_ends.append(begin + duration)
+        if order:
+            lines.append("步骤耗时（秒）:")
+            for name in order:
+                lines.append(f"  {'  ' * depths[name]}{name}: {totals[name] / 1e6:.3f}")
+
+        for cat, title in (('document', "文档处理"), ('phase', "文档各阶段")):
+            stats = {}
+            for name, event_cat, _, duration, *_ in self.events:
+                if event_cat == cat:
+                    stat = stats.setdefault(name, [0, 0, 0])
+                    stat[0] += 1
+                    stat[1] += duration
+                    stat[2] = max(stat[2], duration)
+            if stats:
+                lines.append(f"{title}（次数 / 总耗时 / 平均 / 最大，毫秒）:")
+                for name, (n, total, longest) in stats.items():
+                    lines.append(f"  {name}: {n} / {total / 1e3:.1f} / {total / n / 1e3:.2f} / {longest / 1e3:.2f}")
+
+        counters = self.counters
+        if 'bytes_read' in counters or 'bytes_written' in counters:
+            lines.append(f"读取 {counters.get('bytes_read', 0) / 1048576:.1f} MiB，"
+                         f"写入 {counters.get('bytes_written', 0) / 1048576:.1f} MiB")
+        if 'template_cache_hit' in counters or 'template_cache_miss' in counters:
+            lines.append(f"模板缓存命中 {counters.get('template_cache_hit', 0)} 次，"
+                         f"未命中 {counters.get('template_cache_miss', 0)} 次")
+        if 'scandir' in counters or 'stat' in counters:
+            lines.append(f"文件系统元数据调用 scandir {counters.get('scandir', 0)} 次，"
+                         f"stat {counters.get('stat', 0)} 次")
+        lines.append("-" * 50)
+        return lines
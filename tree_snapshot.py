@@ -0,0 +1,185 @@
+import os
+import stat
+import collections
+
+
+class _Entry:
+    """快照中的一个目录项，保存 os.scandir 返回的类型信息和（按需获取的）stat 信息"""
+
+    __slots__ = ('name', 'is_dir', '_dir_entry', '_stat')
+
+    def __init__(self, name: str, is_dir: bool, dir_entry=None):
+        self.name = name
+        self.is_dir = is_dir
+        self._dir_entry = dir_entry
+        self._stat = None
+
+
+class TreeSnapshot:
+    """
+    目录树快照。
+
+    每个目录在第一次被查询时用 os.scandir 读取一次，之后的列目录、类型判断和存在性检查
+    都直接使用缓存的 DirEntry 信息，不再访问文件系统。流水线复制、删除或重命名文件时
+    调用 add_file/add_dir/remove/rename 就地更新快照，使后续步骤看到的结构与磁盘一致。
+
+    counters 记录实际发生的文件系统元数据调用次数（scandir、stat）。
+    """
+
+    def __init__(self):
+        self._dirs = {}  # 目录绝对路径 -> {名称: _Entry}，保持 scandir 的顺序
+        self.counters = collections.Counter()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path)
+
+    def _load(self, path: str) -> dict:
+        """返回目录的缓存内容，尚未读取时用 os.scandir 读取一次"""
+        key = self._key(path)
+        children = self._dirs.get(key)
+        if children is None:
+            children = {}
+            self.counters['scandir'] += 1
+            with os.scandir(key) as it:
+                for dir_entry in it:
+                    children[dir_entry.name] = _Entry(dir_entry.name, dir_entry.is_dir(), dir_entry)
+            self._dirs[key] = children
+        return children
+
+    def _lookup(self, path: str):
+        """
+        查找路径对应的目录项。
+
+        父目录已在快照中时直接返回缓存结果（不存在则为 None）；否则退化为一次 os.stat，
+        避免为了判断一个路径而读取可能很大的父目录。
+        """
+        key = self._key(path)
+        parent, name = os.path.split(key)
+        children = self._dirs.get(parent)
+        if children is not None and name:
+            return children.get(name)
+
+        self.counters['stat'] += 1
+        try:
+            st_result = os.stat(key)
+        except OSError:
+            return None
+        entry = _Entry(name, stat.S_ISDIR(st_result.st_mode))
+        entry._stat = st_result
+        return entry
+
+    def listdir(self, path: str) -> list:
+        """与 os.listdir 相同，返回目录中的名称列表"""
+        return list(self._load(path))
+
+    def scandir(self, path: str) -> list:
+        """返回目录中的 (名称, 是否为目录) 列表"""
+        return [(entry.name, entry.is_dir) for entry in self._load(path).values()]
+
+    def exists(self, path: str) -> bool:
+        return self._lookup(path) is not None
+
+    def isdir(self, path: str) -> bool:
+        entry = self._lookup(path)
+        return entry is not None and entry.is_dir
+
+    def isfile(self, path: str) -> bool:
+        entry = self._lookup(path)
+        return entry is not None and not entry.is_dir
+
+    def stat(self, path: str):
+        """返回路径的 stat 信息（每个目录项最多获取一次）"""
+        entry = self._lookup(path)
+        if entry is None:
+            raise FileNotFoundError(path)
+        if entry._stat is None:
+            self.counters['stat'] += 1
+            if entry._dir_entry is not None:
+                entry._stat = entry._dir_entry.stat()
+            else:
+                entry._stat = os.stat(self._key(path))
+        return entry._stat
+
+    def walk(self, top: str):
+        """与 os.walk(top) 相同的自顶向下遍历，产出 (目录, 子目录名列表, 文件名列表)"""
+        dirs = []
+        files = []
+        try:
+            for name, is_dir in self.scandir(top):
+                (dirs if is_dir else files).append(name)
+        except OSError:
+            return
+        yield top, dirs, files
+        for name in dirs:
+            yield from self.walk(os.path.join(top, name))
+
+    def add_dir(self, path: str, empty: bool = False):
+        """
+        记录新建或复制得到的目录。
+
+        参数:
+            empty: 目录为新建的空目录时为 True，之后列目录不再访问文件系统；
+                   否则目录内容在第一次查询时读取
+        """
+        key = self._key(path)
+        self._add_entry(key, True)
+        if empty:
+            self._dirs[key] = {}
+        else:
+            self._drop_subtree(key)
+
+    def add_file(self, path: str):
+        """记录新建或复制得到的文件"""
+        self._add_entry(self._key(path), False)
+
+    def remove(self, path: str):
+        """记录文件或目录（含其全部内容）已被删除"""
+        key = self._key(path)
+        parent, name = os.path.split(key)
+        children = self._dirs.get(parent)
+        if children is not None:
+            children.pop(name, None)
+        self._drop_subtree(key)
+
+    def clear_dir(self, path: str):
+        """记录目录中的内容已被全部删除（目录本身保留）"""
+        key = self._key(path)
+        self._drop_subtree(key)
+        self._dirs[key] = {}
+
+    def rename(self, src: str, dst: str):
+        """记录文件或目录已从 src 重命名为 dst"""
+        src_key = self._key(src)
+        dst_key = self._key(dst)
+        src_parent, src_name = os.path.split(src_key)
+        children = self._dirs.get(src_parent)
+        entry = children.pop(src_name, None) if children is not None else None
+        if entry is not None:
+            is_dir = entry.is_dir
+        else:
+            self.counters['stat'] += 1
+            is_dir = os.path.isdir(dst_key)
+        self._add_entry(dst_key, is_dir)
+
+        # 移动已缓存的子目录内容
+        prefix = os.path.join(src_key, '')
+        for key in [k for k in self._dirs if k == src_key or k.startswith(prefix)]:
+            self._dirs[dst_key + key[len(src_key):]] = self._dirs.pop(key)
+
+    def take_counters(self) -> collections.Counter:
+        """返回并清零当前的文件系统调用计数"""
+        counters = self.counters
+        self.counters = collections.Counter()
+        return counters
+
+    def _add_entry(self, key: str, is_dir: bool):
+        parent, name = os.path.split(key)
+        children = self._dirs.get(parent)
+        if children is not None:
+            children[name] = _Entry(name, is_dir)
+
+    def _drop_subtree(self, key: str):
+        prefix = os.path.join(key, '')
+        for k in [k for k in self._dirs if k == key or k.startswith(prefix)]:
+            del self._dirs[k]